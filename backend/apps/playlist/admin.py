@@ -1,13 +1,32 @@
 from django.contrib import admin
-from .models import PlaylistTrack
+from .models import PlaybackState, Playlist, PlaylistTrack
+
+
+@admin.register(Playlist)
+class PlaylistAdmin(admin.ModelAdmin):
+    """Admin interface for Playlist rooms."""
+    
+    list_display = ['name', 'slug', 'created_at']
+    search_fields = ['name', 'slug']
+    prepopulated_fields = {'slug': ['name']}
+    readonly_fields = ['created_at']
 
 
 @admin.register(PlaylistTrack)
 class PlaylistTrackAdmin(admin.ModelAdmin):
     """Admin interface for PlaylistTrack model."""
     
-    list_display = ['track', 'position', 'votes', 'added_by', 'is_playing', 'added_at']
-    list_filter = ['is_playing', 'added_by']
+    list_display = ['track', 'playlist', 'position', 'votes', 'added_by', 'is_playing', 'added_at']
+    list_select_related = ['track']
+    list_filter = ['playlist', 'added_by']
     search_fields = ['track__title', 'track__artist', 'added_by']
     ordering = ['position']
     readonly_fields = ['added_at', 'played_at']
+
+
+@admin.register(PlaybackState)
+class PlaybackStateAdmin(admin.ModelAdmin):
+    """Admin interface for each room's playback state."""
+    
+    list_display = ['playlist', 'item', 'started_at', 'offset', 'updated_at']
+    readonly_fields = ['updated_at']
@@ -0,0 +1,214 @@
+"""
+Set-based application of batched playlist mutations.
+
+All rows referenced by a batch are loaded up front with a handful of
+queries, the operations are applied in order in memory, and the results are
+written back with one delete, one ``bulk_update`` and one ``bulk_create``.
+"""
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from copy import copy
+from django.conf import settings
+from apps.playlist.models import PlaylistTrack
+from apps.playlist.services import (
+    RANK_MAX_LENGTH,
+    calculate_position,
+    find_crowded_positions,
+    generate_rank_key,
+    rebalance_positions,
+    rebalance_ranks,
+    reindexed_field,
+    reindexed_payload,
+)
+from apps.playlist.votes import get_vote_aggregator
+from apps.tracks.models import Track
+from core.exceptions import BatchOperationError
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RankIndex:
+    """Sorted in-memory copy of a playlist's rank keys."""
+
+    def __init__(self, playlist):
+        rows = list(
+            PlaylistTrack.objects.filter(playlist=playlist).exclude(rank='')
+            .order_by('rank').values_list('id', 'rank')
+        )
+        self.rank_of = dict(rows)
+        self.keys = [rank for _, rank in rows]
+
+    def discard(self, pk):
+        key = self.rank_of.pop(pk, None)
+        if key is not None:
+            del self.keys[bisect_left(self.keys, key)]
+
+    def place(self, pk=None, after_id=None, before_id=None):
+        """Return a new key between the given neighbours and record it."""
+        self.discard(pk)
+
+        prev_key = self.rank_of[after_id] if after_id is not None else None
+        next_key = self.rank_of[before_id] if before_id is not None else None
+        if after_id is None and before_id is None:
+            prev_key = self.keys[-1] if self.keys else None
+        elif before_id is None:
+            i = bisect_right(self.keys, prev_key)
+            next_key = self.keys[i] if i < len(self.keys) else None
+        elif after_id is None:
+            i = bisect_left(self.keys, next_key)
+            prev_key = self.keys[i - 1] if i > 0 else None
+
+        key = generate_rank_key(prev_key, next_key)
+        insort(self.keys, key)
+        if pk is not None:
+            self.rank_of[pk] = key
+        return key
+
+
+def apply_batch(playlist, operations):
+    """
+    Apply validated batch operations to a playlist in order and return the resulting changes.
+
+    Returns a list of ``(event_type, payload)`` tuples, one per operation, where
+    payload is a copy of the affected PlaylistTrack as that operation left it (or
+    ``{'id': ...}`` for removals). If moves exhausted position precision (or grew
+    rank keys past RANK_MAX_LENGTH), a final ``playlist.reindexed`` change carries
+    the renumbered positions or rank keys.
+    Must be called inside a transaction; raises BatchOperationError with the
+    index of the first invalid operation before anything is written.
+    """
+    rank_mode = settings.PLAYLIST_ORDERING == 'rank'
+
+    item_ids = {op['id'] for op in operations if 'id' in op}
+    track_ids = {op['track_id'] for op in operations if op['op'] == 'add'}
+
+    playlist_items = PlaylistTrack.objects.filter(playlist=playlist)
+    items = playlist_items.select_related('track').in_bulk(item_ids)
+    tracks = Track.objects.in_bulk(track_ids)
+    in_playlist = set(
+        playlist_items.filter(track_id__in=track_ids).values_list('track_id', flat=True)
+    )
+
+    ranks = None
+    last_position = None
+    if rank_mode and any(op['op'] in ('add', 'move') for op in operations):
+        ranks = RankIndex(playlist)
+    if not rank_mode and any(op['op'] == 'add' and 'position' not in op for op in operations):
+        last_position = (
+            playlist_items.order_by('-position').values_list('position', flat=True).first()
+        )
+
+    changes = []
+    to_create = []
+    moved = {}
+    removed = set()
+    votes = defaultdict(int)
+    snapshots = []
+
+    for index, op in enumerate(operations):
+        if op['op'] == 'add':
+            track = tracks.get(op['track_id'])
+            if track is None:
+                raise BatchOperationError(index, 'TRACK_NOT_FOUND', f"Track {op['track_id']} does not exist")
+            if track.id in in_playlist:
+                raise BatchOperationError(index, 'DUPLICATE_TRACK', 'This track is already in the playlist')
+            in_playlist.add(track.id)
+
+            item = PlaylistTrack(playlist=playlist, track=track, added_by=op['added_by'])
+            if 'position' in op:
+                item.position = op['position']
+            else:
+                item.position = calculate_position(prev_position=last_position, next_position=None)
+            if last_position is None or item.position > last_position:
+                last_position = item.position
+            if rank_mode:
+                item.rank = _place(ranks, index, None, op)
+
+            to_create.append(item)
+            changes.append(('track.added', item))
+            continue
+
+        item = items.get(op['id'])
+        if item is None or item.pk in removed:
+            raise BatchOperationError(index, 'NOT_FOUND', f"Playlist item {op['id']} does not exist")
+
+        if op['op'] == 'remove':
+            removed.add(item.pk)
+            moved.pop(item.pk, None)
+            in_playlist.discard(item.track_id)
+            if ranks is not None:
+                ranks.discard(item.pk)
+            changes.append(('track.removed', {'id': item.pk}))
+
+        elif op['op'] == 'move':
+            if rank_mode:
+                if 'after_id' not in op and 'before_id' not in op:
+                    raise BatchOperationError(
+                        index, 'INVALID_POSITION', 'after_id or before_id is required in rank ordering mode'
+                    )
+                item.rank = _place(ranks, index, item.pk, op)
+            elif 'position' in op:
+                item.position = op['position']
+            else:
+                raise BatchOperationError(index, 'INVALID_POSITION', 'position is required')
+            moved[item.pk] = item
+            changes.append(('track.moved', _snapshot(item, votes, snapshots)))
+
+        elif op['op'] == 'vote':
+            votes[item.pk] += 1 if op['direction'] == 'up' else -1
+            changes.append(('track.voted', _snapshot(item, votes, snapshots)))
+
+    if removed:
+        PlaylistTrack.objects.filter(pk__in=removed).delete()
+    if moved:
+        PlaylistTrack.objects.bulk_update(moved.values(), ['rank' if rank_mode else 'position'])
+    if to_create:
+        PlaylistTrack.objects.bulk_create(to_create)
+
+    reindexed = {}
+    if rank_mode:
+        for item in [*moved.values(), *to_create]:
+            if len(item.rank) > RANK_MAX_LENGTH and item.pk not in reindexed:
+                reindexed.update(rebalance_ranks(playlist, item.rank))
+    else:
+        placed = {item.pk: item.position for item in [*moved.values(), *to_create]}
+        for position in find_crowded_positions(playlist, placed).values():
+            reindexed.update(rebalance_positions(playlist, position))
+    if reindexed:
+        changes.append(('playlist.reindexed', reindexed_payload(reindexed, reindexed_field())))
+
+    aggregator = get_vote_aggregator()
+    for pk, delta in votes.items():
+        if pk not in removed and delta:
+            aggregator.record(pk, delta)
+
+    # Payloads add the pending deltas, which now include the whole batch's
+    # votes; take back the ones cast after each snapshot
+    for snapshot, delta in snapshots:
+        recorded = votes[snapshot.pk] if snapshot.pk not in removed else 0
+        snapshot.votes += delta - recorded
+
+    logger.info(
+        "Applied batch of %s operation(s): %s added, %s removed, %s moved",
+        len(operations), len(to_create), len(removed), len(moved)
+    )
+    return changes
+
+
+def _snapshot(item, votes, snapshots):
+    """Copy an item as it is now, remembering the batch's votes cast on it so far."""
+    snapshot = copy(item)
+    snapshots.append((snapshot, votes.get(item.pk, 0)))
+    return snapshot
+
+
+def _place(ranks, index, pk, op):
+    try:
+        return ranks.place(pk, op.get('after_id'), op.get('before_id'))
+    except KeyError:
+        raise BatchOperationError(
+            index, 'INVALID_NEIGHBOUR', 'after_id and before_id must refer to other tracks in the playlist'
+        )
+    except ValueError as e:
+        raise BatchOperationError(index, 'INVALID_POSITION', str(e))
@@ -0,0 +1,161 @@
+"""
+REST hot-path benchmarks with query budgets.
+
+ApiBenchmark seeds a scratch playlist room of ``size`` items, times every
+hot endpoint of PlaylistViewSet and the track search through the full
+middleware stack and counts the queries each request runs, after one
+untimed request that warms the process caches. QUERY_BUDGETS is
+the exact number of queries each endpoint is allowed; it must not depend
+on the playlist size. Transaction statements are not counted so the numbers
+are the same inside a test transaction and in autocommit. Run it with
+``manage.py bench_api``.
+"""
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.tracks.models import Track
+from .models import Playlist, PlaylistTrack
+import random
+import statistics
+import time
+import uuid
+
+QUERY_BUDGETS = {
+    'list': 3,
+    'list_by_votes': 2,
+    'create': 9,
+    'partial_update': 4,
+    'vote': 2,
+    'play': 5,
+    'stop': 2,
+    'history': 2,
+    'track_search': 2,
+}
+
+BATCH_SIZE = 5000
+
+TRANSACTION_STATEMENTS = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE SAVEPOINT')
+
+
+def count_queries(captured_queries):
+    return sum(1 for query in captured_queries if not query['sql'].startswith(TRANSACTION_STATEMENTS))
+
+
+def over_budget(results):
+    """Return the names of endpoints whose query count differs from their budget."""
+    return [
+        name for name, endpoint in results['endpoints'].items()
+        if endpoint['queries'] != endpoint['query_budget']
+    ]
+
+
+class ApiBenchmark:
+
+    def __init__(self, size=1000, iterations=20):
+        self.size = size
+        self.iterations = iterations
+        self.client = APIClient()
+        self.random = random.Random(0)
+
+    def run(self):
+        """Seed a scratch room, benchmark every endpoint and return the results as a dict."""
+        started = time.perf_counter()
+        self.setup()
+        seed_seconds = time.perf_counter() - started
+        try:
+            endpoints = {name: self.measure(name) for name in QUERY_BUDGETS}
+        finally:
+            self.teardown()
+        return {
+            'started_at': timezone.now().isoformat(),
+            'size': self.size,
+            'iterations': self.iterations,
+            'database': connection.vendor,
+            'seed_seconds': round(seed_seconds, 3),
+            'endpoints': endpoints,
+        }
+
+    def setup(self):
+        self.slug = f'bench-{uuid.uuid4().hex[:8]}'
+        self.playlist = Playlist.objects.create(name=f'Benchmark {self.slug}', slug=self.slug)
+        self.base_url = f'/api/rooms/{self.slug}/playlist/'
+
+        # Spare tracks are added to the playlist by the 'create' benchmark and its warm-up
+        total = self.size + self.iterations + 1
+        for start in range(0, total, BATCH_SIZE):
+            Track.objects.bulk_create([
+                Track(
+                    title=f'Benchmark {i}',
+                    artist=f'Artist {i % 500}',
+                    album=self.slug,
+                    duration_seconds=120 + i % 300,
+                    genre='rock'
+                )
+                for i in range(start, min(start + BATCH_SIZE, total))
+            ])
+        track_ids = list(Track.objects.filter(album=self.slug).order_by('id').values_list('id', flat=True))
+        self.spare_track_ids = track_ids[self.size:]
+
+        now = timezone.now()
+        for start in range(0, self.size, BATCH_SIZE):
+            PlaylistTrack.objects.bulk_create([
+                PlaylistTrack(
+                    playlist=self.playlist,
+                    track_id=track_id,
+                    position=float(i + 1),
+                    played_at=now if i % 10 == 0 else None
+                )
+                for i, track_id in enumerate(track_ids[start:min(start + BATCH_SIZE, self.size)], start=start)
+            ])
+        self.item_ids = list(self.playlist.items.values_list('id', flat=True))
+
+    def teardown(self):
+        Track.objects.filter(album=self.slug).delete()
+        self.playlist.delete()
+
+    def request(self, name, iteration):
+        """Send one request of the named endpoint and return the response."""
+        item_id = self.random.choice(self.item_ids)
+        if name == 'list':
+            return self.client.get(self.base_url)
+        if name == 'list_by_votes':
+            return self.client.get(self.base_url, {'order': 'votes'})
+        if name == 'create':
+            return self.client.post(self.base_url, {'track_id': self.spare_track_ids[iteration]}, format='json')
+        if name == 'partial_update':
+            return self.client.patch(f'{self.base_url}{item_id}/', {'position': self.random.uniform(0, self.size)}, format='json')
+        if name == 'vote':
+            return self.client.post(f'{self.base_url}{item_id}/vote/', {'direction': 'up'}, format='json')
+        if name == 'play':
+            return self.client.post(f'{self.base_url}{item_id}/play/')
+        if name == 'stop':
+            return self.client.post(f'{self.base_url}stop/')
+        if name == 'history':
+            return self.client.get(f'{self.base_url}history/')
+        if name == 'track_search':
+            return self.client.get('/api/tracks/', {'search': f'artist {iteration % 500}'})
+        raise ValueError(f'Unknown endpoint {name}')
+
+    def measure(self, name):
+        self.request(name, self.iterations)
+        timings = []
+        queries = []
+        for iteration in range(self.iterations):
+            # The query log is capped, so start every request with an empty one
+            reset_queries()
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = self.request(name, iteration)
+                timings.append(time.perf_counter() - started)
+            queries.append(count_queries(context.captured_queries))
+            if response.status_code >= 400:
+                raise RuntimeError(f'{name} failed with status {response.status_code}: {response.content[:200]}')
+
+        return {
+            'mean_ms': round(statistics.mean(timings) * 1000, 3),
+            'p50_ms': round(statistics.median(timings) * 1000, 3),
+            'max_ms': round(max(timings) * 1000, 3),
+            'queries': max(queries),
+            'query_budget': QUERY_BUDGETS[name],
+        }
@@ -1,14 +1,53 @@
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+from core.log import RATE_LIMITED
+from core.metrics import get_metrics
 from apps.realtime.decorators import require_websocket_connection
+from apps.realtime.outbound import RESYNC_REQUIRED_EVENT, OutboundQueue
+from apps.realtime.utils import delta_event, encode_binary, encode_event, msgpack, room_group_name
+from .models import DEFAULT_PLAYLIST_SLUG, Playlist
+from .snapshot import get_snapshot_cache
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Clients opting into this subprotocol get MessagePack binary frames, and
+# vote/move/play events carry only the changed fields keyed by item id.
+BINARY_SUBPROTOCOL = 'playlist.msgpack'
+
 
 class PlaylistConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Streams a playlist room's events to one WebSocket client.
+    
+    Group messages are queued in a bounded OutboundQueue and written to the
+    socket by a separate task. ASGI servers such as Daphne accept every send
+    at once and buffer it themselves, so with WEBSOCKET_SEND_WINDOW set the
+    task also stops once that many frames are unacknowledged: clients report
+    the number of frames they have received with
+    {"type": "ack", "received": n}. When a slow client lets the queue fill
+    up, it receives a 'resync.required' event, even with the window full,
+    and nothing else until it sends {"type": "resync"}, which is answered
+    with a fresh snapshot.
+    """
+
+    binary = False
+    sender = None
+    frames_sent = 0
+    frames_acked = 0
 
     async def connect(self):
-        self.room_group_name = 'playlist_updates'
+        url_kwargs = self.scope.get('url_route', {}).get('kwargs', {})
+        self.room = url_kwargs.get('room', DEFAULT_PLAYLIST_SLUG)
+        self.playlist = await database_sync_to_async(self.get_playlist)()
+        if self.playlist is None:
+            logger.info("WebSocket rejected: unknown playlist room %s", self.room)
+            await self.close(code=4004)
+            return
+        
+        self.room_group_name = room_group_name(self.room)
         
         # Join room group
         await self.channel_layer.group_add(
@@ -16,22 +55,82 @@ class PlaylistConsumer(AsyncJsonWebsocketConsumer):
             self.channel_name
         )
         
-        await self.accept()
-        logger.info(f"WebSocket connected: {self.channel_name}")
+        if msgpack is not None and BINARY_SUBPROTOCOL in self.scope.get('subprotocols', []):
+            self.binary = True
+            await self.accept(subprotocol=BINARY_SUBPROTOCOL)
+        else:
+            await self.accept()
+        get_metrics().inc('websocket_connects_total')
+        logger.info("WebSocket connected to %s: %s", self.room, self.channel_name, extra=RATE_LIMITED)
         
         # Send initial connection confirmation
         await self.send_json({
             'type': 'connection.established',
             'message': 'Connected to playlist updates'
         })
+        
+        # Push the current playlist so the client doesn't need a REST round trip
+        if settings.WEBSOCKET_SNAPSHOT_ON_CONNECT:
+            await self.send_snapshot()
+        
+        self.outbound = OutboundQueue(settings.WEBSOCKET_QUEUE_SIZE)
+        self.outbound_ready = asyncio.Event()
+        self.send_window = settings.WEBSOCKET_SEND_WINDOW
+        self.acked = asyncio.Event()
+        self.send_lock = asyncio.Lock()
+        self.sender = asyncio.create_task(self.drain_outbound())
+    
+    def get_playlist(self):
+        if self.room == DEFAULT_PLAYLIST_SLUG:
+            return Playlist.objects.get_default()
+        return Playlist.objects.filter(slug=self.room).first()
     
     async def disconnect(self, close_code):
+        if self.sender is not None:
+            self.sender.cancel()
+        if not hasattr(self, 'room_group_name'):
+            return
+        
         # Leave room group
         await self.channel_layer.group_discard(
             self.room_group_name,
             self.channel_name
         )
-        logger.info(f"WebSocket disconnected: {self.channel_name} (code: {close_code})")
+        get_metrics().inc('websocket_disconnects_total')
+        logger.info("WebSocket disconnected: %s (code: %s)", self.channel_name, close_code, extra=RATE_LIMITED)
+    
+    async def receive(self, text_data=None, bytes_data=None, **kwargs):
+        if self.binary and bytes_data is not None:
+            await self.receive_json(msgpack.unpackb(bytes_data, strict_map_key=False), **kwargs)
+        else:
+            await super().receive(text_data, bytes_data, **kwargs)
+    
+    async def send(self, text_data=None, bytes_data=None, close=False):
+        # Every frame counts towards the send window, as clients count every frame they receive
+        if text_data is not None or bytes_data is not None:
+            self.frames_sent += 1
+        await super().send(text_data=text_data, bytes_data=bytes_data, close=close)
+    
+    async def send_json(self, content, close=False):
+        if self.binary:
+            await self.send(bytes_data=encode_binary(content), close=close)
+        else:
+            await self.send(text_data=await self.encode_json(content), close=close)
+    
+    async def send_snapshot(self):
+        version, snapshot = await database_sync_to_async(get_snapshot_cache().get)(self.playlist, self.binary)
+        await self.send_frame(snapshot)
+        logger.debug("Sent playlist snapshot (version %s) to %s", version, self.channel_name, extra=RATE_LIMITED)
+    
+    def encode_frame(self, content):
+        return encode_binary(content) if self.binary else encode_event(content)
+    
+    async def send_frame(self, frame):
+        """Send an already encoded frame."""
+        if isinstance(frame, bytes):
+            await self.send(bytes_data=frame)
+        else:
+            await self.send(text_data=frame)
     
     @require_websocket_connection
     async def receive_json(self, content):
@@ -42,8 +141,64 @@ class PlaylistConsumer(AsyncJsonWebsocketConsumer):
                 'type': 'pong',
                 'ts': content.get('ts')
             })
-            logger.debug(f"Responded to ping from {self.channel_name}")
+            logger.debug("Responded to ping from %s", self.channel_name, extra=RATE_LIMITED)
+        elif message_type == 'ack':
+            received = content.get('received')
+            if isinstance(received, int):
+                self.frames_acked = max(self.frames_acked, min(received, self.frames_sent))
+                self.acked.set()
+        elif message_type == 'resync':
+            await self.resync()
+    
+    async def resync(self):
+        """Resume streaming after an overflow, starting from a fresh snapshot."""
+        async with self.send_lock:
+            # Events arriving while the snapshot is built are queued and sent after it
+            self.outbound.reset()
+            await self.send_snapshot()
+        logger.info("Resynced %s", self.channel_name)
     
     async def playlist_update(self, event):
-        await self.send_json(event['data'])
-        logger.debug(f"Sent playlist update: {event['data'].get('type')}")
+        if self.outbound.overflowed:
+            return
+        
+        # The frame was encoded once by the publisher for every connection;
+        # messages from older publishers still carry the raw event
+        frame = event.get('binary' if self.binary else 'text')
+        if frame is None:
+            frame = self.encode_frame(delta_event(event['data']) if self.binary else event['data'])
+        
+        key = tuple(event['key']) if event.get('key') else None
+        if not self.outbound.put(frame, key):
+            logger.warning("Outbound queue of %s is full, requiring a resync", self.channel_name)
+            marker = {'type': RESYNC_REQUIRED_EVENT, 'reason': 'slow_consumer'}
+            self.outbound.overflow(self.encode_frame(marker))
+            self.acked.set()
+        self.outbound_ready.set()
+    
+    async def wait_for_window(self):
+        """
+        Wait until fewer than send_window frames are unacknowledged.
+        
+        A window of 0 disables the wait. The resync marker of an overflowed
+        queue is never held back, since a client that stopped acknowledging
+        would otherwise never learn it has to resync.
+        """
+        while self.send_window and self.frames_sent - self.frames_acked >= self.send_window:
+            if self.outbound.overflowed:
+                return
+            self.acked.clear()
+            await self.acked.wait()
+    
+    async def drain_outbound(self):
+        """Write queued frames to the socket as fast as the client acknowledges them."""
+        while True:
+            await self.outbound_ready.wait()
+            self.outbound_ready.clear()
+            while self.outbound:
+                await self.wait_for_window()
+                async with self.send_lock:
+                    if not self.outbound:
+                        break
+                    frame = self.outbound.pop()
+                    await self.send_frame(frame)
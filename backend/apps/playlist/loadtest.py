@@ -0,0 +1,200 @@
+"""
+WebSocket fan-out load test for PlaylistConsumer.
+
+Connects ``clients`` in-process WebSocket clients to a scratch playlist room
+through the channels testing communicator, drives votes through
+PlaylistViewSet at ``rate`` mutations per second and measures how long each
+broadcast takes to reach every client. Run it with
+``manage.py bench_websocket``.
+"""
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from apps.realtime import utils
+from apps.tracks.models import Track
+from .models import Playlist, PlaylistTrack
+from .routing import websocket_urlpatterns
+from .views import PlaylistViewSet
+import asyncio
+import json
+import random
+import time
+import tracemalloc
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Clients acknowledge received frames this often, well inside WEBSOCKET_SEND_WINDOW
+ACK_EVERY = 16
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an unsorted list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class FanoutBenchmark:
+
+    def __init__(self, clients=100, rate=50, duration=10.0, items=50, timeout=10.0):
+        self.clients = clients
+        self.rate = rate
+        self.duration = duration
+        self.items = items
+        self.timeout = timeout
+        self.sent_at = {}
+        self.latencies = []
+        self.delivered = 0
+
+    def run(self):
+        """Set up a scratch room, run the benchmark and return the results as a dict."""
+        playlist, item_ids = self.setup()
+        try:
+            return async_to_sync(self.measure)(playlist, item_ids)
+        finally:
+            self.teardown(playlist)
+
+    def setup(self):
+        slug = f'bench-{uuid.uuid4().hex[:8]}'
+        playlist = Playlist.objects.create(name=f'Benchmark {slug}', slug=slug)
+        tracks = Track.objects.bulk_create([
+            Track(
+                title=f'{slug} track {i}',
+                artist='Benchmark',
+                album=slug,
+                duration_seconds=180,
+                genre='rock'
+            )
+            for i in range(self.items)
+        ])
+        PlaylistTrack.objects.bulk_create([
+            PlaylistTrack(playlist=playlist, track=track, position=float(i))
+            for i, track in enumerate(tracks, start=1)
+        ])
+        return playlist, list(playlist.items.values_list('id', flat=True))
+
+    def teardown(self, playlist):
+        Track.objects.filter(album=playlist.slug).delete()
+        playlist.delete()
+
+    async def measure(self, playlist, item_ids):
+        application = URLRouter(websocket_urlpatterns)
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        communicators = []
+        for _ in range(self.clients):
+            communicator = WebsocketCommunicator(application, f'/ws/playlist/{playlist.slug}/')
+            connected, _ = await communicator.connect(timeout=self.timeout)
+            if not connected:
+                raise RuntimeError(f'Client {len(communicators)} could not connect')
+            await communicator.receive_from(timeout=self.timeout)
+            if settings.WEBSOCKET_SNAPSHOT_ON_CONNECT:
+                await communicator.receive_from(timeout=self.timeout)
+            communicators.append(communicator)
+        connect_seconds = time.perf_counter() - started
+        memory_per_connection = (tracemalloc.get_traced_memory()[0] - baseline) / self.clients
+        tracemalloc.stop()
+
+        last_versions = [0] * self.clients
+        initial_frames = 2 if settings.WEBSOCKET_SNAPSHOT_ON_CONNECT else 1
+        receivers = [
+            asyncio.create_task(self.receive(communicator, last_versions, index, initial_frames))
+            for index, communicator in enumerate(communicators)
+        ]
+
+        send_group_event = utils.send_group_event
+        utils.send_group_event = self.record_broadcast(send_group_event)
+        try:
+            streaming = time.perf_counter()
+            mutations, mutation_seconds = await self.mutate(playlist, item_ids)
+            final_version = max(self.sent_at, default=0)
+            deadline = time.perf_counter() + self.timeout
+            while min(last_versions) < final_version and time.perf_counter() < deadline:
+                await asyncio.sleep(0.01)
+            delivery_seconds = time.perf_counter() - streaming
+        finally:
+            utils.send_group_event = send_group_event
+            for receiver in receivers:
+                receiver.cancel()
+            await asyncio.gather(*receivers, return_exceptions=True)
+            for communicator in communicators:
+                await communicator.disconnect()
+
+        return {
+            'started_at': timezone.now().isoformat(),
+            'clients': self.clients,
+            'target_rate': self.rate,
+            'duration_seconds': self.duration,
+            'channel_layer': type(get_channel_layer()).__name__,
+            'mutations': mutations,
+            'mutations_per_second': round(mutations / mutation_seconds, 1),
+            'messages_expected': len(self.sent_at) * self.clients,
+            'messages_delivered': self.delivered,
+            'messages_per_second': round(self.delivered / delivery_seconds, 1),
+            'latency_ms': {
+                'p50': self.milliseconds(percentile(self.latencies, 0.50)),
+                'p90': self.milliseconds(percentile(self.latencies, 0.90)),
+                'p99': self.milliseconds(percentile(self.latencies, 0.99)),
+                'max': self.milliseconds(max(self.latencies, default=None)),
+            },
+            'memory_per_connection_bytes': round(memory_per_connection),
+            'connect_seconds': round(connect_seconds, 3),
+        }
+
+    def record_broadcast(self, send_group_event):
+        """Wrap send_group_event to note when each version is handed to the channel layer."""
+        def send(group, data):
+            if 'version' in data:
+                self.sent_at[data['version']] = time.perf_counter()
+            return send_group_event(group, data)
+        return send
+
+    async def mutate(self, playlist, item_ids):
+        """Vote at a fixed rate for ``duration`` seconds; return the count and elapsed time."""
+        view = PlaylistViewSet.as_view({'post': 'vote'})
+        factory = APIRequestFactory()
+
+        def vote(pk):
+            request = factory.post(
+                f'/api/rooms/{playlist.slug}/playlist/{pk}/vote/', {'direction': 'up'}, format='json'
+            )
+            response = view(request, room=playlist.slug, pk=pk)
+            if response.status_code != 200:
+                logger.warning("Benchmark vote failed with status %s", response.status_code)
+
+        total = max(1, int(self.rate * self.duration))
+        started = time.perf_counter()
+        for index in range(total):
+            delay = started + index / self.rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await database_sync_to_async(vote)(random.choice(item_ids))
+        return total, time.perf_counter() - started
+
+    async def receive(self, communicator, last_versions, index, frames):
+        while True:
+            frame = await communicator.receive_from(timeout=None)
+            received = time.perf_counter()
+            frames += 1
+            if frames % ACK_EVERY == 0:
+                await communicator.send_json_to({'type': 'ack', 'received': frames})
+            version = json.loads(frame).get('version')
+            self.delivered += 1
+            if version in self.sent_at:
+                self.latencies.append(received - self.sent_at[version])
+            if version is not None:
+                last_versions[index] = max(last_versions[index], version)
+
+    @staticmethod
+    def milliseconds(seconds):
+        return None if seconds is None else round(seconds * 1000, 3)
@@ -0,0 +1,70 @@
+"""
+Management command to benchmark the REST hot paths against their query budgets.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from apps.playlist.benchmarks import ApiBenchmark, over_budget
+from apps.realtime.utils import get_event_publisher
+import json
+
+
+class Command(BaseCommand):
+    help = 'Time the playlist and track endpoints on seeded playlists and check their query counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 100000],
+            help='Playlist sizes to seed, one scratch room per size',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Requests per endpoint and size',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results as JSON to this file instead of stdout',
+        )
+
+    def handle(self, *args, **options):
+        # Measure the database path: no response cache, broadcasts to an in-memory layer
+        overrides = {
+            'RESPONSE_CACHE_TTL': 0,
+            'CHANNEL_LAYERS': {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+            'BROADCAST_ASYNC': False,
+        }
+
+        runs = []
+        get_event_publisher.cache_clear()
+        try:
+            with override_settings(**overrides):
+                for size in options['sizes']:
+                    self.stderr.write(f'Benchmarking a playlist of {size} tracks...')
+                    runs.append(ApiBenchmark(size=size, iterations=options['iterations']).run())
+        finally:
+            get_event_publisher.cache_clear()
+
+        report = json.dumps({'runs': runs}, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(report + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote results to {options['output']}"))
+        else:
+            self.stdout.write(report)
+
+        failures = []
+        for run in runs:
+            summary = ', '.join(
+                f"{name} {endpoint['p50_ms']}ms/{endpoint['queries']}q"
+                for name, endpoint in run['endpoints'].items()
+            )
+            self.stdout.write(f"{run['size']} tracks: {summary}")
+            failures += [f"{name} at {run['size']} tracks" for name in over_budget(run)]
+
+        if failures:
+            raise CommandError(f"Query budget exceeded: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('All endpoints are within their query budgets'))
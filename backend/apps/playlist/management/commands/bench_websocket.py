@@ -0,0 +1,86 @@
+"""
+Management command to load-test WebSocket fan-out of playlist events.
+"""
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from apps.playlist.loadtest import FanoutBenchmark
+from apps.realtime.utils import get_event_publisher
+import json
+
+
+class Command(BaseCommand):
+    help = 'Measure broadcast-to-delivery latency and throughput for N WebSocket clients'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clients',
+            type=int,
+            default=100,
+            help='Number of simulated WebSocket clients',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=50,
+            help='Votes per second driven through the playlist API',
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10,
+            help='Seconds to keep voting',
+        )
+        parser.add_argument(
+            '--items',
+            type=int,
+            default=50,
+            help='Number of tracks in the scratch playlist room',
+        )
+        parser.add_argument(
+            '--layer',
+            choices=['memory', 'configured'],
+            default='memory',
+            help="'memory' uses InMemoryChannelLayer; 'configured' uses CHANNEL_LAYERS (e.g. a local Redis)",
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results as JSON to this file instead of stdout',
+        )
+    
+    def handle(self, *args, **options):
+        benchmark = FanoutBenchmark(
+            clients=options['clients'],
+            rate=options['rate'],
+            duration=options['duration'],
+            items=options['items'],
+        )
+        
+        overrides = {}
+        if options['layer'] == 'memory':
+            # The in-memory layer only works on one event loop, so send synchronously
+            overrides = {
+                'CHANNEL_LAYERS': {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+                'BROADCAST_ASYNC': False,
+            }
+        
+        get_event_publisher.cache_clear()
+        try:
+            with override_settings(**overrides):
+                results = benchmark.run()
+        finally:
+            get_event_publisher.cache_clear()
+        
+        report = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(report + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote results to {options['output']}"))
+        else:
+            self.stdout.write(report)
+        
+        latency = results['latency_ms']
+        self.stdout.write(self.style.SUCCESS(
+            f"{results['clients']} client(s): p50 {latency['p50']}ms, p99 {latency['p99']}ms, "
+            f"{results['messages_per_second']} msg/s, "
+            f"{results['memory_per_connection_bytes'] / 1024:.1f} KiB per connection"
+        ))
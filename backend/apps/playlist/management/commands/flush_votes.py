@@ -0,0 +1,15 @@
+"""
+Management command to write pending aggregated votes to the database.
+"""
+from django.core.management.base import BaseCommand
+from apps.playlist.votes import get_vote_aggregator
+
+
+class Command(BaseCommand):
+    help = 'Flush pending aggregated votes to the playlist'
+    
+    def handle(self, *args, **kwargs):
+        updated = get_vote_aggregator().flush()
+        self.stdout.write(
+            self.style.SUCCESS(f'Flushed votes for {updated} playlist track(s)')
+        )
@@ -0,0 +1,48 @@
+"""
+Management command to renumber playlist positions.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from apps.playlist.models import Playlist
+from apps.playlist.services import (
+    assign_ranks_from_positions,
+    broadcast_reindexed,
+    rebalance_positions,
+)
+
+
+class Command(BaseCommand):
+    help = 'Renumber playlist positions to 1.0, 2.0, ... and notify connected clients'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ranks',
+            action='store_true',
+            help='Regenerate rank keys from the current float positions instead',
+        )
+        parser.add_argument(
+            '--room',
+            help='Slug of the playlist room to renumber (default: every room)',
+        )
+    
+    def handle(self, *args, **options):
+        playlists = Playlist.objects.all()
+        if options['room']:
+            playlists = playlists.filter(slug=options['room'])
+            if not playlists.exists():
+                raise CommandError(f"Playlist room '{options['room']}' does not exist")
+        
+        for playlist in playlists:
+            if options['ranks']:
+                count = assign_ranks_from_positions(playlist)
+                self.stdout.write(
+                    self.style.SUCCESS(f'Assigned rank keys to {count} track(s) in {playlist.slug}')
+                )
+                continue
+            
+            positions = rebalance_positions(playlist)
+            if positions:
+                broadcast_reindexed(playlist, positions)
+            
+            self.stdout.write(
+                self.style.SUCCESS(f'Rebalanced {len(positions)} position(s) in {playlist.slug}')
+            )
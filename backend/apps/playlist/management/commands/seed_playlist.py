@@ -2,8 +2,8 @@
 Management command to seed initial playlist with sample tracks.
 """
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from apps.playlist.models import PlaylistTrack
+from apps.playlist.models import DEFAULT_PLAYLIST_SLUG, Playlist, PlaylistTrack
+from apps.playlist.playback import play_item
 from apps.tracks.models import Track
 import random
 
@@ -11,10 +11,22 @@ import random
 class Command(BaseCommand):
     help = 'Seed the playlist with initial tracks'
     
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--room',
+            default=DEFAULT_PLAYLIST_SLUG,
+            help='Slug of the playlist room to seed (created if missing)',
+        )
+    
+    def handle(self, *args, **options):
         """Create sample playlist if it doesn't exist."""
         
-        if PlaylistTrack.objects.exists():
+        playlist, _ = Playlist.objects.get_or_create(
+            slug=options['room'],
+            defaults={'name': options['room'].replace('-', ' ').title()}
+        )
+        
+        if playlist.items.exists():
             self.stdout.write(self.style.WARNING('Playlist already exists. Skipping seed.'))
             return
         
@@ -33,6 +45,7 @@ class Command(BaseCommand):
         playlist_items = []
         for idx, track in enumerate(selected_tracks, start=1):
             playlist_item = PlaylistTrack(
+                playlist=playlist,
                 track=track,
                 position=float(idx),
                 votes=random.randint(-2, 10),
@@ -45,10 +58,7 @@ class Command(BaseCommand):
         
         # Set first track as playing
         if playlist_items:
-            first_item = PlaylistTrack.objects.first()
-            first_item.is_playing = True
-            first_item.played_at = timezone.now()
-            first_item.save()
+            play_item(playlist, playlist.items.first())
         
         self.stdout.write(
             self.style.SUCCESS(f'Successfully created playlist with {len(playlist_items)} tracks')
@@ -0,0 +1,65 @@
+# Generated by Django 5.0 on 2026-10-17 00:32
+
+from django.db import migrations, models
+
+
+# Copied from apps.playlist.services so this migration does not depend on
+# live code. Keys are only ever appended here, so the integer part is
+# incremented and never needs a fraction.
+RANK_DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+RANK_ZERO = RANK_DIGITS[0]
+
+
+def increment_rank(integer):
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        d = RANK_DIGITS.index(digits[i]) + 1
+        if d < len(RANK_DIGITS):
+            digits[i] = RANK_DIGITS[d]
+            return head + ''.join(digits)
+        digits[i] = RANK_ZERO
+
+    # Every digit overflowed: the next, one digit longer integer starts at zero
+    if head == 'z':
+        raise ValueError("Ran out of rank keys")
+    return chr(ord(head) + 1) + ''.join(digits) + RANK_ZERO
+
+
+def generate_rank_keys(count):
+    """Return ``count`` increasing rank keys, starting from the first one."""
+    keys = []
+    key = 'a' + RANK_ZERO
+    for _ in range(count):
+        keys.append(key)
+        key = increment_rank(key)
+    return keys
+
+
+def assign_ranks(apps, schema_editor):
+    """Derive rank keys from the existing float positions."""
+    PlaylistTrack = apps.get_model('playlist', 'PlaylistTrack')
+    items = list(PlaylistTrack.objects.order_by('position', 'id').only('id'))
+    for item, key in zip(items, generate_rank_keys(len(items))):
+        item.rank = key
+    PlaylistTrack.objects.bulk_update(items, ['rank'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playlist', '0001_initial'),
+        ('tracks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playlisttrack',
+            name='rank',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.RunPython(assign_ranks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='playlisttrack',
+            index=models.Index(fields=['rank'], name='playlist_pl_rank_048dd7_idx'),
+        ),
+    ]
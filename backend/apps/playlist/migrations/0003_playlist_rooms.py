@@ -0,0 +1,82 @@
+# Generated by Django 5.0 on 2026-10-17 00:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def assign_default_playlist(apps, schema_editor):
+    """Move every existing playlist item into the default room."""
+    Playlist = apps.get_model('playlist', 'Playlist')
+    PlaylistTrack = apps.get_model('playlist', 'PlaylistTrack')
+    playlist, _ = Playlist.objects.get_or_create(slug='default', defaults={'name': 'Default'})
+    PlaylistTrack.objects.update(playlist=playlist)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playlist', '0002_playlisttrack_rank'),
+        ('tracks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Playlist',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='playlisttrack',
+            name='playlist_pl_positio_8e5e4e_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='playlisttrack',
+            name='playlist_pl_is_play_6d3b42_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='playlisttrack',
+            name='playlist_pl_votes_051786_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='playlisttrack',
+            name='playlist_pl_rank_048dd7_idx',
+        ),
+        migrations.AddField(
+            model_name='playlisttrack',
+            name='playlist',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='playlist.playlist'),
+        ),
+        migrations.RunPython(assign_default_playlist, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='playlisttrack',
+            name='playlist',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='playlist.playlist'),
+        ),
+        migrations.AddIndex(
+            model_name='playlisttrack',
+            index=models.Index(fields=['playlist', 'position'], name='playlist_pl_playlis_4f6e2c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playlisttrack',
+            index=models.Index(fields=['playlist', 'rank'], name='playlist_pl_playlis_0b2767_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playlisttrack',
+            index=models.Index(fields=['playlist', 'is_playing'], name='playlist_pl_playlis_79b6a6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playlisttrack',
+            index=models.Index(fields=['playlist', '-votes'], name='playlist_pl_playlis_556bcb_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='playlisttrack',
+            constraint=models.UniqueConstraint(fields=('playlist', 'track'), name='unique_track_per_playlist'),
+        ),
+    ]
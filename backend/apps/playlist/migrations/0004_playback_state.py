@@ -0,0 +1,50 @@
+# Generated by Django 5.0 on 2026-10-17 01:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_playing_items(apps, schema_editor):
+    """Give every room with a playing item a playback state naming the latest one."""
+    PlaybackState = apps.get_model('playlist', 'PlaybackState')
+    PlaylistTrack = apps.get_model('playlist', 'PlaylistTrack')
+    playing = PlaylistTrack.objects.filter(is_playing=True).order_by('playlist_id', '-played_at')
+    seen = set()
+    for item in playing:
+        if item.playlist_id in seen:
+            continue
+        seen.add(item.playlist_id)
+        PlaybackState.objects.create(playlist_id=item.playlist_id, item=item, started_at=item.played_at)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playlist', '0003_playlist_rooms'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaybackState',
+            fields=[
+                ('playlist', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='playback', serialize=False, to='playlist.playlist')),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('offset', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='playbackstate',
+            name='item',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='playlist.playlisttrack'),
+        ),
+        migrations.RunPython(copy_playing_items, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='playlisttrack',
+            name='playlist_pl_playlis_79b6a6_idx',
+        ),
+        migrations.RemoveField(
+            model_name='playlisttrack',
+            name='is_playing',
+        ),
+    ]
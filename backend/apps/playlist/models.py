@@ -3,45 +3,136 @@ from django.core.exceptions import ValidationError
 from apps.tracks.models import Track
 
 
+DEFAULT_PLAYLIST_SLUG = 'default'
+
+
+class PlaylistManager(models.Manager):
+    
+    def get_default(self):
+        """Return the default room, creating it if needed."""
+        playlist, _ = self.get_or_create(
+            slug=DEFAULT_PLAYLIST_SLUG,
+            defaults={'name': 'Default'}
+        )
+        return playlist
+
+
+class Playlist(models.Model):
+    """A room with its own playlist and WebSocket channel group."""
+    
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=50, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    objects = PlaylistManager()
+    
+    class Meta:
+        ordering = ['created_at']
+    
+    def __str__(self):
+        return self.name
+
+
 class PlaylistTrack(models.Model):    
+    playlist = models.ForeignKey(
+        Playlist,
+        on_delete=models.CASCADE,
+        related_name='items'
+    )
     track = models.ForeignKey(Track, on_delete=models.CASCADE, related_name='playlist_items')
     position = models.FloatField(default=1.0, db_index=True)
+    rank = models.CharField(max_length=255, blank=True, default='')
     votes = models.IntegerField(default=0)
     added_by = models.CharField(max_length=100, default="Anonymous")
     added_at = models.DateTimeField(auto_now_add=True)
-    is_playing = models.BooleanField(default=False, db_index=True)
     played_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         ordering = ['position']
+        # Every playlist query is scoped to one room, so indexes lead with it
         indexes = [
-            models.Index(fields=['position']),
-            models.Index(fields=['is_playing']),
-            models.Index(fields=['-votes']),
+            models.Index(fields=['playlist', 'position']),
+            models.Index(fields=['playlist', 'rank']),
+            models.Index(fields=['playlist', '-votes']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['playlist', 'track'], name='unique_track_per_playlist'),
         ]
     
     def clean(self):
         if self.pk is None:  # Only check on creation
-            if PlaylistTrack.objects.filter(track=self.track).exists():
+            if PlaylistTrack.objects.filter(playlist_id=self.playlist_id, track=self.track).exists():
                 raise ValidationError({
                     'track': 'This track is already in the playlist'
                 })
     
     def save(self, *args, **kwargs):
         if self.pk is None:  # Only on creation
-            self.full_clean()
+            # Callers outside the room-scoped API land in the default room
+            if self.playlist_id is None:
+                self.playlist = Playlist.objects.get_default()
+            # clean() already reports duplicates with a friendlier message
+            self.full_clean(validate_constraints=False)
         super().save(*args, **kwargs)
     
-    def set_as_playing(self):
-        from django.utils import timezone
+    @property
+    def is_playing(self):
+        """Whether this is the room's current item and it is not paused or stopped."""
+        from .playback import get_playback_cache
         
-        # Set all other tracks to not playing
-        PlaylistTrack.objects.exclude(pk=self.pk).update(is_playing=False)
+        return get_playback_cache().get(self.playlist_id).playing_id == self.pk
+    
+    def set_as_playing(self):
+        from .playback import play_item
         
-        # Set this track as playing
-        self.is_playing = True
-        self.played_at = timezone.now()
-        self.save()
+        return play_item(self.playlist, self)
     
     def __str__(self):
         return f"{self.track.title} at position {self.position}"
+
+
+class PlaybackState(models.Model):
+    """
+    What a room is playing: one row per playlist, updated in place.
+    
+    The current item has been playing since ``started_at``, from ``offset``
+    seconds into the track. A paused item keeps its offset and has no
+    ``started_at``; when stopped there is no item.
+    """
+    
+    playlist = models.OneToOneField(
+        Playlist,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='playback'
+    )
+    item = models.ForeignKey(
+        PlaylistTrack,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+'
+    )
+    started_at = models.DateTimeField(null=True, blank=True)
+    offset = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    @property
+    def is_playing(self):
+        return self.item_id is not None and self.started_at is not None
+    
+    @property
+    def playing_id(self):
+        """Id of the item that is playing, or None when paused or stopped."""
+        return self.item_id if self.is_playing else None
+    
+    def elapsed(self, now):
+        """Seconds into the current item at ``now``."""
+        if self.started_at is None:
+            return self.offset
+        return self.offset + (now - self.started_at).total_seconds()
+    
+    def __str__(self):
+        if self.item_id is None:
+            return f"{self.playlist_id}: stopped"
+        return f"{self.playlist_id}: item {self.item_id} {'playing' if self.is_playing else 'paused'}"
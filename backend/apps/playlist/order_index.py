@@ -0,0 +1,192 @@
+"""
+In-memory play order of each playlist room.
+
+An OrderIndex keeps a room's items as sorted sort keys, by position (or rank
+key in rank ordering mode) or by votes when ``by_votes`` is set, so the item
+before or after any other is found with one bisect instead of an ORDER BY
+over the room. A second sorted array holds only the items that were never
+played. The index is built once per process with a single unordered query
+and then kept current from the room's changelog: every event broadcast
+since the version it last applied is replayed into it, and it is only
+rebuilt when the changelog no longer reaches back that far.
+
+The vote-ordered index also serves ``?order=votes`` listings, a page at a
+time from a cursor key, and gives the rank a vote moves an item to.
+"""
+from bisect import bisect_left, bisect_right, insort
+from functools import lru_cache
+from django.conf import settings
+from apps.realtime.changelog import get_changelog
+from .models import PlaylistTrack
+from .votes import get_vote_aggregator
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+RANK_EVENT = 'track.ranked'
+
+# Events that carry a full item whose sort key may have changed
+ITEM_EVENTS = ('track.added', 'track.moved', 'track.voted')
+
+
+class OrderIndex:
+
+    def __init__(self, room, by_votes=False):
+        self.room = room
+        self.by_votes = by_votes
+        self.rank_mode = settings.PLAYLIST_ORDERING == 'rank'
+        self.version = None
+        self._keys = []
+        self._unplayed = []
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def key(self, row):
+        """Sort key of an item row; the id comes last so every key is unique."""
+        base = row['rank'] if self.rank_mode else float(row['position'])
+        if self.by_votes:
+            return (-row['votes'], base, row['id'])
+        return (base, row['id'])
+
+    def sync(self, playlist, pending_votes=None):
+        """
+        Apply the room's changelog events since the last sync, rebuilding if they are gone.
+
+        A rebuild adds ``pending_votes`` (read from the vote aggregator if not
+        given) to the stored counts.
+        """
+        changelog = get_changelog()
+        with self._lock:
+            if self.version is not None:
+                current, events = changelog.since(self.room, self.version)
+                if events is not None:
+                    for event in events:
+                        self._apply(event)
+                    self.version = current
+                    return
+            # Read the version first: events committed while loading are
+            # replayed on the next sync, which is harmless
+            self._build(playlist, changelog.current_version(self.room), pending_votes)
+
+    def after(self, pk, unplayed=False):
+        """Id of the item following ``pk`` (the first item if ``pk`` is not in the room), or None."""
+        with self._lock:
+            keys = self._unplayed if unplayed else self._keys
+            entry = self._items.get(pk)
+            if entry is None:
+                return keys[0][-1] if keys else None
+            i = bisect_right(keys, entry[0])
+            return keys[i][-1] if i < len(keys) else None
+
+    def before(self, pk, unplayed=False):
+        """Id of the item preceding ``pk`` (the last item if ``pk`` is not in the room), or None."""
+        with self._lock:
+            keys = self._unplayed if unplayed else self._keys
+            entry = self._items.get(pk)
+            if entry is None:
+                return keys[-1][-1] if keys else None
+            i = bisect_left(keys, entry[0])
+            return keys[i - 1][-1] if i > 0 else None
+
+    def rank_change(self, pk, key):
+        """
+        Return ``(from, to)`` 1-based ranks if ``pk`` took sort key ``key``, or None.
+
+        None means the item is unknown or its rank would not change.
+        """
+        with self._lock:
+            entry = self._items.get(pk)
+            if entry is None:
+                return None
+            old = bisect_left(self._keys, entry[0])
+            new = bisect_left(self._keys, key)
+            # Moving down, the item's own old key no longer sits in front of it
+            if key > entry[0]:
+                new -= 1
+            return (old + 1, new + 1) if new != old else None
+
+    def page(self, cursor=None, limit=100, reverse=False):
+        """
+        Return ``(keys, more)``: up to ``limit`` keys after ``cursor`` (before it when ``reverse``).
+
+        ``more`` tells whether there are keys beyond the page in that direction.
+        """
+        with self._lock:
+            keys = self._keys
+            if reverse:
+                end = len(keys) if cursor is None else bisect_left(keys, cursor)
+                start = max(end - limit, 0)
+                return keys[start:end], start > 0
+            start = 0 if cursor is None else bisect_right(keys, cursor)
+            return keys[start:start + limit], start + limit < len(keys)
+
+    def _build(self, playlist, version, pending=None):
+        started = time.perf_counter()
+        if pending is None:
+            pending = get_vote_aggregator().pending()
+        rows = (
+            PlaylistTrack.objects.filter(playlist=playlist)
+            .order_by()
+            .values('id', 'position', 'rank', 'votes', 'played_at')
+        )
+
+        items = {}
+        for row in rows:
+            row['votes'] += pending.get(row['id'], 0)
+            items[row['id']] = (self.key(row), row['played_at'] is not None)
+        self._items = items
+        self._keys = sorted(key for key, _ in items.values())
+        self._unplayed = sorted(key for key, played in items.values() if not played)
+        self.version = version
+
+        logger.info(
+            "Built %s order index of room %s: %s item(s) in %.0fms",
+            'vote' if self.by_votes else 'position', self.room, len(items),
+            (time.perf_counter() - started) * 1000
+        )
+
+    def _apply(self, event):
+        payload = event.get('payload') or {}
+        if event['type'] in ITEM_EVENTS:
+            self._put(payload['id'], self.key(payload), payload['played_at'] is not None)
+        elif event['type'] == 'track.removed':
+            self._discard(payload['id'])
+        elif event['type'] == 'playlist.reindexed':
+            field = 'ranks' if self.rank_mode else 'positions'
+            for pk, base in payload.get(field, {}).items():
+                entry = self._items.get(int(pk))
+                if entry is not None:
+                    key, played = entry
+                    base = base if self.rank_mode else float(base)
+                    self._put(int(pk), (*key[:-2], base, int(pk)), played)
+        elif event['type'] == 'playback.state' and payload.get('is_playing'):
+            entry = self._items.get(payload['item_id'])
+            if entry is not None and not entry[1]:
+                self._put(payload['item_id'], entry[0], True)
+
+    def _put(self, pk, key, played):
+        self._discard(pk)
+        self._items[pk] = (key, played)
+        insort(self._keys, key)
+        if not played:
+            insort(self._unplayed, key)
+
+    def _discard(self, pk):
+        entry = self._items.pop(pk, None)
+        if entry is None:
+            return
+        key, played = entry
+        del self._keys[bisect_left(self._keys, key)]
+        if not played:
+            del self._unplayed[bisect_left(self._unplayed, key)]
+
+
+@lru_cache(maxsize=None)
+def get_order_index(room, by_votes=False):
+    """Return the process-wide order index of a room; call sync() before reading it."""
+    return OrderIndex(room, by_votes)
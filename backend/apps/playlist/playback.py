@@ -0,0 +1,144 @@
+"""
+Playback state of each playlist room.
+
+What a room is playing is one PlaybackState row per playlist, written in
+place, instead of an ``is_playing`` flag on every item. Each process caches
+the rows in memory. Changes bump a per-room generation counter (in Redis, or
+in-process without it) once they commit, and a cached row is only used while
+its generation is current, so other processes reload it on their next read.
+Every change is broadcast as one ``playback.state`` event.
+"""
+from functools import lru_cache
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from apps.tracks.serializers import datetime_formatter
+from core.redis_client import get_redis_client
+from .models import PlaybackState
+import threading
+
+PLAYBACK_EVENT = 'playback.state'
+
+
+class PlaybackCache:
+    """In-process cache of PlaybackState rows, checked against a shared generation per room."""
+
+    def __init__(self, client=None):
+        self.client = client
+        self._entries = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def generation_key(playlist_id):
+        return f'playlist:{playlist_id}:playback'
+
+    def generation(self, playlist_id):
+        if self.client is not None:
+            return int(self.client.get(self.generation_key(playlist_id)) or 0)
+        return self._generations.get(playlist_id, 0)
+
+    def get(self, playlist_id):
+        """Return the room's PlaybackState (unsaved and stopped if it has none yet)."""
+        generation = self.generation(playlist_id)
+        entry = self._entries.get(playlist_id)
+        if entry is not None and entry[0] == generation:
+            return entry[1]
+
+        state = PlaybackState.objects.filter(playlist_id=playlist_id).first()
+        if state is None:
+            state = PlaybackState(playlist_id=playlist_id)
+        self._entries[playlist_id] = (generation, state)
+        return state
+
+    def changed(self, playlist_id):
+        """Drop the cached row now and make every process reload it once the change commits."""
+        self._entries.pop(playlist_id, None)
+        transaction.on_commit(lambda: self._bump(playlist_id))
+
+    def _bump(self, playlist_id):
+        if self.client is not None:
+            self.client.incr(self.generation_key(playlist_id))
+        else:
+            with self._lock:
+                self._generations[playlist_id] = self._generations.get(playlist_id, 0) + 1
+        self._entries.pop(playlist_id, None)
+
+
+@lru_cache(maxsize=None)
+def get_playback_cache():
+    """Return the process-wide playback cache."""
+    # Generations are shared state like the changelog, so they live in the same store
+    client = get_redis_client() if settings.CHANGELOG_BACKEND == 'redis' else None
+    return PlaybackCache(client)
+
+
+def playback_payload(state):
+    """Serialize a PlaybackState for the ``playback.state`` event and snapshots."""
+    format_datetime = datetime_formatter()
+    return {
+        'item_id': state.item_id,
+        'is_playing': state.is_playing,
+        'started_at': format_datetime(state.started_at),
+        'offset': state.offset,
+        'updated_at': format_datetime(state.updated_at),
+    }
+
+
+def play_item(playlist, item):
+    """
+    Make ``item`` the room's playing item and return the new state.
+
+    Playing the paused current item resumes it from its offset; any other
+    item starts from the beginning and is stamped with ``played_at``.
+    """
+    cache = get_playback_cache()
+    current = cache.get(playlist.pk)
+    now = timezone.now()
+
+    resume = current.item_id == item.pk and not current.is_playing
+    state = PlaybackState(
+        playlist_id=playlist.pk,
+        item_id=item.pk,
+        started_at=now,
+        offset=current.offset if resume else 0.0
+    )
+    state.save()
+    if not resume:
+        item.played_at = now
+        item.save(update_fields=['played_at'])
+
+    cache.changed(playlist.pk)
+    return state
+
+
+def pause_playback(playlist):
+    """Pause the playing item, keeping its offset; returns the new state or None if nothing was playing."""
+    cache = get_playback_cache()
+    current = cache.get(playlist.pk)
+    if not current.is_playing:
+        return None
+
+    state = PlaybackState(
+        playlist_id=playlist.pk,
+        item_id=current.item_id,
+        started_at=None,
+        offset=current.elapsed(timezone.now())
+    )
+    state.save()
+
+    cache.changed(playlist.pk)
+    return state
+
+
+def stop_playback(playlist):
+    """Clear the current item; returns the new state or None if nothing was playing or paused."""
+    now = timezone.now()
+    updated = PlaybackState.objects.filter(playlist=playlist, item__isnull=False).update(
+        item=None, started_at=None, offset=0.0, updated_at=now
+    )
+    if not updated:
+        return None
+
+    get_playback_cache().changed(playlist.pk)
+    return PlaybackState(playlist_id=playlist.pk, updated_at=now)
@@ -3,4 +3,5 @@ from . import consumers
 
 websocket_urlpatterns = [
     re_path(r'ws/playlist/$', consumers.PlaylistConsumer.as_asgi()),
+    re_path(r'ws/playlist/(?P<room>[-\w]+)/$', consumers.PlaylistConsumer.as_asgi()),
 ]
@@ -1,10 +1,12 @@
 from rest_framework import serializers
-from .models import PlaylistTrack
-from apps.tracks.serializers import TrackSerializer
-from apps.tracks.models import Track
+from django.utils.text import slugify
+from .models import Playlist, PlaylistTrack
+from apps.tracks.serializers import TrackSerializer, datetime_formatter
+from apps.tracks.models import Track, format_duration
 
 class PlaylistTrackSerializer(serializers.ModelSerializer):
     track = TrackSerializer(read_only=True)
+    is_playing = serializers.SerializerMethodField()
     track_id = serializers.PrimaryKeyRelatedField(
         queryset=PlaylistTrack.objects.none(),
         source='track',
@@ -15,6 +17,20 @@ class PlaylistTrackSerializer(serializers.ModelSerializer):
         super().__init__(*args, **kwargs)
         self.fields['track_id'].queryset = Track.objects.all()
     
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Include votes that are still waiting to be flushed to the database
+        pending_votes = self.context.get('pending_votes')
+        if pending_votes:
+            data['votes'] += pending_votes.get(instance.pk, 0)
+        return data
+    
+    def get_is_playing(self, instance):
+        # Views pass the playing item id once instead of a cache lookup per item
+        if 'playing_id' in self.context:
+            return instance.pk == self.context['playing_id']
+        return instance.is_playing
+    
     class Meta:
         model = PlaylistTrack
         fields = [
@@ -22,14 +38,151 @@ class PlaylistTrackSerializer(serializers.ModelSerializer):
             'track',
             'track_id',
             'position',
+            'rank',
             'votes',
             'added_by',
             'added_at',
             'is_playing',
             'played_at',
         ]
-        read_only_fields = ['id', 'added_at', 'played_at']
+        read_only_fields = ['id', 'rank', 'added_at', 'played_at']
+
+
+class PlaylistTrackReadSerializer:
+    """
+    Read-only fast path with exactly the output of PlaylistTrackSerializer.
+
+    Representations are built straight from ``.values()`` rows (or from an
+    already loaded instance) instead of running the nested DRF serializers
+    field by field, which makes large playlist lists several times cheaper.
+    Votes still waiting to be flushed are added like the DRF serializer does,
+    and ``is_playing`` is true for the item with id ``playing_id``.
+    """
+    
+    fields = (
+        'id',
+        'position',
+        'rank',
+        'votes',
+        'added_by',
+        'added_at',
+        'played_at',
+        'track_id',
+        'track__title',
+        'track__artist',
+        'track__album',
+        'track__duration_seconds',
+        'track__genre',
+        'track__cover_url',
+        'track__created_at',
+    )
+    
+    def __init__(self, pending_votes=None, playing_id=None):
+        self.pending_votes = pending_votes or {}
+        self.playing_id = playing_id
+        self.format_datetime = datetime_formatter()
+    
+    def values(self, queryset):
+        return queryset.values(*self.fields)
+    
+    def row_from_instance(self, instance):
+        """Build the ``.values()`` row of an instance whose track is loaded."""
+        row = {field: getattr(instance, field) for field in self.fields if '__' not in field}
+        row.update(
+            (field, getattr(instance.track, field.split('__', 1)[1]))
+            for field in self.fields if '__' in field
+        )
+        return row
+    
+    def to_representation(self, row):
+        format_datetime = self.format_datetime
+        duration = row['track__duration_seconds']
+        return {
+            'id': row['id'],
+            'track': {
+                'id': row['track_id'],
+                'title': row['track__title'],
+                'artist': row['track__artist'],
+                'album': row['track__album'],
+                'duration_seconds': duration,
+                'duration_formatted': format_duration(duration),
+                'genre': row['track__genre'],
+                'cover_url': row['track__cover_url'],
+                'created_at': format_datetime(row['track__created_at']),
+            },
+            'position': float(row['position']),
+            'rank': row['rank'],
+            'votes': row['votes'] + self.pending_votes.get(row['id'], 0),
+            'added_by': row['added_by'],
+            'added_at': format_datetime(row['added_at']),
+            'is_playing': row['id'] == self.playing_id,
+            'played_at': format_datetime(row['played_at']),
+        }
+    
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+    
+    def serialize_instance(self, instance):
+        return self.to_representation(self.row_from_instance(instance))
+
+
+class PlaylistSerializer(serializers.ModelSerializer):
+    
+    class Meta:
+        model = Playlist
+        fields = ['id', 'name', 'slug', 'created_at']
+        read_only_fields = ['id', 'created_at']
+        extra_kwargs = {'slug': {'required': False}}
+    
+    def validate(self, attrs):
+        # Derive the room slug from its name when none is given
+        if not attrs.get('slug'):
+            attrs['slug'] = slugify(attrs.get('name', ''))
+            if not attrs['slug'] or Playlist.objects.filter(slug=attrs['slug']).exists():
+                raise serializers.ValidationError({'slug': 'Choose a unique slug for this room.'})
+        return attrs
 
 
 class VoteSerializer(serializers.Serializer):
     direction = serializers.ChoiceField(choices=['up', 'down'])
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=['add', 'remove', 'move', 'vote'])
+    id = serializers.IntegerField(required=False)
+    track_id = serializers.IntegerField(required=False)
+    added_by = serializers.CharField(required=False, default='Anonymous', max_length=100)
+    position = serializers.FloatField(required=False)
+    after_id = serializers.IntegerField(required=False)
+    before_id = serializers.IntegerField(required=False)
+    direction = serializers.ChoiceField(choices=['up', 'down'], required=False)
+    
+    REQUIRED_FIELDS = {
+        'add': ['track_id'],
+        'remove': ['id'],
+        'move': ['id'],
+        'vote': ['id', 'direction'],
+    }
+    
+    def validate(self, attrs):
+        missing = [f for f in self.REQUIRED_FIELDS[attrs['op']] if f not in attrs]
+        if missing:
+            raise serializers.ValidationError(
+                {field: 'This field is required.' for field in missing}
+            )
+        if attrs['op'] == 'move' and not ({'position', 'after_id', 'before_id'} & attrs.keys()):
+            raise serializers.ValidationError('move requires position, after_id or before_id.')
+        return attrs
+
+
+class BatchSerializer(serializers.Serializer):
+    MAX_OPERATIONS = 500
+    
+    operations = BatchOperationSerializer(many=True, allow_empty=False)
+    
+    def validate_operations(self, value):
+        if len(value) > self.MAX_OPERATIONS:
+            raise serializers.ValidationError(
+                f'A batch may contain at most {self.MAX_OPERATIONS} operations.'
+            )
+        return value
@@ -1,11 +1,20 @@
 from apps.playlist.models import PlaylistTrack
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
 from functools import wraps
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def playlist_ordering():
+    """Return the order_by() fields for the configured playlist ordering mode."""
+    if settings.PLAYLIST_ORDERING == 'rank':
+        return ['rank', 'id']
+    return ['position']
+
+
 def validate_position_params(func):
     @wraps(func)
     def wrapper(prev_position=None, next_position=None):
@@ -28,13 +37,394 @@ def calculate_position(prev_position=None, next_position=None):
         return 1.0
     
     if prev_position is None:
-        logger.debug(f"Calculating position before {next_position}")
+        logger.debug("Calculating position before %s", next_position)
         return next_position - 1
     
     if next_position is None:
-        logger.debug(f"Calculating position after {prev_position}")
+        logger.debug("Calculating position after %s", prev_position)
         return prev_position + 1
     
     new_position = (prev_position + next_position) / 2
-    logger.debug(f"Calculating position between {prev_position} and {next_position}: {new_position}")
-    return new_position
\ No newline at end of file
+    logger.debug("Calculating position between %s and %s: %s", prev_position, next_position, new_position)
+    return new_position
+
+
+# Two positions closer than this are treated as having run out of precision.
+POSITION_EPSILON = 1e-9
+
+# Smallest spacing left between tracks after a partial rebalance.
+REBALANCE_MIN_GAP = 1e-3
+
+# Number of tracks on each side of the crowded spot to renumber at first.
+REBALANCE_WINDOW = 8
+
+
+def is_position_crowded(playlist, position, exclude_pk=None):
+    """Return True if another track in the playlist sits within POSITION_EPSILON of ``position``."""
+    neighbours = PlaylistTrack.objects.filter(
+        playlist=playlist,
+        position__gt=position - POSITION_EPSILON,
+        position__lt=position + POSITION_EPSILON,
+    )
+    if exclude_pk is not None:
+        neighbours = neighbours.exclude(pk=exclude_pk)
+    return neighbours.exists()
+
+
+def find_crowded_positions(playlist, positions):
+    """
+    Return the subset of ``{id: position}`` that sits within POSITION_EPSILON of another track.
+    
+    Checks every position with a single query, for callers that move many
+    tracks at once.
+    """
+    if not positions:
+        return {}
+    
+    ranges = Q()
+    for position in positions.values():
+        ranges |= Q(position__gt=position - POSITION_EPSILON, position__lt=position + POSITION_EPSILON)
+    nearby = list(PlaylistTrack.objects.filter(ranges, playlist=playlist).values_list('id', 'position'))
+    
+    return {
+        pk: position for pk, position in positions.items()
+        if any(other != pk and abs(other_position - position) < POSITION_EPSILON
+               for other, other_position in nearby)
+    }
+
+
+def rebalance_positions(playlist, position=None):
+    """
+    Spread out a playlist's crowded positions and return ``{id: new_position}`` for the rows changed.
+    
+    With ``position`` only the tracks around that spot are renumbered: the window
+    doubles until the tracks bounding it leave at least REBALANCE_MIN_GAP between
+    every renumbered track. When the window reaches either end of the playlist,
+    or ``position`` is None, the whole playlist is renumbered to 1.0, 2.0, ...
+    All changes are written with a single bulk update inside a transaction.
+    """
+    items = PlaylistTrack.objects.filter(playlist=playlist)
+    with transaction.atomic():
+        rows = None
+        lower = upper = None
+        size = REBALANCE_WINDOW
+        
+        while position is not None:
+            below = list(
+                items.filter(position__lt=position)
+                .order_by('-position', '-id')
+                .values_list('id', 'position')[:size + 1]
+            )
+            above = list(
+                items.filter(position__gte=position)
+                .order_by('position', 'id')
+                .values_list('id', 'position')[:size + 1]
+            )
+            if len(below) <= size or len(above) <= size:
+                break
+            
+            lower, upper = below.pop()[1], above.pop()[1]
+            rows = below[::-1] + above
+            if (upper - lower) / (len(rows) + 1) >= REBALANCE_MIN_GAP:
+                break
+            rows = None
+            size *= 2
+        
+        if rows is None:
+            rows = list(items.order_by('position', 'id').values_list('id', 'position'))
+            lower, step = 0.0, 1.0
+        else:
+            step = (upper - lower) / (len(rows) + 1)
+        
+        changed = {}
+        for index, (pk, old_position) in enumerate(rows, start=1):
+            new_position = lower + index * step
+            if new_position != old_position:
+                changed[pk] = new_position
+        
+        PlaylistTrack.objects.bulk_update(
+            [PlaylistTrack(pk=pk, playlist=playlist, position=new_position) for pk, new_position in changed.items()],
+            ['position'],
+        )
+    
+    logger.info("Rebalanced %s position(s) in playlist %s", len(changed), playlist.slug)
+    return changed
+
+
+def reindexed_field():
+    """Return the ``playlist.reindexed`` payload field for the configured ordering mode."""
+    if settings.PLAYLIST_ORDERING == 'rank':
+        return 'ranks'
+    return 'positions'
+
+
+def reindexed_payload(changed, field='positions'):
+    """Build a ``playlist.reindexed`` payload mapping ids to new positions or rank keys."""
+    return {field: {str(pk): value for pk, value in changed.items()}}
+
+
+def broadcast_reindexed(playlist, changed, field='positions'):
+    """Send one compact ``playlist.reindexed`` event mapping ids to new positions or rank keys."""
+    from apps.realtime.utils import broadcast_playlist_event
+    
+    broadcast_playlist_event('playlist.reindexed', reindexed_payload(changed, field), playlist.slug)
+
+
+# Rank keys (PLAYLIST_ORDERING = 'rank') are variable-length base-62 strings
+# that sort lexicographically. A key is an integer part, whose first
+# character encodes its length ('a'-'z' positive, 'A'-'Z' negative), followed
+# by an optional fraction that never ends in '0', so there is always room
+# for another key between any two existing ones.
+RANK_DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+RANK_ZERO = RANK_DIGITS[0]
+RANK_SMALLEST_INTEGER = 'A' + RANK_ZERO * 26
+
+
+def _rank_integer_length(head):
+    if 'a' <= head <= 'z':
+        return ord(head) - ord('a') + 2
+    if 'A' <= head <= 'Z':
+        return ord('Z') - ord(head) + 2
+    raise ValueError(f"Invalid rank key head: {head!r}")
+
+
+def _rank_split(key):
+    if not key:
+        raise ValueError("Rank key cannot be empty")
+    if key == RANK_SMALLEST_INTEGER:
+        raise ValueError(f"Invalid rank key: {key!r}")
+    length = _rank_integer_length(key[0])
+    if len(key) < length:
+        raise ValueError(f"Invalid rank key: {key!r}")
+    integer, fraction = key[:length], key[length:]
+    if fraction.endswith(RANK_ZERO):
+        raise ValueError(f"Invalid rank key: {key!r}")
+    return integer, fraction
+
+
+def _rank_midpoint(a, b):
+    """Return a fraction strictly between fractions ``a`` and ``b`` (None means 1)."""
+    if b is not None:
+        n = 0
+        while (a[n] if n < len(a) else RANK_ZERO) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _rank_midpoint(a[n:], b[n:])
+    
+    digit_a = RANK_DIGITS.index(a[0]) if a else 0
+    digit_b = RANK_DIGITS.index(b[0]) if b is not None else len(RANK_DIGITS)
+    if digit_b - digit_a > 1:
+        return RANK_DIGITS[(digit_a + digit_b + 1) // 2]
+    if b is not None and len(b) > 1:
+        return b[0]
+    return RANK_DIGITS[digit_a] + _rank_midpoint(a[1:], None)
+
+
+def _rank_increment(integer):
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        d = RANK_DIGITS.index(digits[i]) + 1
+        if d < len(RANK_DIGITS):
+            digits[i] = RANK_DIGITS[d]
+            return head + ''.join(digits)
+        digits[i] = RANK_ZERO
+    
+    if head == 'Z':
+        return 'a' + RANK_ZERO
+    if head == 'z':
+        return None
+    head = chr(ord(head) + 1)
+    if head > 'a':
+        digits.append(RANK_ZERO)
+    else:
+        digits.pop()
+    return head + ''.join(digits)
+
+
+def _rank_decrement(integer):
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        d = RANK_DIGITS.index(digits[i]) - 1
+        if d >= 0:
+            digits[i] = RANK_DIGITS[d]
+            return head + ''.join(digits)
+        digits[i] = RANK_DIGITS[-1]
+    
+    if head == 'a':
+        return 'Z' + RANK_DIGITS[-1]
+    if head == 'A':
+        return None
+    head = chr(ord(head) - 1)
+    if head < 'Z':
+        digits.append(RANK_DIGITS[-1])
+    else:
+        digits.pop()
+    return head + ''.join(digits)
+
+
+def generate_rank_key(prev_key=None, next_key=None):
+    """
+    Return a rank key that sorts strictly between ``prev_key`` and ``next_key``.
+    
+    Either bound may be None to place the key before the first or after the
+    last key. Appending keeps keys short: the integer part is incremented and
+    only grows by one character each time its digits overflow.
+    """
+    if prev_key is not None and next_key is not None and prev_key >= next_key:
+        raise ValueError("Previous rank must be less than next rank")
+    
+    if prev_key is None and next_key is None:
+        return 'a' + RANK_ZERO
+    
+    if prev_key is None:
+        integer, fraction = _rank_split(next_key)
+        if integer == RANK_SMALLEST_INTEGER:
+            return integer + _rank_midpoint('', fraction)
+        if fraction:
+            return integer
+        decremented = _rank_decrement(integer)
+        if decremented is None:
+            raise ValueError("Cannot generate a rank before the smallest key")
+        return decremented
+    
+    prev_integer, prev_fraction = _rank_split(prev_key)
+    if next_key is None:
+        incremented = _rank_increment(prev_integer)
+        if incremented is None:
+            return prev_integer + _rank_midpoint(prev_fraction, None)
+        return incremented
+    
+    next_integer, next_fraction = _rank_split(next_key)
+    if prev_integer == next_integer:
+        return prev_integer + _rank_midpoint(prev_fraction, next_fraction)
+    incremented = _rank_increment(prev_integer)
+    if incremented is not None and incremented < next_key:
+        return incremented
+    return prev_integer + _rank_midpoint(prev_fraction, None)
+
+
+def generate_rank_keys(count, prev_key=None):
+    """Return ``count`` increasing rank keys placed after ``prev_key``."""
+    keys = []
+    for _ in range(count):
+        prev_key = generate_rank_key(prev_key, None)
+        keys.append(prev_key)
+    return keys
+
+
+def generate_rank_keys_between(count, prev_key=None, next_key=None):
+    """
+    Return ``count`` increasing rank keys between ``prev_key`` and ``next_key``.
+    
+    Keys are placed by bisection, so they are only about log62(count)
+    characters longer than the bounds' common prefix.
+    """
+    if count <= 0:
+        return []
+    key = generate_rank_key(prev_key, next_key)
+    half = (count - 1) // 2
+    return (
+        generate_rank_keys_between(half, prev_key, key)
+        + [key]
+        + generate_rank_keys_between(count - 1 - half, key, next_key)
+    )
+
+
+# Rank keys longer than this are respread by rebalance_ranks(). Each insert
+# at the same spot adds a character, and the column holds 255.
+RANK_MAX_LENGTH = 32
+
+
+def rebalance_ranks(playlist, key=None):
+    """
+    Respread a playlist's rank keys around ``key`` and return ``{id: new_rank}`` for the rows changed.
+    
+    The rank equivalent of rebalance_positions(): the window of tracks around
+    ``key`` doubles until new keys between the tracks bounding it fit in half
+    of RANK_MAX_LENGTH. When the window reaches either end of the playlist, or
+    ``key`` is None, the whole playlist is given fresh keys. Order is kept and
+    all changes are written with a single bulk update inside a transaction.
+    """
+    items = PlaylistTrack.objects.filter(playlist=playlist).exclude(rank='')
+    with transaction.atomic():
+        rows = None
+        size = REBALANCE_WINDOW
+        
+        while key is not None:
+            below = list(
+                items.filter(rank__lt=key)
+                .order_by('-rank', '-id')
+                .values_list('id', 'rank')[:size + 1]
+            )
+            above = list(
+                items.filter(rank__gte=key)
+                .order_by('rank', 'id')
+                .values_list('id', 'rank')[:size + 1]
+            )
+            if len(below) <= size or len(above) <= size:
+                break
+            
+            lower, upper = below.pop()[1], above.pop()[1]
+            rows = below[::-1] + above
+            keys = generate_rank_keys_between(len(rows), lower, upper)
+            if max(len(new_key) for new_key in keys) <= RANK_MAX_LENGTH // 2:
+                break
+            rows = None
+            size *= 2
+        
+        if rows is None:
+            rows = list(items.order_by('rank', 'id').values_list('id', 'rank'))
+            keys = generate_rank_keys_between(len(rows))
+        
+        changed = {pk: new_key for (pk, old_key), new_key in zip(rows, keys) if new_key != old_key}
+        
+        PlaylistTrack.objects.bulk_update(
+            [PlaylistTrack(pk=pk, playlist=playlist, rank=new_key) for pk, new_key in changed.items()],
+            ['rank'],
+        )
+    
+    logger.info("Rebalanced %s rank key(s) in playlist %s", len(changed), playlist.slug)
+    return changed
+
+
+def rank_between(playlist, after_id=None, before_id=None, exclude_pk=None):
+    """
+    Return a rank key for placing a track between two items of a playlist.
+    
+    ``after_id`` and ``before_id`` are the ids of the items that should end up
+    directly before and after it; when only one is given, its current
+    neighbour is used for the other bound. With neither, the key appends to
+    the end of the playlist. Raises PlaylistTrack.DoesNotExist for unknown ids.
+    """
+    others = PlaylistTrack.objects.filter(playlist=playlist).exclude(rank='')
+    if exclude_pk is not None:
+        others = others.exclude(pk=exclude_pk)
+    
+    prev_key = next_key = None
+    if after_id is not None:
+        prev_key = others.values_list('rank', flat=True).get(pk=after_id)
+    if before_id is not None:
+        next_key = others.values_list('rank', flat=True).get(pk=before_id)
+    
+    if after_id is None and before_id is None:
+        prev_key = others.order_by('-rank').values_list('rank', flat=True).first()
+    elif before_id is None:
+        next_key = others.filter(rank__gt=prev_key).order_by('rank').values_list('rank', flat=True).first()
+    elif after_id is None:
+        prev_key = others.filter(rank__lt=next_key).order_by('-rank').values_list('rank', flat=True).first()
+    
+    return generate_rank_key(prev_key, next_key)
+
+
+def assign_ranks_from_positions(playlist):
+    """Regenerate a playlist's rank keys from its float ordering and return the count."""
+    with transaction.atomic():
+        items = list(
+            PlaylistTrack.objects.filter(playlist=playlist).order_by('position', 'id').only('id')
+        )
+        for item, key in zip(items, generate_rank_keys(len(items))):
+            item.rank = key
+        PlaylistTrack.objects.bulk_update(items, ['rank'])
+    
+    logger.info("Assigned rank keys to %s track(s) in playlist %s", len(items), playlist.slug)
+    return len(items)
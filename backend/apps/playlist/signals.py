@@ -1,6 +1,8 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
+from core.log import RATE_LIMITED
 from .models import PlaylistTrack
+from .playback import get_playback_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,11 +11,21 @@ logger = logging.getLogger(__name__)
 @receiver(post_save, sender=PlaylistTrack)
 def playlist_track_saved(sender, instance, created, **kwargs):
     if created:
-        logger.info(f"PlaylistTrack created: {instance.track.title} by {instance.added_by}")
+        # Log ids only: reading instance.track here could cost a query per save
+        logger.info("PlaylistTrack created: track %s by %s", instance.track_id, instance.added_by, extra=RATE_LIMITED)
     else:
-        logger.debug(f"PlaylistTrack updated: {instance.track.title}")
+        logger.debug("PlaylistTrack updated: %s (track %s)", instance.pk, instance.track_id, extra=RATE_LIMITED)
+
+
+@receiver(pre_delete, sender=PlaylistTrack)
+def playlist_track_deleting(sender, instance, **kwargs):
+    # Deleting the current item clears it from the playback row (SET_NULL),
+    # so every process has to reload that row
+    cache = get_playback_cache()
+    if cache.get(instance.playlist_id).item_id == instance.pk:
+        cache.changed(instance.playlist_id)
 
 
 @receiver(post_delete, sender=PlaylistTrack)
 def playlist_track_deleted(sender, instance, **kwargs):
-    logger.info(f"PlaylistTrack deleted: {instance.track.title}")
+    logger.info("PlaylistTrack deleted: %s (track %s)", instance.pk, instance.track_id, extra=RATE_LIMITED)
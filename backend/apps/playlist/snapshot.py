@@ -0,0 +1,95 @@
+"""
+Pre-encoded playlist snapshots for WebSocket clients.
+
+The snapshot of each room is built at most once per playlist version and
+the encoded frame is shared by every connection to that room, so a
+reconnect storm costs one query and one serialization instead of one per
+client.
+"""
+from functools import lru_cache
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+from apps.playlist.models import PlaylistTrack
+from apps.playlist.playback import get_playback_cache, playback_payload
+from apps.playlist.serializers import PlaylistTrackReadSerializer, PlaylistTrackSerializer
+from apps.playlist.services import playlist_ordering
+from apps.playlist.votes import get_vote_aggregator
+from apps.realtime.changelog import get_changelog
+from apps.realtime.utils import encode_binary
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_EVENT = 'playlist.snapshot'
+
+
+def build_snapshot(playlist, version, binary=False):
+    """Encode the ordered playlist as a ``playlist.snapshot`` frame, in MessagePack if ``binary``."""
+    queryset = (
+        PlaylistTrack.objects.filter(playlist=playlist)
+        .select_related('track')
+        .order_by(*playlist_ordering())
+    )
+    pending_votes = get_vote_aggregator().pending()
+    playback = get_playback_cache().get(playlist.pk)
+    if settings.FAST_READ_SERIALIZERS:
+        serializer = PlaylistTrackReadSerializer(pending_votes, playback.playing_id)
+        items = serializer.serialize(serializer.values(queryset))
+    else:
+        context = {'pending_votes': pending_votes, 'playing_id': playback.playing_id}
+        items = PlaylistTrackSerializer(queryset, many=True, context=context).data
+    snapshot = {
+        'type': SNAPSHOT_EVENT,
+        'version': version,
+        'items': items,
+        'playback': playback_payload(playback),
+    }
+    if binary:
+        return encode_binary(snapshot)
+    return JSONRenderer().render(snapshot).decode()
+
+
+class SnapshotCache:
+    """
+    Holds the encoded snapshot for the latest version of each playlist room,
+    one per WebSocket protocol.
+
+    Entries also expire after ``ttl`` seconds so edits made outside the API
+    (admin, management commands) are eventually picked up.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, playlist, binary=False):
+        """Return ``(version, frame)`` for the playlist's current version."""
+        key = (playlist.slug, binary)
+        version = get_changelog().current_version(playlist.slug)
+        entry = self._entries.get(key)
+        if self._is_fresh(entry, version):
+            return version, entry[2]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if not self._is_fresh(entry, version):
+                entry = (version, time.monotonic(), build_snapshot(playlist, version, binary))
+                self._entries[key] = entry
+                logger.debug("Built snapshot of playlist %s for version %s", playlist.slug, version)
+        return version, entry[2]
+
+    def _is_fresh(self, entry, version):
+        return (
+            entry is not None
+            and entry[0] == version
+            and time.monotonic() - entry[1] < self.ttl
+        )
+
+
+@lru_cache(maxsize=None)
+def get_snapshot_cache():
+    """Return the process-wide snapshot cache."""
+    return SnapshotCache(settings.SNAPSHOT_CACHE_TTL)
@@ -0,0 +1,140 @@
+"""
+Tests for the batch mutation endpoint.
+"""
+import pytest
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.playlist.models import PlaylistTrack
+from apps.tracks.models import Track
+
+
+@pytest.mark.django_db
+class TestPlaylistBatch:
+    """Test cases for POST /api/playlist/batch/."""
+
+    @pytest.fixture
+    def api_client(self):
+        """Create API client for testing."""
+        return APIClient()
+
+    @pytest.fixture
+    def sample_tracks(self):
+        """Create sample tracks for testing."""
+        return [
+            Track.objects.create(
+                title=f'Test Song {i}',
+                artist=f'Test Artist {i}',
+                album='Test Album',
+                duration_seconds=180,
+                genre='rock'
+            )
+            for i in range(5)
+        ]
+
+    def post_batch(self, api_client, operations):
+        return api_client.post('/api/playlist/batch/', {'operations': operations}, format='json')
+
+    def test_add_album(self, api_client, sample_tracks, django_assert_max_num_queries):
+        """Test adding many tracks with a constant number of queries."""
+        operations = [{'op': 'add', 'track_id': track.id, 'added_by': 'Alice'} for track in sample_tracks]
+
+        # Includes loading the room's playback state into the cold cache
+        with django_assert_max_num_queries(9):
+            response = self.post_batch(api_client, operations)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [event['type'] for event in response.data['results']] == ['track.added'] * 5
+        positions = list(PlaylistTrack.objects.order_by('position').values_list('track_id', 'position'))
+        assert positions == [(track.id, float(i + 1)) for i, track in enumerate(sample_tracks)]
+
+    def test_mixed_operations(self, api_client, sample_tracks):
+        """Test applying removes, moves and votes in order."""
+        first = PlaylistTrack.objects.create(track=sample_tracks[0], position=1.0)
+        second = PlaylistTrack.objects.create(track=sample_tracks[1], position=2.0)
+        third = PlaylistTrack.objects.create(track=sample_tracks[2], position=3.0)
+
+        response = self.post_batch(api_client, [
+            {'op': 'remove', 'id': first.id},
+            {'op': 'move', 'id': third.id, 'position': 1.5},
+            {'op': 'vote', 'id': second.id, 'direction': 'up'},
+            {'op': 'vote', 'id': second.id, 'direction': 'up'},
+            {'op': 'add', 'track_id': sample_tracks[0].id},
+        ])
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data['results']
+        assert [event['type'] for event in results] == [
+            'track.removed', 'track.moved', 'track.voted', 'track.voted', 'track.added'
+        ]
+        assert results[3]['payload']['votes'] == 2
+        assert results[4]['payload']['position'] == 4.0
+
+        ordered = list(PlaylistTrack.objects.order_by('position').values_list('track_id', flat=True))
+        assert ordered == [sample_tracks[2].id, sample_tracks[1].id, sample_tracks[0].id]
+
+    def test_duplicate_in_batch_fails(self, api_client, sample_tracks):
+        """Test that adding the same track twice rolls back the whole batch."""
+        response = self.post_batch(api_client, [
+            {'op': 'add', 'track_id': sample_tracks[0].id},
+            {'op': 'add', 'track_id': sample_tracks[1].id},
+            {'op': 'add', 'track_id': sample_tracks[0].id},
+        ])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        error = response.data['error']['details']['error']
+        assert error['code'] == 'DUPLICATE_TRACK'
+        assert error['details']['index'] == '2'
+        assert not PlaylistTrack.objects.exists()
+
+    def test_unknown_item_fails(self, api_client, sample_tracks):
+        """Test that referencing a missing playlist item fails."""
+        response = self.post_batch(api_client, [{'op': 'remove', 'id': 999}])
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_missing_fields_fail_validation(self, api_client):
+        """Test that operations missing required fields are rejected."""
+        response = self.post_batch(api_client, [{'op': 'vote', 'id': 1}])
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_rank_mode_moves(self, api_client, sample_tracks, settings):
+        """Test reordering by neighbour ids in rank mode."""
+        settings.PLAYLIST_ORDERING = 'rank'
+        response = self.post_batch(api_client, [
+            {'op': 'add', 'track_id': track.id} for track in sample_tracks[:3]
+        ])
+        first, second, third = [event['payload']['id'] for event in response.data['results']]
+
+        response = self.post_batch(api_client, [
+            {'op': 'move', 'id': third, 'before_id': first},
+            {'op': 'move', 'id': first, 'after_id': second},
+        ])
+
+        assert response.status_code == status.HTTP_200_OK
+        ordered = list(PlaylistTrack.objects.order_by('rank').values_list('id', flat=True))
+        assert ordered == [third, second, first]
+
+    def test_rank_mode_rejects_positions(self, api_client, sample_tracks, settings):
+        """Test that a position move, which rank ordering would drop, is rejected."""
+        settings.PLAYLIST_ORDERING = 'rank'
+        response = self.post_batch(api_client, [{'op': 'add', 'track_id': sample_tracks[0].id}])
+        item_id = response.data['results'][0]['payload']['id']
+
+        response = self.post_batch(api_client, [{'op': 'move', 'id': item_id, 'position': 5.0}])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['error']['details']['error']['code'] == 'INVALID_POSITION'
+
+    def test_events_carry_each_operations_state(self, api_client, sample_tracks):
+        """Test that each event shows the item as its own operation left it."""
+        item = PlaylistTrack.objects.create(track=sample_tracks[0], position=1.0)
+
+        response = self.post_batch(api_client, [
+            {'op': 'vote', 'id': item.id, 'direction': 'up'},
+            {'op': 'move', 'id': item.id, 'position': 2.0},
+            {'op': 'vote', 'id': item.id, 'direction': 'up'},
+        ])
+
+        payloads = [event['payload'] for event in response.data['results']]
+        assert [(payload['position'], payload['votes']) for payload in payloads] == [
+            (1.0, 1), (2.0, 1), (2.0, 2)
+        ]
@@ -0,0 +1,49 @@
+"""
+Tests for the REST benchmark suite and its query budgets.
+"""
+import json
+from io import StringIO
+import pytest
+from django.core.management import call_command
+from apps.playlist.benchmarks import QUERY_BUDGETS, ApiBenchmark
+from apps.playlist.models import Playlist
+from apps.tracks.models import Track
+
+
+@pytest.mark.django_db
+class TestQueryBudgets:
+    """Test that every hot endpoint runs exactly its budgeted queries."""
+
+    @pytest.fixture(autouse=True)
+    def database_path(self, settings):
+        settings.RESPONSE_CACHE_TTL = 0
+        settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+    @pytest.mark.parametrize('size', [10, 200])
+    def test_queries_match_budget(self, size):
+        """Test the exact query count per endpoint, which must not grow with the playlist."""
+        results = ApiBenchmark(size=size, iterations=3).run()
+
+        assert {name: endpoint['queries'] for name, endpoint in results['endpoints'].items()} == QUERY_BUDGETS
+
+
+@pytest.mark.django_db
+class TestBenchApi:
+    """Test cases for the bench_api command."""
+
+    def test_writes_results(self, tmp_path):
+        """Test a small run end to end and that the scratch rooms are removed."""
+        output = tmp_path / 'results.json'
+
+        call_command(
+            'bench_api', '--sizes', '5', '20', '--iterations', '2',
+            '--output', str(output), stdout=StringIO(), stderr=StringIO()
+        )
+
+        runs = json.loads(output.read_text())['runs']
+        assert [run['size'] for run in runs] == [5, 20]
+        for run in runs:
+            assert set(run['endpoints']) == set(QUERY_BUDGETS)
+            assert all(endpoint['p50_ms'] > 0 for endpoint in run['endpoints'].values())
+        assert not Playlist.objects.filter(slug__startswith='bench-').exists()
+        assert not Track.objects.exists()
@@ -0,0 +1,288 @@
+"""
+Tests for the playlist WebSocket consumer.
+"""
+import asyncio
+import json
+import msgpack
+import pytest
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from apps.playlist.consumers import BINARY_SUBPROTOCOL, PlaylistConsumer
+from apps.playlist.routing import websocket_urlpatterns
+from apps.playlist.models import Playlist, PlaylistTrack
+from apps.playlist.snapshot import get_snapshot_cache
+from apps.realtime import utils
+from apps.realtime.utils import broadcast_playlist_event, broadcast_playlist_events
+from apps.tracks.models import Track
+
+
+@pytest.fixture
+def channel_layer(settings):
+    """Use the in-memory channel layer."""
+    settings.CHANNEL_LAYERS = {
+        'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}
+    }
+
+
+@pytest.fixture
+def playlist_tracks(db):
+    """Create two playlist tracks for testing."""
+    items = []
+    for i in range(2):
+        track = Track.objects.create(
+            title=f'Test Song {i}',
+            artist='Test Artist',
+            album='Test Album',
+            duration_seconds=180,
+            genre='rock'
+        )
+        items.append(PlaylistTrack.objects.create(track=track, position=float(2 - i)))
+    return items
+
+
+async def connect():
+    communicator = WebsocketCommunicator(PlaylistConsumer.as_asgi(), '/ws/playlist/')
+    connected, _ = await communicator.connect()
+    assert connected
+    assert (await communicator.receive_json_from())['type'] == 'connection.established'
+    return communicator
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+class TestPlaylistConsumer:
+    """Test cases for PlaylistConsumer."""
+
+    async def test_snapshot_on_connect(self, channel_layer, playlist_tracks):
+        """Test that the ordered playlist is pushed right after connecting."""
+        communicator = await connect()
+
+        snapshot = await communicator.receive_json_from()
+        assert snapshot['type'] == 'playlist.snapshot'
+        assert snapshot['version'] == 0
+        assert [item['id'] for item in snapshot['items']] == [playlist_tracks[1].id, playlist_tracks[0].id]
+
+        await communicator.disconnect()
+
+    async def test_snapshot_is_shared_per_version(self, channel_layer, playlist_tracks):
+        """Test that connections at the same version reuse one encoded snapshot."""
+        first = await connect()
+        first_frame = await first.receive_from()
+
+        await database_sync_to_async(PlaylistTrack.objects.filter(pk=playlist_tracks[0].pk).delete)()
+
+        second = await connect()
+        assert await second.receive_from() == first_frame
+
+        await first.disconnect()
+        await second.disconnect()
+
+    async def test_snapshot_rebuilt_after_new_version(self, channel_layer, playlist_tracks, changelog):
+        """Test that a new playlist version produces a fresh snapshot."""
+        await database_sync_to_async(get_snapshot_cache().get)(await database_sync_to_async(Playlist.objects.get_default)())
+        await database_sync_to_async(PlaylistTrack.objects.filter(pk=playlist_tracks[0].pk).delete)()
+        changelog.append('default', {'type': 'track.removed', 'payload': {'id': playlist_tracks[0].pk}})
+
+        communicator = await connect()
+        snapshot = json.loads(await communicator.receive_from())
+        assert snapshot['version'] == 1
+        assert [item['id'] for item in snapshot['items']] == [playlist_tracks[1].id]
+
+        await communicator.disconnect()
+
+    async def test_ping(self, channel_layer, settings, db):
+        """Test that pings are answered."""
+        settings.WEBSOCKET_SNAPSHOT_ON_CONNECT = False
+        communicator = await connect()
+
+        await communicator.send_json_to({'type': 'ping', 'ts': 1})
+        assert await communicator.receive_json_from() == {'type': 'pong', 'ts': 1}
+
+        await communicator.disconnect()
+
+    async def test_rooms_have_separate_groups(self, channel_layer, settings, db):
+        """Test that events only reach clients connected to the same room."""
+        settings.WEBSOCKET_SNAPSHOT_ON_CONNECT = False
+        await database_sync_to_async(Playlist.objects.create)(name='Party', slug='party')
+        application = URLRouter(websocket_urlpatterns)
+
+        default = WebsocketCommunicator(application, '/ws/playlist/')
+        party = WebsocketCommunicator(application, '/ws/playlist/party/')
+        for communicator in (default, party):
+            assert (await communicator.connect())[0]
+            await communicator.receive_json_from()
+
+        await database_sync_to_async(broadcast_playlist_event)('track.removed', {'id': 1}, 'party')
+
+        assert (await party.receive_json_from())['type'] == 'track.removed'
+        assert await default.receive_nothing()
+
+        await default.disconnect()
+        await party.disconnect()
+
+    async def test_event_is_encoded_once(self, channel_layer, settings, db, monkeypatch):
+        """Test that every connection receives the same frame from a single encode."""
+        settings.WEBSOCKET_SNAPSHOT_ON_CONNECT = False
+        encoded = []
+        encode_event = utils.encode_event
+        monkeypatch.setattr(utils, 'encode_event', lambda data: encoded.append(data) or encode_event(data))
+        communicators = [await connect() for _ in range(3)]
+
+        await database_sync_to_async(broadcast_playlist_event)('track.removed', {'id': 1}, 'default')
+
+        frames = [await communicator.receive_from() for communicator in communicators]
+        assert len(encoded) == 1
+        assert frames == [frames[0]] * 3
+        assert json.loads(frames[0]) == {'type': 'track.removed', 'payload': {'id': 1}, 'version': 1}
+
+        for communicator in communicators:
+            await communicator.disconnect()
+
+    async def test_binary_protocol_sends_deltas(self, channel_layer, playlist_tracks):
+        """Test that msgpack clients get binary frames with only the changed fields."""
+        communicator = WebsocketCommunicator(
+            PlaylistConsumer.as_asgi(), '/ws/playlist/', subprotocols=[BINARY_SUBPROTOCOL]
+        )
+        connected, subprotocol = await communicator.connect()
+        assert connected
+        assert subprotocol == BINARY_SUBPROTOCOL
+
+        assert msgpack.unpackb(await communicator.receive_from())['type'] == 'connection.established'
+        snapshot = msgpack.unpackb(await communicator.receive_from())
+        assert [item['id'] for item in snapshot['items']] == [playlist_tracks[1].id, playlist_tracks[0].id]
+
+        item = playlist_tracks[0]
+        await database_sync_to_async(broadcast_playlist_events)([
+            {'type': 'track.voted', 'payload': {'id': item.id, 'votes': 3, 'position': 2.0, 'track': {}}},
+            {'type': 'track.removed', 'payload': {'id': playlist_tracks[1].id}},
+        ], 'default')
+
+        batch = msgpack.unpackb(await communicator.receive_from(), strict_map_key=False)
+        assert batch['events'] == [
+            {'type': 'track.voted', 'version': 1, 'changes': {item.id: {'votes': 3}}},
+            {'type': 'track.removed', 'version': 2, 'payload': {'id': playlist_tracks[1].id}},
+        ]
+
+        await communicator.send_to(bytes_data=msgpack.packb({'type': 'ping', 'ts': 1}))
+        assert msgpack.unpackb(await communicator.receive_from()) == {'type': 'pong', 'ts': 1}
+
+        await communicator.disconnect()
+
+    @pytest.fixture
+    def slow_client(self, monkeypatch):
+        """Hold event frames back from the socket until the returned gate is set."""
+        gate = asyncio.Event()
+        send_frame = PlaylistConsumer.send_frame
+
+        async def slow_send_frame(consumer, frame):
+            await gate.wait()
+            await send_frame(consumer, frame)
+
+        monkeypatch.setattr(PlaylistConsumer, 'send_frame', slow_send_frame)
+        return gate
+
+    async def test_slow_client_gets_latest_votes(self, channel_layer, settings, playlist_tracks, slow_client):
+        """Test that queued votes for the same track are conflated to the latest."""
+        settings.WEBSOCKET_SNAPSHOT_ON_CONNECT = False
+        communicator = await connect()
+        item = playlist_tracks[0]
+
+        for votes in (1, 2, 3):
+            await database_sync_to_async(broadcast_playlist_event)('track.voted', {'id': item.id, 'votes': votes}, 'default')
+        await database_sync_to_async(broadcast_playlist_event)('track.removed', {'id': playlist_tracks[1].id}, 'default')
+        assert await communicator.receive_nothing()
+        slow_client.set()
+
+        received = [await communicator.receive_json_from() for _ in range(3)]
+        assert [(event['type'], event['version']) for event in received] == [
+            ('track.voted', 1), ('track.voted', 3), ('track.removed', 4)
+        ]
+        assert received[1]['payload']['votes'] == 3
+        assert await communicator.receive_nothing()
+
+        await communicator.disconnect()
+
+    async def test_overflow_requires_resync(self, channel_layer, settings, playlist_tracks, slow_client):
+        """Test that a full queue is replaced by a resync marker and resumes after a resync."""
+        settings.WEBSOCKET_SNAPSHOT_ON_CONNECT = False
+        settings.WEBSOCKET_QUEUE_SIZE = 2
+        communicator = await connect()
+
+        for pk in range(1, 6):
+            await database_sync_to_async(broadcast_playlist_event)('track.removed', {'id': pk}, 'default')
+        slow_client.set()
+
+        assert (await communicator.receive_json_from())['version'] == 1
+        assert await communicator.receive_json_from() == {'type': 'resync.required', 'reason': 'slow_consumer'}
+        await database_sync_to_async(broadcast_playlist_event)('track.removed', {'id': 6}, 'default')
+        assert await communicator.receive_nothing()
+
+        await communicator.send_json_to({'type': 'resync'})
+        snapshot = await communicator.receive_json_from()
+        assert snapshot['type'] == 'playlist.snapshot'
+        assert snapshot['version'] == 6
+
+        await database_sync_to_async(broadcast_playlist_event)('track.removed', {'id': 7}, 'default')
+        assert (await communicator.receive_json_from())['version'] == 7
+
+        await communicator.disconnect()
+
+    async def test_unacknowledged_frames_stay_queued(self, channel_layer, settings, playlist_tracks):
+        """Test that a client that stops acknowledging is held to the send window."""
+        settings.WEBSOCKET_SNAPSHOT_ON_CONNECT = False
+        settings.WEBSOCKET_SEND_WINDOW = 3
+        communicator = await connect()
+
+        for pk in range(1, 5):
+            await database_sync_to_async(broadcast_playlist_event)('track.removed', {'id': pk}, 'default')
+
+        # connection.established and two events fill the window
+        assert [(await communicator.receive_json_from())['version'] for _ in range(2)] == [1, 2]
+        assert await communicator.receive_nothing()
+
+        await communicator.send_json_to({'type': 'ack', 'received': 3})
+        assert [(await communicator.receive_json_from())['version'] for _ in range(2)] == [3, 4]
+
+        await communicator.disconnect()
+
+    async def test_client_that_never_acks_is_resynced(self, channel_layer, settings, playlist_tracks):
+        """Test that the resync marker is sent past a full window."""
+        settings.WEBSOCKET_SNAPSHOT_ON_CONNECT = False
+        settings.WEBSOCKET_SEND_WINDOW = 3
+        settings.WEBSOCKET_QUEUE_SIZE = 2
+        communicator = await connect()
+
+        for pk in range(1, 8):
+            await database_sync_to_async(broadcast_playlist_event)('track.removed', {'id': pk}, 'default')
+
+        assert [(await communicator.receive_json_from())['version'] for _ in range(2)] == [1, 2]
+        assert await communicator.receive_json_from() == {'type': 'resync.required', 'reason': 'slow_consumer'}
+        assert await communicator.receive_nothing()
+
+        await communicator.send_json_to({'type': 'resync'})
+        assert (await communicator.receive_json_from())['type'] == 'playlist.snapshot'
+
+        await communicator.disconnect()
+
+    async def test_acknowledging_client_streams(self, channel_layer, settings, playlist_tracks):
+        """Test that acknowledged frames reopen the window."""
+        settings.WEBSOCKET_SNAPSHOT_ON_CONNECT = False
+        settings.WEBSOCKET_SEND_WINDOW = 2
+        communicator = await connect()
+
+        versions = []
+        for pk in range(1, 6):
+            await database_sync_to_async(broadcast_playlist_event)('track.removed', {'id': pk}, 'default')
+            versions.append((await communicator.receive_json_from())['version'])
+            await communicator.send_json_to({'type': 'ack', 'received': pk + 1})
+
+        assert versions == [1, 2, 3, 4, 5]
+
+        await communicator.disconnect()
+
+    async def test_unknown_room_is_rejected(self, channel_layer, db):
+        """Test that connecting to a missing room is refused."""
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), '/ws/playlist/missing/')
+        connected, _ = await communicator.connect()
+        assert not connected
@@ -0,0 +1,32 @@
+"""
+Tests for the WebSocket fan-out load test.
+"""
+import json
+from io import StringIO
+import pytest
+from django.core.management import call_command
+from apps.playlist.models import Playlist
+from apps.tracks.models import Track
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBenchWebsocket:
+    """Test cases for the bench_websocket command."""
+
+    def test_every_client_receives_every_vote(self, tmp_path):
+        """Test a short run end to end and that the scratch room is removed."""
+        output = tmp_path / 'results.json'
+
+        call_command(
+            'bench_websocket', '--clients', '3', '--rate', '20', '--duration', '0.25',
+            '--items', '5', '--output', str(output), stdout=StringIO()
+        )
+
+        results = json.loads(output.read_text())
+        assert results['mutations'] == 5
+        assert results['messages_expected'] == 15
+        assert results['messages_delivered'] == 15
+        assert results['latency_ms']['p50'] <= results['latency_ms']['p99']
+        assert results['memory_per_connection_bytes'] > 0
+        assert not Playlist.objects.filter(slug__startswith='bench-').exists()
+        assert not Track.objects.exists()
@@ -34,6 +34,15 @@ class TestPlaylistTrackModel:
         assert playlist_track.position == 1.0
         assert playlist_track.votes == 0
     
+    def test_default_room_is_assigned_on_save(self, sample_track, django_assert_num_queries):
+        """Test that only saving, not instantiating, looks up the default room."""
+        with django_assert_num_queries(0):
+            playlist_track = PlaylistTrack(track=sample_track, position=1.0)
+        
+        playlist_track.save()
+        
+        assert playlist_track.playlist.slug == 'default'
+    
     def test_duplicate_track_raises_error(self, sample_track):
         """Test that duplicate tracks raise validation error."""
         PlaylistTrack.objects.create(
@@ -53,8 +62,8 @@ class TestPlaylistTrackModel:
         track1 = PlaylistTrack.objects.create(
             track=sample_track,
             position=1.0,
-            is_playing=True
         )
+        track1.set_as_playing()
         
         track2_data = Track.objects.create(
             title='Test Song 2',
@@ -71,9 +80,6 @@ class TestPlaylistTrackModel:
         # Set track2 as playing
         track2.set_as_playing()
         
-        # Refresh track1 from database
-        track1.refresh_from_db()
-        
         assert track2.is_playing is True
         assert track1.is_playing is False
         assert track2.played_at is not None
@@ -0,0 +1,249 @@
+"""
+Tests for the in-memory play order index and the next/previous actions.
+"""
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.playlist.models import PlaylistTrack
+from apps.playlist.order_index import OrderIndex
+from apps.playlist.playback import get_playback_cache, play_item
+from apps.tracks.models import Track
+
+
+@pytest.fixture
+def items(playlist):
+    """Create four items at positions 1-4."""
+    return [
+        PlaylistTrack.objects.create(
+            playlist=playlist,
+            track=Track.objects.create(
+                title=f'Song {i}',
+                artist='Test Artist',
+                album='Test Album',
+                duration_seconds=180,
+                genre='rock'
+            ),
+            position=float(i + 1)
+        )
+        for i in range(4)
+    ]
+
+
+def publish(changelog, event_type, payload):
+    changelog.append('default', {'type': event_type, 'payload': payload})
+
+
+def item_payload(item, **changes):
+    payload = {'id': item.pk, 'position': item.position, 'rank': item.rank, 'votes': item.votes, 'played_at': None}
+    payload.update(changes)
+    return payload
+
+
+@pytest.mark.django_db
+class TestOrderIndex:
+    """Test cases for OrderIndex."""
+
+    def test_walks_in_position_order(self, playlist, items):
+        """Test stepping through the room in position order."""
+        items[0].position = 5.0
+        items[0].save()
+        index = OrderIndex('default')
+        index.sync(playlist)
+
+        assert index.after(None) == items[1].pk
+        assert index.after(items[3].pk) == items[0].pk
+        assert index.after(items[0].pk) is None
+        assert index.before(items[1].pk) is None
+        assert index.before(None) == items[0].pk
+
+    def test_vote_order_breaks_ties_by_position(self, playlist, items):
+        """Test that more votes come first and equal votes keep position order."""
+        PlaylistTrack.objects.filter(pk__in=[items[1].pk, items[3].pk]).update(votes=2)
+        index = OrderIndex('default', by_votes=True)
+        index.sync(playlist)
+
+        order = [index.after(None)]
+        while order[-1] is not None:
+            order.append(index.after(order[-1]))
+
+        assert order[:-1] == [items[1].pk, items[3].pk, items[0].pk, items[2].pk]
+
+    def test_changes_are_applied_from_the_changelog(self, playlist, items, changelog, django_assert_num_queries):
+        """Test that a synced index replays new events without querying the database."""
+        index = OrderIndex('default', by_votes=True)
+        index.sync(playlist)
+        publish(changelog, 'track.voted', item_payload(items[3], votes=1))
+        publish(changelog, 'track.removed', {'id': items[0].pk})
+        publish(changelog, 'playlist.reindexed', {'positions': {str(items[2].pk): 0.5}})
+
+        with django_assert_num_queries(0):
+            index.sync(playlist)
+
+        assert index.after(None) == items[3].pk
+        assert index.after(items[3].pk) == items[2].pk
+        assert index.after(items[2].pk) == items[1].pk
+        assert len(index) == 3
+
+    def test_rebuilds_when_the_changelog_is_gone(self, playlist, items, changelog):
+        """Test that an index too far behind the changelog reloads the room."""
+        index = OrderIndex('default')
+        index.sync(playlist)
+        items[0].delete()
+        changelog.clear()
+        publish(changelog, 'track.removed', {'id': items[1].pk})
+        publish(changelog, 'track.removed', {'id': items[2].pk})
+        index.version = 5
+
+        index.sync(playlist)
+
+        assert len(index) == 3
+        assert index.after(None) == items[1].pk
+
+    def test_unplayed_skips_played_items(self, playlist, items, changelog):
+        """Test that played items are skipped, including ones played after the build."""
+        PlaylistTrack.objects.filter(pk=items[1].pk).update(played_at='2025-12-04T10:00:00Z')
+        index = OrderIndex('default')
+        index.sync(playlist)
+        publish(changelog, 'playback.state', {'item_id': items[2].pk, 'is_playing': True})
+        index.sync(playlist)
+
+        assert index.after(items[0].pk, unplayed=True) == items[3].pk
+        assert index.before(items[3].pk, unplayed=True) == items[0].pk
+        assert index.after(items[0].pk) == items[1].pk
+
+
+@pytest.mark.django_db
+class TestNextPrevious:
+    """Test cases for POST /api/playlist/next/ and /previous/."""
+
+    @pytest.fixture
+    def api_client(self):
+        """Create API client for testing."""
+        return APIClient()
+
+    def test_next_and_previous(self, api_client, items, django_capture_on_commit_callbacks):
+        """Test advancing from nothing to the first item, then forwards and back."""
+        played = []
+        for path in ['next', 'next', 'next', 'previous']:
+            with django_capture_on_commit_callbacks(execute=True):
+                response = api_client.post(f'/api/playlist/{path}/')
+            assert response.status_code == status.HTTP_200_OK
+            played.append(response.data['id'])
+
+        assert played == [items[0].pk, items[1].pk, items[2].pk, items[1].pk]
+        assert get_playback_cache().get(items[0].playlist_id).playing_id == items[1].pk
+
+    def test_end_of_playlist(self, api_client, items):
+        """Test that there is no next track after the last one."""
+        play_item(items[3].playlist, items[3])
+
+        response = api_client.post('/api/playlist/next/')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert get_playback_cache().get(items[0].playlist_id).playing_id == items[3].pk
+
+    def test_next_unplayed(self, api_client, items, django_capture_on_commit_callbacks):
+        """Test that unplayed mode skips tracks that were played before."""
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(f'/api/playlist/{items[2].id}/play/')
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(f'/api/playlist/{items[0].id}/play/')
+
+        response = api_client.post('/api/playlist/next/', {'unplayed': True}, format='json')
+
+        assert response.data['id'] == items[1].pk
+        response = api_client.post('/api/playlist/next/', {'unplayed': True}, format='json')
+        assert response.data['id'] == items[3].pk
+
+    def test_next_by_votes(self, api_client, items, settings, django_capture_on_commit_callbacks):
+        """Test that AUTO_SORT_BY_VOTES advances in vote order, following new votes."""
+        settings.AUTO_SORT_BY_VOTES = True
+        api_client.post('/api/playlist/next/')
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(f'/api/playlist/{items[0].id}/play/')
+            api_client.post(f'/api/playlist/{items[2].id}/vote/', {'direction': 'up'}, format='json')
+
+        response = api_client.post('/api/playlist/next/')
+
+        assert response.data['id'] == items[1].pk
+        assert api_client.post('/api/playlist/previous/').data['id'] == items[0].pk
+        assert api_client.post('/api/playlist/previous/').data['id'] == items[2].pk
+
+
+@pytest.mark.django_db
+class TestVoteRanking:
+    """Test cases for ?order=votes and track.ranked events."""
+
+    @pytest.fixture
+    def api_client(self):
+        """Create API client for testing."""
+        return APIClient()
+
+    def test_rank_change(self, playlist, items):
+        """Test the ranks a new key would move an item between."""
+        index = OrderIndex('default', by_votes=True)
+        index.sync(playlist)
+
+        assert index.rank_change(items[2].pk, (-1, 3.0, items[2].pk)) == (3, 1)
+        assert index.rank_change(items[0].pk, (1, 1.0, items[0].pk)) == (1, 4)
+        assert index.rank_change(items[1].pk, (0, 2.0, items[1].pk)) is None
+        assert index.rank_change(items[1].pk, (0, 2.5, items[1].pk)) is None
+
+    def test_list_by_votes(self, api_client, items, settings):
+        """Test that the vote listing is ordered by votes, then position, and paginates."""
+        settings.RESPONSE_CACHE_TTL = 0
+        for item, direction in [(items[2], 'up'), (items[3], 'up'), (items[3], 'up'), (items[0], 'down')]:
+            api_client.post(f'/api/playlist/{item.id}/vote/', {'direction': direction}, format='json')
+
+        first = api_client.get('/api/playlist/', {'order': 'votes', 'page_size': 3}).data
+        second = api_client.get(first['next']).data
+        back = api_client.get(second['previous']).data
+
+        assert first['count'] == 4
+        assert [row['id'] for row in first['results']] == [items[3].pk, items[2].pk, items[1].pk]
+        assert [row['votes'] for row in first['results']] == [2, 1, 0]
+        assert [row['id'] for row in second['results']] == [items[0].pk]
+        assert second['next'] is None
+        assert back['results'] == first['results']
+
+    def test_list_by_votes_queries(self, api_client, items, settings, django_assert_num_queries):
+        """Test that a vote page is the room lookup and one select, with no count or sort."""
+        settings.RESPONSE_CACHE_TTL = 0
+        api_client.get('/api/playlist/', {'order': 'votes'})
+
+        with django_assert_num_queries(2):
+            response = api_client.get('/api/playlist/', {'order': 'votes'})
+
+        assert len(response.data['results']) == 4
+
+    def test_invalid_cursor(self, api_client, items, settings):
+        """Test that a cursor that is not a vote key is rejected."""
+        settings.RESPONSE_CACHE_TTL = 0
+        cursor = 'eyJ2IjpbImEiLDEsMV19'  # {"v":["a",1,1]}
+
+        response = api_client.get('/api/playlist/', {'order': 'votes', 'cursor': cursor})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_votes_broadcast_rank_changes(self, api_client, items, settings, changelog,
+                                          django_capture_on_commit_callbacks):
+        """Test that only votes that move a track broadcast track.ranked."""
+        settings.AUTO_SORT_BY_VOTES = True
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(f'/api/playlist/{items[2].id}/vote/', {'direction': 'up'}, format='json')
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(f'/api/playlist/{items[0].id}/vote/', {'direction': 'up'}, format='json')
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(f'/api/playlist/{items[3].id}/vote/', {'direction': 'down'}, format='json')
+
+        _, events = changelog.since('default', 0)
+
+        assert [(event['type'], event['payload']['id']) for event in events] == [
+            ('track.voted', items[2].pk),
+            ('track.ranked', items[2].pk),
+            ('track.voted', items[0].pk),
+            ('track.ranked', items[0].pk),
+            ('track.voted', items[3].pk),
+        ]
+        assert events[1]['payload'] == {'id': items[2].pk, 'from': 3, 'to': 1}
+        assert events[3]['payload'] == {'id': items[0].pk, 'from': 2, 'to': 1}
@@ -0,0 +1,181 @@
+"""
+Tests for the per-room playback state.
+"""
+import pytest
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.playlist.models import PlaybackState, PlaylistTrack
+from apps.playlist.playback import PlaybackCache, get_playback_cache, pause_playback, play_item
+from apps.tracks.models import Track
+
+
+class FakeRedis:
+    """Just enough of a Redis client for the generation counters."""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def incr(self, key):
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+
+@pytest.mark.django_db
+class TestPlayback:
+    """Test cases for playing, pausing and stopping a room."""
+
+    @pytest.fixture
+    def api_client(self):
+        """Create API client for testing."""
+        return APIClient()
+
+    @pytest.fixture
+    def items(self, playlist):
+        """Create three playlist items."""
+        return [
+            PlaylistTrack.objects.create(
+                playlist=playlist,
+                track=Track.objects.create(
+                    title=f'Song {i}',
+                    artist='Test Artist',
+                    album='Test Album',
+                    duration_seconds=180,
+                    genre='rock'
+                ),
+                position=float(i + 1)
+            )
+            for i in range(3)
+        ]
+
+    def events(self, changelog):
+        _, entries = changelog.since('default', 0)
+        return [(entry['type'], entry['payload']) for entry in entries]
+
+    def test_play_writes_one_state_row(self, api_client, items, django_assert_num_queries):
+        """Test that playing only writes the room's state and the item's played_at."""
+        play_item(items[0].playlist, items[0])
+
+        # Savepoint, room lookup, get_object, state reload, state update, played_at update, release
+        with django_assert_num_queries(7):
+            response = api_client.post(f'/api/playlist/{items[1].id}/play/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['is_playing'] is True
+        assert PlaybackState.objects.get().item_id == items[1].id
+
+    def test_list_derives_is_playing(self, api_client, items, settings):
+        """Test that only the state's item is listed as playing."""
+        settings.RESPONSE_CACHE_TTL = 0
+        api_client.post(f'/api/playlist/{items[2].id}/play/')
+
+        response = api_client.get('/api/playlist/')
+
+        assert [row['is_playing'] for row in response.data['results']] == [False, False, True]
+
+    def test_pause_and_resume(self, api_client, items, monkeypatch):
+        """Test that pausing keeps the offset and playing the same item resumes from it."""
+        started = timezone.now()
+        monkeypatch.setattr('apps.playlist.playback.timezone.now', lambda: started)
+        api_client.post(f'/api/playlist/{items[0].id}/play/')
+        monkeypatch.setattr('apps.playlist.playback.timezone.now', lambda: started + timezone.timedelta(seconds=42))
+
+        response = api_client.post('/api/playlist/pause/')
+        assert response.data['is_playing'] is False
+        assert response.data['offset'] == 42.0
+
+        api_client.post(f'/api/playlist/{items[0].id}/play/')
+        state = get_playback_cache().get(items[0].playlist_id)
+        assert state.is_playing and state.offset == 42.0
+        items[0].refresh_from_db()
+        assert items[0].played_at == started
+
+        api_client.post(f'/api/playlist/{items[1].id}/play/')
+        assert get_playback_cache().get(items[0].playlist_id).offset == 0.0
+
+    def test_pause_without_playback(self, items):
+        """Test that pausing a stopped room changes nothing."""
+        assert pause_playback(items[0].playlist) is None
+        assert not PlaybackState.objects.exists()
+
+    def test_stop_is_one_update(self, api_client, items, django_assert_num_queries):
+        """Test that stopping is the room lookup and a single row update."""
+        play_item(items[0].playlist, items[0])
+
+        # The lookup and the update, inside the action's savepoint
+        with django_assert_num_queries(4):
+            response = api_client.post('/api/playlist/stop/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert get_playback_cache().get(items[0].playlist_id).item_id is None
+
+    def test_one_event_per_change(self, api_client, items, changelog, django_capture_on_commit_callbacks):
+        """Test that play, pause and stop each broadcast a single playback.state event."""
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(f'/api/playlist/{items[0].id}/play/')
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(f'/api/playlist/{items[1].id}/play/')
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post('/api/playlist/pause/')
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post('/api/playlist/stop/')
+            api_client.post('/api/playlist/stop/')
+
+        events = self.events(changelog)
+        assert [event_type for event_type, _ in events] == ['playback.state'] * 4
+        assert [(payload['item_id'], payload['is_playing']) for _, payload in events] == [
+            (items[0].id, True),
+            (items[1].id, True),
+            (items[1].id, False),
+            (None, False),
+        ]
+
+    def test_deleting_the_playing_item_stops_playback(self, api_client, items, django_capture_on_commit_callbacks):
+        """Test that removing the current item clears the state."""
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(f'/api/playlist/{items[0].id}/play/')
+            api_client.delete(f'/api/playlist/{items[0].id}/')
+
+        assert get_playback_cache().get(items[0].playlist_id).item_id is None
+
+
+@pytest.mark.django_db
+class TestPlaybackCache:
+    """Test cases for PlaybackCache."""
+
+    @pytest.fixture
+    def item(self, playlist):
+        track = Track.objects.create(
+            title='Test Song',
+            artist='Test Artist',
+            album='Test Album',
+            duration_seconds=180,
+            genre='rock'
+        )
+        return PlaylistTrack.objects.create(playlist=playlist, track=track, position=1.0)
+
+    def test_state_is_cached(self, item, django_assert_num_queries):
+        """Test that the state is only loaded once while nothing changes."""
+        cache = PlaybackCache()
+        cache.get(item.playlist_id)
+
+        with django_assert_num_queries(0):
+            assert cache.get(item.playlist_id).item_id is None
+
+    def test_other_processes_reload_after_commit(self, item, django_capture_on_commit_callbacks):
+        """Test that a change made in one process is seen by another sharing the generations."""
+        client = FakeRedis()
+        writer, reader = PlaybackCache(client), PlaybackCache(client)
+        reader.get(item.playlist_id)
+
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            PlaybackState.objects.create(playlist_id=item.playlist_id, item=item, started_at=timezone.now())
+            writer.changed(item.playlist_id)
+        assert reader.get(item.playlist_id).item_id is None
+
+        for callback in callbacks:
+            callback()
+        assert reader.get(item.playlist_id).item_id == item.id
@@ -0,0 +1,85 @@
+"""
+Tests for multi-room playlists.
+"""
+import pytest
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.playlist.models import Playlist, PlaylistTrack
+from apps.tracks.models import Track
+
+
+@pytest.mark.django_db
+class TestPlaylistRooms:
+    """Test cases for room-scoped playlists."""
+
+    @pytest.fixture
+    def api_client(self):
+        """Create API client for testing."""
+        return APIClient()
+
+    @pytest.fixture
+    def track(self):
+        """Create a track for testing."""
+        return Track.objects.create(
+            title='Test Song',
+            artist='Test Artist',
+            album='Test Album',
+            duration_seconds=180,
+            genre='rock'
+        )
+
+    @pytest.fixture
+    def room(self):
+        """Create a second playlist room."""
+        return Playlist.objects.create(name='Party', slug='party')
+
+    def test_create_room(self, api_client):
+        """Test creating a room derives its slug from the name."""
+        response = api_client.post('/api/rooms/', {'name': 'Friday Night'}, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['slug'] == 'friday-night'
+        assert api_client.get('/api/rooms/friday-night/').status_code == status.HTTP_200_OK
+
+    def test_same_track_in_two_rooms(self, api_client, track, room):
+        """Test that uniqueness is only enforced within a room."""
+        response = api_client.post('/api/playlist/', {'track_id': track.id}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = api_client.post('/api/rooms/party/playlist/', {'track_id': track.id}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['position'] == 1.0
+
+        response = api_client.post('/api/rooms/party/playlist/', {'track_id': track.id}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert room.items.count() == 1
+
+    def test_list_is_scoped_to_room(self, api_client, track, room, playlist):
+        """Test that each room only lists its own items."""
+        PlaylistTrack.objects.create(playlist=playlist, track=track, position=1.0)
+        item = PlaylistTrack.objects.create(playlist=room, track=track, position=1.0)
+
+        response = api_client.get('/api/rooms/party/playlist/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [entry['id'] for entry in response.data['results']] == [item.id]
+
+    def test_items_of_other_rooms_are_not_found(self, api_client, track, room):
+        """Test that an item cannot be changed through another room's URL."""
+        item = PlaylistTrack.objects.create(playlist=room, track=track, position=1.0)
+
+        response = api_client.post(f'/api/playlist/{item.id}/vote/', {'direction': 'up'}, format='json')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_unknown_room(self, api_client):
+        """Test that unknown rooms return 404."""
+        response = api_client.get('/api/rooms/missing/playlist/')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_versions_are_per_room(self, api_client, track, room, django_capture_on_commit_callbacks):
+        """Test that changes in one room do not bump another room's version."""
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post('/api/rooms/party/playlist/', {'track_id': track.id}, format='json')
+
+        assert api_client.get('/api/playlist/')['X-Playlist-Version'] == '0'
+        assert api_client.get('/api/rooms/party/playlist/')['X-Playlist-Version'] == '1'
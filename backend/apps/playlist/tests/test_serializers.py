@@ -0,0 +1,104 @@
+"""
+Tests for the fast read-only playlist and track serializers.
+"""
+import pytest
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from apps.playlist.models import PlaylistTrack
+from apps.playlist.playback import get_playback_cache
+from apps.playlist.serializers import PlaylistTrackReadSerializer, PlaylistTrackSerializer
+from apps.tracks.models import Track
+from apps.tracks.serializers import TrackReadSerializer, TrackSerializer
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+@pytest.mark.django_db
+class TestReadSerializers:
+    """Test that the fast path renders byte-identical JSON."""
+
+    @pytest.fixture
+    def items(self, playlist):
+        """Playlist items covering unicode, null and non-null optional fields."""
+        tracks = [
+            Track.objects.create(
+                title='Café del Mar',
+                artist='Energy 52',
+                album='Café del Mar',
+                duration_seconds=605,
+                genre='electronic',
+                cover_url='https://example.com/cover.jpg'
+            ),
+            Track.objects.create(
+                title='Test Song',
+                artist='Test Artist',
+                album='Test Album',
+                duration_seconds=59,
+                genre='rock'
+            ),
+        ]
+        return [
+            PlaylistTrack.objects.create(
+                playlist=playlist, track=tracks[0], position=1.5, votes=-2,
+                added_by='Zoë', played_at=timezone.now()
+            ),
+            PlaylistTrack.objects.create(playlist=playlist, track=tracks[1], position=2),
+        ]
+
+    def test_playlist_rows_match(self, items):
+        """Test .values() rows against PlaylistTrackSerializer, including pending votes and the playing item."""
+        pending = {items[0].pk: 3}
+        queryset = PlaylistTrack.objects.select_related('track').order_by('position')
+        fast = PlaylistTrackReadSerializer(pending, items[0].pk)
+
+        context = {'pending_votes': pending, 'playing_id': items[0].pk}
+        expected = PlaylistTrackSerializer(queryset, many=True, context=context).data
+
+        assert render(fast.serialize(fast.values(queryset))) == render(expected)
+
+    def test_playlist_instance_matches(self, items):
+        """Test serializing an already loaded instance."""
+        instance = PlaylistTrack.objects.select_related('track').get(pk=items[1].pk)
+        instance.position = 3
+
+        assert render(PlaylistTrackReadSerializer().serialize_instance(instance)) == render(
+            PlaylistTrackSerializer(instance).data
+        )
+
+    def test_track_rows_match(self, items):
+        """Test .values() rows against TrackSerializer."""
+        fast = TrackReadSerializer()
+
+        assert render(fast.serialize(fast.values(Track.objects.all()))) == render(
+            TrackSerializer(Track.objects.all(), many=True).data
+        )
+
+    @pytest.mark.parametrize('url, params', [
+        ('/api/playlist/', {}),
+        ('/api/playlist/history/', {}),
+        ('/api/tracks/', {}),
+        ('/api/tracks/', {'search': 'cafe', 'count': 'false'}),
+    ])
+    def test_endpoints_match(self, items, settings, url, params):
+        """Test that responses are the same with and without the fast path."""
+        settings.RESPONSE_CACHE_TTL = 0
+
+        settings.FAST_READ_SERIALIZERS = False
+        expected = APIClient().get(url, params).content
+        settings.FAST_READ_SERIALIZERS = True
+
+        assert APIClient().get(url, params).content == expected
+
+    def test_list_queries(self, items, settings, django_assert_num_queries):
+        """Test that the fast playlist list is the room lookup, the count and one select."""
+        settings.RESPONSE_CACHE_TTL = 0
+        # The playback state is read once per process, then cached
+        get_playback_cache().get(items[0].playlist_id)
+
+        with django_assert_num_queries(3):
+            response = APIClient().get('/api/playlist/')
+
+        assert response.status_code == 200
@@ -1,8 +1,22 @@
 """
 Tests for position calculation service.
 """
+from io import StringIO
 import pytest
-from apps.playlist.services import calculate_position
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from apps.playlist.models import Playlist, PlaylistTrack
+from apps.playlist.services import (
+    assign_ranks_from_positions,
+    calculate_position,
+    generate_rank_key,
+    generate_rank_keys,
+    generate_rank_keys_between,
+    is_position_crowded,
+    rebalance_positions,
+    rebalance_ranks,
+)
+from apps.tracks.models import Track
 
 
 class TestPositionCalculation:
@@ -42,3 +56,237 @@ class TestPositionCalculation:
         """Test that prev >= next raises ValueError."""
         with pytest.raises(ValueError):
             calculate_position(2.0, 1.0)
+
+
+@pytest.mark.django_db
+class TestPositionRebalancing:
+    """Test cases for renumbering crowded positions."""
+    
+    def create_items(self, positions):
+        """Create one playlist track per position."""
+        items = []
+        for i, position in enumerate(positions):
+            track = Track.objects.create(
+                title=f'Test Song {i}',
+                artist='Test Artist',
+                album='Test Album',
+                duration_seconds=180,
+                genre='rock'
+            )
+            items.append(PlaylistTrack.objects.create(track=track, position=position))
+        return items
+    
+    def ordered_ids(self):
+        return list(PlaylistTrack.objects.order_by('position', 'id').values_list('id', flat=True))
+    
+    def test_detects_crowded_position(self, playlist):
+        """Test that positions closer than epsilon are detected."""
+        first, second = self.create_items([1.0, 1.0 + 1e-12])
+        assert is_position_crowded(playlist, second.position, exclude_pk=second.pk)
+        assert not is_position_crowded(playlist, 3.0)
+    
+    def test_rebalance_whole_playlist(self, playlist):
+        """Test that a full rebalance renumbers every track in order."""
+        self.create_items([0.5, 0.75, 0.875, 10.0])
+        before = self.ordered_ids()
+        
+        changed = rebalance_positions(playlist)
+        
+        assert self.ordered_ids() == before
+        assert sorted(PlaylistTrack.objects.values_list('position', flat=True)) == [1.0, 2.0, 3.0, 4.0]
+        assert len(changed) == 4
+    
+    def test_rebalance_range_keeps_distant_tracks(self, playlist):
+        """Test that a partial rebalance only touches tracks near the crowded spot."""
+        positions = [float(i) for i in range(1, 41)]
+        positions[20] = positions[19] + 1e-12
+        items = self.create_items(positions)
+        before = self.ordered_ids()
+        
+        changed = rebalance_positions(playlist, positions[20])
+        
+        assert self.ordered_ids() == before
+        assert items[0].id not in changed
+        assert items[-1].id not in changed
+        assert not is_position_crowded(playlist, PlaylistTrack.objects.get(pk=items[20].pk).position, items[20].pk)
+    
+    def test_move_into_crowded_gap_rebalances(self):
+        """Test that a move which exhausts precision triggers a rebalance."""
+        first, second, third = self.create_items([1.0, 1.0 + 1e-12, 2.0])
+        
+        response = APIClient().patch(
+            f'/api/playlist/{third.id}/',
+            {'position': 1.0 + 5e-13},
+            format='json'
+        )
+        
+        assert response.status_code == 200
+        assert self.ordered_ids() == [first.id, third.id, second.id]
+        assert response.data['position'] == 2.0
+    
+    def test_rebalance_command(self):
+        """Test the rebalance_positions management command."""
+        self.create_items([0.25, 0.5])
+        call_command('rebalance_positions', stdout=StringIO())
+        assert sorted(PlaylistTrack.objects.values_list('position', flat=True)) == [1.0, 2.0]
+
+
+class TestRankKeys:
+    """Test cases for string rank key generation."""
+    
+    def test_first_key(self):
+        """Test generating the first key."""
+        assert generate_rank_key(None, None) == 'a0'
+    
+    def test_keys_sort_between_bounds(self):
+        """Test that generated keys sort strictly between their bounds."""
+        assert 'a0' < generate_rank_key('a0', 'a1') < 'a1'
+        assert generate_rank_key(None, 'a0') < 'a0'
+        assert generate_rank_key('a0', None) > 'a0'
+    
+    def test_repeated_inserts_at_same_spot(self):
+        """Test that inserting at one spot never runs out of room."""
+        low, high = 'a0', 'a1'
+        for _ in range(1000):
+            key = generate_rank_key(low, high)
+            assert low < key < high
+            high = key
+    
+    def test_appends_stay_short(self):
+        """Test that appending many keys keeps them increasing and short."""
+        keys = generate_rank_keys(10000)
+        assert keys == sorted(keys)
+        assert len(set(keys)) == len(keys)
+        assert max(len(key) for key in keys) <= 4
+    
+    def test_prepends_stay_ordered(self):
+        """Test that repeatedly inserting before the first key stays ordered."""
+        keys = ['a0']
+        for _ in range(500):
+            keys.insert(0, generate_rank_key(None, keys[0]))
+        assert keys == sorted(keys)
+    
+    def test_invalid_order_raises_error(self):
+        """Test that prev >= next raises ValueError."""
+        with pytest.raises(ValueError):
+            generate_rank_key('a1', 'a0')
+    
+    def test_keys_between_bounds_stay_short(self):
+        """Test that many keys spread between two close keys add only a few characters."""
+        keys = generate_rank_keys_between(1000, 'a0', 'a0001')
+        assert keys == sorted(keys)
+        assert len(set(keys)) == 1000
+        assert 'a0' < keys[0] and keys[-1] < 'a0001'
+        assert max(len(key) for key in keys) <= 8
+
+
+@pytest.mark.django_db
+class TestRankOrdering:
+    """Test cases for the rank ordering mode."""
+    
+    @pytest.fixture
+    def items(self, settings):
+        """Create a ranked playlist of three tracks."""
+        settings.PLAYLIST_ORDERING = 'rank'
+        items = []
+        for i in range(3):
+            track = Track.objects.create(
+                title=f'Test Song {i}',
+                artist='Test Artist',
+                album='Test Album',
+                duration_seconds=180,
+                genre='rock'
+            )
+            items.append(PlaylistTrack.objects.create(track=track, position=float(i + 1)))
+        assign_ranks_from_positions(Playlist.objects.get_default())
+        return items
+    
+    def ordered_ids(self):
+        response = APIClient().get('/api/playlist/')
+        return [item['id'] for item in response.data['results']]
+    
+    def test_move_updates_one_row(self, items):
+        """Test that a move rewrites only the moved track's rank."""
+        first, second, third = items
+        ranks = dict(PlaylistTrack.objects.values_list('id', 'rank'))
+        
+        response = APIClient().patch(
+            f'/api/playlist/{third.id}/',
+            {'after_id': first.id},
+            format='json'
+        )
+        
+        assert response.status_code == 200
+        assert self.ordered_ids() == [first.id, third.id, second.id]
+        new_ranks = dict(PlaylistTrack.objects.values_list('id', 'rank'))
+        assert [pk for pk in ranks if ranks[pk] != new_ranks[pk]] == [third.id]
+    
+    def test_move_to_front(self, items):
+        """Test moving a track before the first one."""
+        first, second, third = items
+        APIClient().patch(f'/api/playlist/{second.id}/', {'before_id': first.id}, format='json')
+        assert self.ordered_ids() == [second.id, first.id, third.id]
+    
+    def test_unknown_neighbour_fails(self, items):
+        """Test that an unknown neighbour id is rejected."""
+        response = APIClient().patch(f'/api/playlist/{items[0].id}/', {'after_id': 999}, format='json')
+        assert response.status_code == 400
+    
+    def test_position_is_rejected(self, items):
+        """Test that a position move, which rank ordering would ignore, is rejected."""
+        response = APIClient().patch(f'/api/playlist/{items[0].id}/', {'position': 5.0}, format='json')
+        
+        assert response.status_code == 400
+        assert response.data['error']['details']['error']['code'] == 'INVALID_POSITION'
+    
+    def test_rebalance_ranks_keeps_order(self, items):
+        """Test that respreading long keys shortens them without reordering."""
+        first, second, third = items
+        key = PlaylistTrack.objects.get(pk=first.pk).rank
+        PlaylistTrack.objects.filter(pk=second.pk).update(rank=key + '0' * 40 + '1')
+        before = self.ordered_ids()
+        
+        changed = rebalance_ranks(Playlist.objects.get_default())
+        
+        assert self.ordered_ids() == before
+        assert second.pk in changed
+        assert max(len(rank) for rank in PlaylistTrack.objects.values_list('rank', flat=True)) <= 2
+    
+    def test_inserts_at_one_spot_respread_keys(self, items, changelog, monkeypatch,
+                                               django_capture_on_commit_callbacks):
+        """Test that keys grown by repeated inserts at one spot are respread and broadcast."""
+        monkeypatch.setattr('apps.playlist.services.RANK_MAX_LENGTH', 8)
+        monkeypatch.setattr('apps.playlist.views.RANK_MAX_LENGTH', 8)
+        first, second, third = items
+        added = []
+        for i in range(60):
+            track = Track.objects.create(
+                title=f'Inserted Song {i}',
+                artist='Test Artist',
+                album='Test Album',
+                duration_seconds=180,
+                genre='rock'
+            )
+            with django_capture_on_commit_callbacks(execute=True):
+                response = APIClient().post(
+                    '/api/playlist/', {'track_id': track.id, 'after_id': first.id}, format='json'
+                )
+            added.append(response.data['id'])
+        
+        _, events = changelog.since('default', 0)
+        assert self.ordered_ids() == [first.id, *added[::-1], second.id, third.id]
+        assert max(len(rank) for rank in PlaylistTrack.objects.values_list('rank', flat=True)) <= 8
+        assert any('ranks' in event['payload'] for event in events if event['type'] == 'playlist.reindexed')
+    
+    def test_add_appends_rank(self, items):
+        """Test that added tracks get a rank after the last one."""
+        track = Track.objects.create(
+            title='New Song',
+            artist='Test Artist',
+            album='Test Album',
+            duration_seconds=180,
+            genre='rock'
+        )
+        response = APIClient().post('/api/playlist/', {'track_id': track.id}, format='json')
+        assert response.status_code == 201
+        assert self.ordered_ids()[-1] == response.data['id']
@@ -106,3 +106,65 @@ class TestPlaylistAPI:
         response = api_client.delete(f'/api/playlist/{playlist_track.id}/')
         assert response.status_code == status.HTTP_204_NO_CONTENT
         assert not PlaylistTrack.objects.filter(id=playlist_track.id).exists()
+    
+    def test_list_is_cached_per_version(self, api_client, sample_tracks, django_assert_num_queries,
+                                        django_capture_on_commit_callbacks):
+        """Test that unchanged playlists are served from cache and revalidated with ETags."""
+        playlist_track = PlaylistTrack.objects.create(
+            track=sample_tracks[0],
+            position=1.0,
+        )
+        
+        first = api_client.get('/api/playlist/')
+        assert first.status_code == status.HTTP_200_OK
+        etag = first['ETag']
+        
+        with django_assert_num_queries(0):
+            cached = api_client.get('/api/playlist/')
+        assert cached.content == first.content
+        
+        with django_assert_num_queries(0):
+            response = api_client.get('/api/playlist/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(
+                f'/api/playlist/{playlist_track.id}/vote/',
+                {'direction': 'up'},
+                format='json'
+            )
+        
+        response = api_client.get('/api/playlist/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+        assert response.data['results'][0]['votes'] == 1
+    
+    def test_history_is_cached(self, api_client, sample_tracks):
+        """Test that history responses carry an ETag and honour If-None-Match."""
+        playlist_track = PlaylistTrack.objects.create(
+            track=sample_tracks[0],
+            position=1.0,
+        )
+        api_client.post(f'/api/playlist/{playlist_track.id}/play/')
+        
+        response = api_client.get('/api/playlist/history/')
+        assert [item['id'] for item in response.data] == [playlist_track.id]
+        
+        response = api_client.get('/api/playlist/history/', HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    
+    def test_cached_list_is_negotiated(self, api_client, sample_tracks):
+        """Test that a cached list is still a DRF response rendered for the request."""
+        PlaylistTrack.objects.create(
+            track=sample_tracks[0],
+            position=1.0,
+        )
+        first = api_client.get('/api/playlist/')
+        
+        cached = api_client.get('/api/playlist/')
+        indented = api_client.get('/api/playlist/', HTTP_ACCEPT='application/json; indent=2')
+        
+        assert cached.data == first.data
+        assert cached['Content-Type'] == 'application/json'
+        assert indented.content.startswith(b'{\n  "count": 1')
+        assert indented['ETag'] == first['ETag']
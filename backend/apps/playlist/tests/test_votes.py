@@ -0,0 +1,99 @@
+"""
+Tests for write-behind vote aggregation.
+"""
+import pytest
+from rest_framework.test import APIClient
+from apps.playlist.models import PlaylistTrack
+from apps.tracks.models import Track
+
+
+@pytest.mark.django_db
+class TestVoteAggregator:
+    """Test cases for the vote aggregator."""
+
+    @pytest.fixture
+    def playlist_tracks(self):
+        """Create three playlist tracks for testing."""
+        items = []
+        for i in range(3):
+            track = Track.objects.create(
+                title=f'Test Song {i}',
+                artist=f'Test Artist {i}',
+                album=f'Test Album {i}',
+                duration_seconds=180,
+                genre='rock'
+            )
+            items.append(PlaylistTrack.objects.create(track=track, position=float(i + 1)))
+        return items
+
+    def test_record_returns_pending_delta(self, vote_aggregator, playlist_tracks):
+        """Test that recording votes accumulates a pending delta."""
+        item = playlist_tracks[0]
+        vote_aggregator.record(item.id, 1)
+        vote_aggregator.record(item.id, 1)
+        assert vote_aggregator.record(item.id, -1) == 1
+
+        item.refresh_from_db()
+        assert item.votes == 0
+
+    def test_flush_writes_deltas(self, vote_aggregator, playlist_tracks):
+        """Test that flushing applies every pending delta to the database."""
+        first, second, third = playlist_tracks
+        vote_aggregator.record(first.id, 1)
+        vote_aggregator.record(second.id, 1)
+        vote_aggregator.record(third.id, -1)
+
+        assert vote_aggregator.flush() == 3
+        assert vote_aggregator.pending() == {}
+
+        votes = dict(PlaylistTrack.objects.values_list('id', 'votes'))
+        assert votes == {first.id: 1, second.id: 1, third.id: -1}
+
+    def test_flush_skips_cancelled_votes(self, vote_aggregator, playlist_tracks):
+        """Test that an up and down vote cancel out without a write."""
+        item = playlist_tracks[0]
+        vote_aggregator.record(item.id, 1)
+        vote_aggregator.record(item.id, -1)
+
+        assert vote_aggregator.flush() == 0
+
+    def test_vote_endpoint_returns_live_count(self, vote_aggregator, playlist_tracks):
+        """Test that the API reports votes before they are flushed."""
+        client = APIClient()
+        item = playlist_tracks[0]
+
+        for _ in range(3):
+            response = client.post(
+                f'/api/playlist/{item.id}/vote/',
+                {'direction': 'up'},
+                format='json'
+            )
+        assert response.data['votes'] == 3
+
+        response = client.get(f'/api/playlist/{item.id}/')
+        assert response.data['votes'] == 3
+
+        vote_aggregator.flush()
+        item.refresh_from_db()
+        assert item.votes == 3
+
+        response = client.get(f'/api/playlist/{item.id}/')
+        assert response.data['votes'] == 3
+
+    @pytest.mark.parametrize('fast_read', [True, False])
+    @pytest.mark.parametrize('order', [None, 'votes'])
+    def test_list_reads_pending_votes_once(self, vote_aggregator, playlist_tracks, settings, monkeypatch,
+                                           fast_read, order):
+        """Test that a list request, even one building the vote index, reads the pending deltas once."""
+        settings.RESPONSE_CACHE_TTL = 0
+        settings.FAST_READ_SERIALIZERS = fast_read
+        vote_aggregator.record(playlist_tracks[1].id, 2)
+        client = APIClient()
+        reads = []
+        pending = vote_aggregator.pending
+        monkeypatch.setattr(vote_aggregator, 'pending', lambda: reads.append(1) or pending())
+
+        response = client.get('/api/playlist/', {'order': order} if order else {})
+
+        assert [row['votes'] for row in response.data['results']][:1] == [2 if order else 0]
+        assert len(reads) == 1
@@ -1,9 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PlaylistViewSet
+from .views import PlaylistViewSet, RoomViewSet
 
 router = DefaultRouter()
 router.register(r'playlist', PlaylistViewSet, basename='playlist')
+router.register(r'rooms', RoomViewSet, basename='room')
+router.register(r'rooms/(?P<room>[-\w]+)/playlist', PlaylistViewSet, basename='room-playlist')
 
 urlpatterns = [
     path('', include(router.urls)),
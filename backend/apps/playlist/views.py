@@ -1,26 +1,192 @@
-from rest_framework import viewsets, status
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, ValidationError
+from django.conf import settings
 from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from .models import PlaylistTrack
-from .serializers import PlaylistTrackSerializer, VoteSerializer
-from .services import calculate_position
+from apps.realtime.changelog import get_changelog
+from apps.realtime.decorators import cache_by_playlist_version
+from core.exceptions import BatchOperationError
+from core.log import RATE_LIMITED
+from core.mixins import FastReadMixin
+from core.pagination import KeysetPagination
+from .batch import apply_batch
+from .models import DEFAULT_PLAYLIST_SLUG, Playlist, PlaylistTrack
+from .order_index import RANK_EVENT, get_order_index
+from .playback import (
+    PLAYBACK_EVENT,
+    get_playback_cache,
+    pause_playback,
+    play_item,
+    playback_payload,
+    stop_playback,
+)
+from .serializers import (
+    BatchSerializer,
+    PlaylistSerializer,
+    PlaylistTrackReadSerializer,
+    PlaylistTrackSerializer,
+    VoteSerializer,
+)
+from .services import (
+    RANK_MAX_LENGTH,
+    broadcast_reindexed,
+    calculate_position,
+    is_position_crowded,
+    playlist_ordering,
+    rank_between,
+    rebalance_positions,
+    rebalance_ranks,
+    reindexed_field,
+)
+from .votes import get_vote_aggregator
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class PlaylistViewSet(viewsets.ModelViewSet):
+class RoomViewSet(mixins.CreateModelMixin,
+                  mixins.RetrieveModelMixin,
+                  mixins.ListModelMixin,
+                  viewsets.GenericViewSet):
+    """
+    Playlist rooms. Each room has its own playlist under
+    /api/rooms/{slug}/playlist/ and WebSocket at ws/playlist/{slug}/.
+    """
+    
+    queryset = Playlist.objects.all()
+    serializer_class = PlaylistSerializer
+    lookup_field = 'slug'
+    lookup_value_regex = r'[-\w]+'
+
+
+class PlaylistViewSet(FastReadMixin, viewsets.ModelViewSet):
 
     queryset = PlaylistTrack.objects.select_related('track').all()
     serializer_class = PlaylistTrackSerializer
+    read_serializer_class = PlaylistTrackReadSerializer
+    pagination_class = KeysetPagination
+    
+    @property
+    def room(self):
+        """Slug of the room from the URL; /api/playlist/ serves the default room."""
+        return self.kwargs.get('room', DEFAULT_PLAYLIST_SLUG)
+    
+    @cached_property
+    def playlist(self):
+        if self.room == DEFAULT_PLAYLIST_SLUG:
+            return Playlist.objects.get_default()
+        return get_object_or_404(Playlist, slug=self.room)
+    
+    @cached_property
+    def playback(self):
+        """The room's PlaybackState; actions that change it replace this attribute."""
+        return get_playback_cache().get(self.playlist.pk)
     
     def get_queryset(self):
-        """Get playlist ordered by position."""
-        return super().get_queryset().order_by('position')
+        """Get the room's playlist ordered by position (or rank key in rank ordering mode)."""
+        return super().get_queryset().filter(playlist=self.playlist).order_by(*playlist_ordering())
+    
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                'order',
+                openapi.IN_QUERY,
+                description="'votes' to list by votes (ties by position) from the in-memory vote index",
+                type=openapi.TYPE_STRING,
+                enum=['votes']
+            ),
+        ]
+    )
+    @cache_by_playlist_version
+    def list(self, request, *args, **kwargs):
+        """List the playlist; cached per version and tagged with X-Playlist-Version."""
+        if request.query_params.get('order') == 'votes':
+            return self.list_by_votes(request)
+        return super().list(request, *args, **kwargs)
+    
+    def list_by_votes(self, request):
+        """List a page of the vote index, loading just that page's rows."""
+        index = self.vote_index
+        keys = self.paginator.paginate_index(index, request)
+        ids = [key[-1] for key in keys]
+        
+        queryset = self.get_queryset().filter(pk__in=ids)
+        if self.use_fast_read():
+            serializer = self.get_read_serializer()
+            rows = {row['id']: row for row in serializer.values(queryset)}
+            data = serializer.serialize(rows[pk] for pk in ids if pk in rows)
+        else:
+            instances = queryset.in_bulk()
+            data = self.get_serializer([instances[pk] for pk in ids if pk in instances], many=True).data
+        return self.paginator.get_paginated_response(data)
+    
+    @cached_property
+    def pending_votes(self):
+        """Unflushed vote deltas, read once per request; actions that record a vote update this dict."""
+        return get_vote_aggregator().pending()
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['pending_votes'] = self.pending_votes
+        context['playing_id'] = self.playback.playing_id
+        return context
+    
+    def get_read_serializer(self):
+        return PlaylistTrackReadSerializer(self.pending_votes, self.playback.playing_id)
+    
+    def get_item_serializer(self):
+        """Return a function serializing one loaded item for a response or broadcast payload."""
+        if self.use_fast_read():
+            return self.get_read_serializer().serialize_instance
+        context = self.get_serializer_context()
+        return lambda instance: PlaylistTrackSerializer(instance, context=context).data
+    
+    def serialize_item(self, instance):
+        return self.get_item_serializer()(instance)
+    
+    def _rebalance_if_crowded(self, instance):
+        """Renumber positions (or respread rank keys) around the instance if it ran out of precision."""
+        if settings.PLAYLIST_ORDERING == 'rank':
+            if len(instance.rank) <= RANK_MAX_LENGTH:
+                return {}
+            ranks = rebalance_ranks(self.playlist, instance.rank)
+            instance.rank = ranks.get(instance.pk, instance.rank)
+            return ranks
+        if not is_position_crowded(self.playlist, instance.position, exclude_pk=instance.pk):
+            return {}
+        
+        positions = rebalance_positions(self.playlist, instance.position)
+        if instance.pk in positions:
+            instance.position = positions[instance.pk]
+        return positions
+    
+    def _rank_from_request(self, request, exclude_pk=None):
+        """Build a rank key from the 'after_id'/'before_id' neighbours in the request."""
+        after_id = request.data.get('after_id')
+        before_id = request.data.get('before_id')
+        try:
+            return rank_between(self.playlist, after_id, before_id, exclude_pk=exclude_pk)
+        except PlaylistTrack.DoesNotExist:
+            raise ValidationError({
+                'error': {
+                    'code': 'INVALID_NEIGHBOUR',
+                    'message': 'after_id and before_id must refer to other tracks in the playlist',
+                    'details': {'after_id': after_id, 'before_id': before_id}
+                }
+            })
+        except ValueError as e:
+            raise ValidationError({
+                'error': {
+                    'code': 'INVALID_POSITION',
+                    'message': str(e),
+                    'details': {'after_id': after_id, 'before_id': before_id}
+                }
+            })
     
     @swagger_auto_schema(
         operation_summary="Add track to playlist",
@@ -46,6 +212,14 @@ class PlaylistViewSet(viewsets.ModelViewSet):
                     description='Username of the person adding the track',
                     default='Anonymous'
                 ),
+                'after_id': openapi.Schema(
+                    type=openapi.TYPE_INTEGER,
+                    description='Rank mode: insert directly after this playlist item'
+                ),
+                'before_id': openapi.Schema(
+                    type=openapi.TYPE_INTEGER,
+                    description='Rank mode: insert directly before this playlist item'
+                ),
             },
         ),
         responses={
@@ -54,7 +228,7 @@ class PlaylistViewSet(viewsets.ModelViewSet):
         }
     )
     @transaction.atomic
-    def create(self, request):
+    def create(self, request, **kwargs):
         from apps.realtime.utils import broadcast_playlist_event
         
         # Get track_id from either 'track_id' or 'track' field
@@ -70,7 +244,7 @@ class PlaylistViewSet(viewsets.ModelViewSet):
             })
         
         # Check for duplicate
-        if PlaylistTrack.objects.filter(track_id=track_id).exists():
+        if self.playlist.items.filter(track_id=track_id).exists():
             raise ValidationError({
                 'error': {
                     'code': 'DUPLICATE_TRACK',
@@ -82,7 +256,7 @@ class PlaylistViewSet(viewsets.ModelViewSet):
         # Calculate position from request or append to end
         position = request.data.get('position')
         if position is None:
-            last_track = PlaylistTrack.objects.order_by('-position').first()
+            last_track = self.playlist.items.order_by('-position').first()
             position = calculate_position(
                 prev_position=last_track.position if last_track else None,
                 next_position=None
@@ -95,11 +269,17 @@ class PlaylistViewSet(viewsets.ModelViewSet):
             'added_by': added_by
         })
         serializer.is_valid(raise_exception=True)
-        playlist_track = serializer.save()
+        if settings.PLAYLIST_ORDERING == 'rank':
+            playlist_track = serializer.save(playlist=self.playlist, rank=self._rank_from_request(request))
+        else:
+            playlist_track = serializer.save(playlist=self.playlist)
+        reindexed = self._rebalance_if_crowded(playlist_track)
         
-        broadcast_playlist_event('track.added', serializer.data)
+        broadcast_playlist_event('track.added', serializer.data, self.room)
+        if reindexed:
+            broadcast_reindexed(self.playlist, reindexed, reindexed_field())
         
-        logger.info(f"Track {track_id} added to playlist by {added_by}")
+        logger.info("Track %s added to playlist by %s", track_id, added_by, extra=RATE_LIMITED)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     @swagger_auto_schema(
@@ -108,12 +288,20 @@ class PlaylistViewSet(viewsets.ModelViewSet):
         Update a playlist track's position or set it as the currently playing track.
         
         **Position Update**: Used for drag-and-drop reordering. The position is calculated
-        using the formula: `(prevPosition + nextPosition) / 2`
+        using the formula: `(prevPosition + nextPosition) / 2`. When the new position
+        is too close to a neighbour to keep halving, the surrounding positions are
+        renumbered and a 'playlist.reindexed' event is broadcast.
+        
+        **Rank Ordering**: With `PLAYLIST_ORDERING = 'rank'`, send `after_id` and/or
+        `before_id` (the tracks that should surround the moved track) instead of
+        `position`, which is rejected in this mode. The server generates a string
+        rank key between them, so a move updates one row until keys at one spot
+        grow too long and the keys around it are respread.
         
         **Playing State**: Only one track can be playing at a time. Setting `is_playing=true`
-        will automatically set all other tracks to `is_playing=false`.
+        makes this the room's playing track, like `POST /play/`.
         
-        **Real-time**: Broadcasts 'track.moved' or 'track.playing' event to WebSocket clients.
+        **Real-time**: Broadcasts 'track.moved' or 'playback.state' event to WebSocket clients.
         """,
         request_body=openapi.Schema(
             type=openapi.TYPE_OBJECT,
@@ -128,40 +316,58 @@ class PlaylistViewSet(viewsets.ModelViewSet):
                     description='Set track as currently playing',
                     example=True
                 ),
+                'after_id': openapi.Schema(
+                    type=openapi.TYPE_INTEGER,
+                    description='Rank mode: playlist item that should come directly before this track'
+                ),
+                'before_id': openapi.Schema(
+                    type=openapi.TYPE_INTEGER,
+                    description='Rank mode: playlist item that should come directly after this track'
+                ),
             },
         ),
         responses={200: PlaylistTrackSerializer}
     )
     @transaction.atomic
-    def partial_update(self, request, pk=None):
+    def partial_update(self, request, pk=None, **kwargs):
         from apps.realtime.utils import broadcast_playlist_event
         
         instance = self.get_object()
         
         # Handle is_playing state
         if 'is_playing' in request.data and request.data['is_playing']:
-            # Ensure only one track is playing
-            PlaylistTrack.objects.exclude(pk=instance.pk).update(is_playing=False)
-            instance.is_playing = True
-            
-            from django.utils import timezone
-            instance.played_at = timezone.now()
-            
-            broadcast_playlist_event('track.playing', {'id': instance.id})
+            self.playback = play_item(self.playlist, instance)
+            broadcast_playlist_event(PLAYBACK_EVENT, playback_payload(self.playback), self.room)
         
         # Handle position update
-        if 'position' in request.data:
+        if settings.PLAYLIST_ORDERING == 'rank' and ('after_id' in request.data or 'before_id' in request.data):
+            instance.rank = self._rank_from_request(request, exclude_pk=instance.pk)
+            instance.save()
+            reindexed = self._rebalance_if_crowded(instance)
+            
+            broadcast_playlist_event('track.moved', self.serialize_item(instance), self.room)
+            if reindexed:
+                broadcast_reindexed(self.playlist, reindexed, 'ranks')
+        elif settings.PLAYLIST_ORDERING == 'rank' and 'position' in request.data:
+            raise ValidationError({
+                'error': {
+                    'code': 'INVALID_POSITION',
+                    'message': 'Send after_id or before_id to move a track in rank ordering mode',
+                }
+            })
+        elif 'position' in request.data:
             instance.position = request.data['position']
             instance.save()
+            reindexed = self._rebalance_if_crowded(instance)
             
-            serializer = self.get_serializer(instance)
-            broadcast_playlist_event('track.moved', serializer.data)
+            broadcast_playlist_event('track.moved', self.serialize_item(instance), self.room)
+            if reindexed:
+                broadcast_reindexed(self.playlist, reindexed)
         else:
             instance.save()
         
-        serializer = self.get_serializer(instance)
-        logger.info(f"Track {instance.id} updated")
-        return Response(serializer.data)
+        logger.info("Track %s updated", instance.id, extra=RATE_LIMITED)
+        return Response(self.serialize_item(instance))
     
     @swagger_auto_schema(
         operation_summary="Remove track from playlist",
@@ -176,7 +382,7 @@ class PlaylistViewSet(viewsets.ModelViewSet):
         }
     )
     @transaction.atomic
-    def destroy(self, request, pk=None):
+    def destroy(self, request, pk=None, **kwargs):
         """Remove track from playlist."""
         from apps.realtime.utils import broadcast_playlist_event
         
@@ -185,9 +391,9 @@ class PlaylistViewSet(viewsets.ModelViewSet):
         instance.delete()
         
         # Broadcast removal event
-        broadcast_playlist_event('track.removed', {'id': track_id})
+        broadcast_playlist_event('track.removed', {'id': track_id}, self.room)
         
-        logger.info(f"Track {track_id} removed from playlist")
+        logger.info("Track %s removed from playlist", track_id, extra=RATE_LIMITED)
         return Response(status=status.HTTP_204_NO_CONTENT)
     
     @swagger_auto_schema(
@@ -198,9 +404,15 @@ class PlaylistViewSet(viewsets.ModelViewSet):
         Vote counts can be positive or negative. Each vote increments or decrements
         the vote count by 1.
         
+        Votes are aggregated and written to the database in periodic batches; the
+        response always contains the live aggregated count.
+        
         **Rate Limiting**: Maximum 5 votes per 10 seconds per user (based on IP).
         
         **Real-time**: Broadcasts 'track.voted' event to all WebSocket clients.
+        With `AUTO_SORT_BY_VOTES`, a vote that changes the track's place in the vote
+        order also broadcasts 'track.ranked' with its old and new 1-based rank, in the
+        same message.
         """,
         request_body=VoteSerializer,
         responses={
@@ -209,13 +421,12 @@ class PlaylistViewSet(viewsets.ModelViewSet):
         }
     )
     @action(detail=True, methods=['post'])
-    @transaction.atomic
-    def vote(self, request, pk=None):
+    def vote(self, request, pk=None, **kwargs):
         """
         Vote on a track (upvote or downvote).
         Includes rate limiting via decorator.
         """
-        from apps.realtime.utils import broadcast_playlist_event
+        from apps.realtime.utils import broadcast_playlist_events
         
         instance = self.get_object()
         vote_serializer = VoteSerializer(data=request.data)
@@ -223,29 +434,39 @@ class PlaylistViewSet(viewsets.ModelViewSet):
         
         direction = vote_serializer.validated_data['direction']
         
-        # Update votes
-        if direction == 'up':
-            instance.votes += 1
-        elif direction == 'down':
-            instance.votes -= 1
+        # Load the vote order before this vote is counted in it
+        vote_index = self.vote_index if settings.AUTO_SORT_BY_VOTES else None
         
-        instance.save()
+        # Record the vote; the aggregator flushes it to the database later
+        pending = get_vote_aggregator().record(instance.id, 1 if direction == 'up' else -1)
+        self.pending_votes[instance.id] = pending
         
-        serializer = self.get_serializer(instance)
+        data = self.serialize_item(instance)
+        events = [{'type': 'track.voted', 'payload': data}]
+        
+        # Tell clients where the track moved instead of having them re-sort
+        if vote_index is not None:
+            ranks = vote_index.rank_change(instance.id, vote_index.key(data))
+            if ranks is not None:
+                events.append({
+                    'type': RANK_EVENT,
+                    'payload': {'id': instance.id, 'from': ranks[0], 'to': ranks[1]}
+                })
         
         # Broadcast vote event
-        broadcast_playlist_event('track.voted', serializer.data)
+        broadcast_playlist_events(events, self.room)
         
-        logger.info(f"Track {instance.id} voted {direction}")
-        return Response(serializer.data)
+        logger.info("Track %s voted %s", instance.id, direction, extra=RATE_LIMITED)
+        return Response(data)
     
     @swagger_auto_schema(
         operation_summary="Play a track",
         operation_description="""
-        Set a track as currently playing. Only one track can be playing at a time.
-        All other tracks will be set to not playing.
+        Set a track as currently playing. Only one track can be playing at a time:
+        the room's playback state names the playing track, so no other track is
+        written. Playing the paused current track resumes it from where it was paused.
         
-        **Real-time**: Broadcasts 'track.playing' event to all WebSocket clients.
+        **Real-time**: Broadcasts a 'playback.state' event to all WebSocket clients.
         """,
         responses={
             200: PlaylistTrackSerializer,
@@ -254,57 +475,151 @@ class PlaylistViewSet(viewsets.ModelViewSet):
     )
     @action(detail=True, methods=['post'])
     @transaction.atomic
-    def play(self, request, pk=None):
+    def play(self, request, pk=None, **kwargs):
         """Set track as currently playing."""
+        return self._play(self.get_object())
+    
+    def _play(self, instance):
         from apps.realtime.utils import broadcast_playlist_event
-        from django.utils import timezone
-        
-        # Stop all currently playing tracks
-        PlaylistTrack.objects.filter(is_playing=True).update(is_playing=False)
         
-        # Set this track as playing
-        instance = self.get_object()
-        instance.is_playing = True
-        instance.played_at = timezone.now()
-        instance.save()
+        self.playback = play_item(self.playlist, instance)
         
-        serializer = self.get_serializer(instance)
+        data = self.serialize_item(instance)
         
         # Broadcast play event
-        broadcast_playlist_event('track.playing', serializer.data)
+        broadcast_playlist_event(PLAYBACK_EVENT, playback_payload(self.playback), self.room)
         
-        logger.info(f"Track {instance.id} is now playing")
-        return Response(serializer.data)
+        logger.info("Track %s is now playing", instance.id, extra=RATE_LIMITED)
+        return Response(data)
+    
+    @cached_property
+    def order_index(self):
+        """The room's play order: by votes with AUTO_SORT_BY_VOTES, else by position."""
+        if settings.AUTO_SORT_BY_VOTES:
+            return self.vote_index
+        index = get_order_index(self.room)
+        index.sync(self.playlist, self.pending_votes)
+        return index
+    
+    @cached_property
+    def vote_index(self):
+        """The room's items ranked by votes, ties by position."""
+        index = get_order_index(self.room, by_votes=True)
+        index.sync(self.playlist, self.pending_votes)
+        return index
+    
+    @swagger_auto_schema(
+        operation_summary="Play the next track",
+        operation_description="""
+        Play the track after the current one in playlist order (by votes when
+        `AUTO_SORT_BY_VOTES` is on). With nothing current, the first track is played.
+        Send `{"unplayed": true}` to skip tracks that have already been played.
+        
+        The order is read from an in-memory index kept current from the playlist
+        changelog, so advancing does not sort the playlist.
+        
+        **Real-time**: Broadcasts a 'playback.state' event to all WebSocket clients.
+        """,
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'unplayed': openapi.Schema(
+                    type=openapi.TYPE_BOOLEAN,
+                    description='Only consider tracks that were never played'
+                ),
+            }
+        ),
+        responses={
+            200: PlaylistTrackSerializer,
+            404: 'Not Found - No track after the current one'
+        }
+    )
+    @action(detail=False, methods=['post'])
+    @transaction.atomic
+    def next(self, request, **kwargs):
+        """Play the next track."""
+        pk = self.order_index.after(self.playback.item_id, unplayed=bool(request.data.get('unplayed')))
+        if pk is None:
+            raise NotFound('No track after the current one')
+        return self._play(get_object_or_404(self.get_queryset(), pk=pk))
+    
+    @swagger_auto_schema(
+        operation_summary="Play the previous track",
+        operation_description="""
+        Play the track before the current one in playlist order (by votes when
+        `AUTO_SORT_BY_VOTES` is on). With nothing current, the last track is played.
+        Send `{"unplayed": true}` to skip tracks that have already been played.
+        
+        **Real-time**: Broadcasts a 'playback.state' event to all WebSocket clients.
+        """,
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'unplayed': openapi.Schema(
+                    type=openapi.TYPE_BOOLEAN,
+                    description='Only consider tracks that were never played'
+                ),
+            }
+        ),
+        responses={
+            200: PlaylistTrackSerializer,
+            404: 'Not Found - No track before the current one'
+        }
+    )
+    @action(detail=False, methods=['post'])
+    @transaction.atomic
+    def previous(self, request, **kwargs):
+        """Play the previous track."""
+        pk = self.order_index.before(self.playback.item_id, unplayed=bool(request.data.get('unplayed')))
+        if pk is None:
+            raise NotFound('No track before the current one')
+        return self._play(get_object_or_404(self.get_queryset(), pk=pk))
+    
+    @swagger_auto_schema(
+        operation_summary="Pause playback",
+        operation_description="""
+        Pause the playing track, remembering how far into it playback got.
+        `POST /play/` on the same track resumes from there.
+        
+        **Real-time**: Broadcasts a 'playback.state' event with is_playing=false.
+        """,
+        responses={200: 'OK - The playback state'}
+    )
+    @action(detail=False, methods=['post'])
+    @transaction.atomic
+    def pause(self, request, **kwargs):
+        """Pause playback."""
+        from apps.realtime.utils import broadcast_playlist_event
+        
+        state = pause_playback(self.playlist)
+        if state is None:
+            return Response(playback_payload(self.playback))
+        
+        data = playback_payload(state)
+        broadcast_playlist_event(PLAYBACK_EVENT, data, self.room)
+        
+        logger.info("Paused playback of %s at %.1fs", state.item_id, state.offset)
+        return Response(data)
     
     @swagger_auto_schema(
         operation_summary="Stop playback",
         operation_description="""
-        Stop the currently playing track. Sets all tracks to not playing.
+        Stop playback. The room's playback state is cleared in a single row update.
         
-        **Real-time**: Broadcasts 'track.playing' event with is_playing=false.
+        **Real-time**: Broadcasts a 'playback.state' event with no item.
         """,
         responses={200: 'OK - Playback stopped'}
     )
     @action(detail=False, methods=['post'])
     @transaction.atomic
-    def stop(self, request):
+    def stop(self, request, **kwargs):
         """Stop all playback."""
         from apps.realtime.utils import broadcast_playlist_event
         
-        # Stop all currently playing tracks
-        playing_tracks = PlaylistTrack.objects.filter(is_playing=True)
-        if playing_tracks.exists():
-            track_ids = list(playing_tracks.values_list('id', flat=True))
-            playing_tracks.update(is_playing=False)
-            
-            # Broadcast stop event for each track
-            for track_id in track_ids:
-                broadcast_playlist_event('track.playing', {
-                    'id': track_id,
-                    'is_playing': False
-                })
-            
-            logger.info(f"Stopped playback for {len(track_ids)} track(s)")
+        state = stop_playback(self.playlist)
+        if state is not None:
+            broadcast_playlist_event(PLAYBACK_EVENT, playback_payload(state), self.room)
+            logger.info("Stopped playback")
         
         return Response({'status': 'stopped'})
     
@@ -315,16 +630,119 @@ class PlaylistViewSet(viewsets.ModelViewSet):
         
         Tracks are ordered by `played_at` timestamp in descending order.
         Only tracks that have been played (have a `played_at` value) are returned.
+        
+        **Caching**: Responses are cached per playlist version and carry an `ETag`;
+        send `If-None-Match` to get `304 Not Modified` when nothing has changed.
         """,
         responses={200: PlaylistTrackSerializer(many=True)}
     )
     @action(detail=False, methods=['get'])
-    def history(self, request):
+    @cache_by_playlist_version
+    def history(self, request, **kwargs):
         """Get recently played tracks."""
-        played_tracks = PlaylistTrack.objects.filter(
+        played_tracks = self.playlist.items.select_related('track').filter(
             played_at__isnull=False
         ).order_by('-played_at')[:20]
         
-        serializer = self.get_serializer(played_tracks, many=True)
-        logger.info("Fetched playlist history")
-        return Response(serializer.data)
+        data = self.serialize_many(played_tracks)
+        logger.info("Fetched playlist history", extra=RATE_LIMITED)
+        return Response(data)
+    
+    @swagger_auto_schema(
+        operation_summary="Apply a batch of playlist changes",
+        operation_description="""
+        Apply an ordered list of operations in a single transaction.
+        
+        Each operation has an `op` of `add` (`track_id`, optional `added_by`/`position`),
+        `remove` (`id`), `move` (`id` plus `position`, or `after_id`/`before_id` in rank
+        mode) or `vote` (`id`, `direction`). Duplicate tracks are checked with one query
+        for the whole batch and rows are written with bulk operations. If any operation
+        is invalid nothing is applied and the index of the failing operation is returned.
+        
+        **Real-time**: Broadcasts all resulting events in one 'playlist.batch' message.
+        """,
+        request_body=BatchSerializer,
+        responses={
+            200: 'OK - List of resulting events, one per operation',
+            400: 'Bad Request - Invalid operation (see error.details.index)'
+        }
+    )
+    @action(detail=False, methods=['post'])
+    @transaction.atomic
+    def batch(self, request, **kwargs):
+        """Apply several playlist mutations at once."""
+        from apps.realtime.utils import broadcast_playlist_events
+        
+        batch_serializer = BatchSerializer(data=request.data)
+        batch_serializer.is_valid(raise_exception=True)
+        operations = batch_serializer.validated_data['operations']
+        
+        try:
+            changes = apply_batch(self.playlist, operations)
+        except BatchOperationError as e:
+            raise ValidationError({
+                'error': {
+                    'code': e.code,
+                    'message': e.message,
+                    'details': {'index': e.index}
+                }
+            })
+        
+        serialize = self.get_item_serializer()
+        events = [
+            {
+                'type': event_type,
+                'payload': item if isinstance(item, dict) else serialize(item)
+            }
+            for event_type, item in changes
+        ]
+        broadcast_playlist_events(events, self.room)
+        
+        logger.info("Applied batch of %s playlist operation(s)", len(operations))
+        return Response({'results': events})
+    
+    @swagger_auto_schema(
+        operation_summary="Get playlist changes since a version",
+        operation_description="""
+        Return the events broadcast after the given playlist version, oldest first.
+        
+        Every WebSocket event carries a `version`, and `GET /api/playlist/` returns the
+        current one in the `X-Playlist-Version` header. Reconnecting clients pass the
+        last version they applied to receive only the changes they missed. When that
+        version is no longer in the changelog, `resync` is true and the client should
+        reload the full playlist.
+        """,
+        manual_parameters=[
+            openapi.Parameter(
+                'since',
+                openapi.IN_QUERY,
+                description="Last playlist version the client has applied",
+                type=openapi.TYPE_INTEGER,
+                required=True
+            ),
+        ],
+        responses={
+            200: 'OK - {"version": int, "resync": bool, "changes": [event, ...]}',
+            400: 'Bad Request - Missing or invalid since parameter'
+        }
+    )
+    @action(detail=False, methods=['get'])
+    def changes(self, request, **kwargs):
+        """Get the changes after a playlist version."""
+        try:
+            since = int(request.query_params['since'])
+        except (KeyError, ValueError):
+            raise ValidationError({
+                'error': {
+                    'code': 'INVALID_VERSION',
+                    'message': 'since must be an integer playlist version',
+                }
+            })
+        
+        version, changes = get_changelog().since(self.room, since)
+        if changes is None:
+            logger.info("Version %s too old for delta sync, current is %s", since, version)
+            return Response({'version': version, 'resync': True, 'changes': []})
+        
+        return Response({'version': version, 'resync': False, 'changes': changes})
+
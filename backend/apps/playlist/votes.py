@@ -0,0 +1,186 @@
+"""
+Write-behind vote aggregation.
+
+Votes are recorded as per-track deltas in a shared counter store and flushed
+to ``PlaylistTrack.votes`` in batched ``F()`` updates, so the vote endpoint
+never has to read-modify-write the playlist row.
+"""
+from collections import defaultdict
+from functools import lru_cache
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from apps.playlist.models import PlaylistTrack
+from core.redis_client import get_redis_client
+import atexit
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryVoteStore:
+    """
+    In-process vote deltas, used when Redis is not available.
+
+    Each worker process keeps its own deltas, so until they are flushed every
+    worker reports different counts, and a worker that crashes loses its
+    unflushed votes (a clean exit flushes them).
+    """
+
+    def __init__(self):
+        self._deltas = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def incr(self, track_id, delta):
+        with self._lock:
+            self._deltas[track_id] += delta
+            return self._deltas[track_id]
+
+    def pending(self):
+        with self._lock:
+            return dict(self._deltas)
+
+    def drain(self):
+        with self._lock:
+            deltas, self._deltas = dict(self._deltas), defaultdict(int)
+        return deltas
+
+    def restore(self, deltas):
+        with self._lock:
+            for track_id, delta in deltas.items():
+                self._deltas[track_id] += delta
+
+    def clear(self):
+        with self._lock:
+            self._deltas.clear()
+
+
+class RedisVoteStore:
+    """Vote deltas kept in a Redis hash shared by every worker process."""
+
+    key = 'playlist:votes:pending'
+
+    def __init__(self, client):
+        self.client = client
+
+    def incr(self, track_id, delta):
+        return self.client.hincrby(self.key, track_id, delta)
+
+    def pending(self):
+        return {int(k): int(v) for k, v in self.client.hgetall(self.key).items()}
+
+    def drain(self):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hgetall(self.key)
+        pipe.delete(self.key)
+        deltas, _ = pipe.execute()
+        return {int(k): int(v) for k, v in deltas.items()}
+
+    def restore(self, deltas):
+        pipe = self.client.pipeline(transaction=True)
+        for track_id, delta in deltas.items():
+            pipe.hincrby(self.key, track_id, delta)
+        pipe.execute()
+
+    def clear(self):
+        self.client.delete(self.key)
+
+
+class VoteAggregator:
+
+    def __init__(self, store):
+        self.store = store
+        self._flusher = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def record(self, track_id, delta):
+        """Add a vote delta for a track and return its pending (unflushed) delta."""
+        self._ensure_flusher()
+        return self.store.incr(track_id, delta)
+
+    def pending(self):
+        """Return ``{track_id: delta}`` for every vote not yet written to the database."""
+        return self.store.pending()
+
+    def flush(self):
+        """
+        Write all pending deltas to the database and return the number of rows updated.
+
+        Tracks sharing the same delta are updated together, so a flush costs one
+        ``UPDATE`` per distinct delta rather than one per track. If the database
+        write fails the deltas are put back so no votes are lost.
+        """
+        deltas = {k: v for k, v in self.store.drain().items() if v}
+        if not deltas:
+            return 0
+
+        by_delta = defaultdict(list)
+        for track_id, delta in deltas.items():
+            by_delta[delta].append(track_id)
+
+        updated = 0
+        try:
+            with transaction.atomic():
+                for delta, track_ids in by_delta.items():
+                    updated += PlaylistTrack.objects.filter(pk__in=track_ids).update(
+                        votes=F('votes') + delta
+                    )
+        except Exception:
+            self.store.restore(deltas)
+            raise
+
+        logger.debug("Flushed votes for %s track(s)", len(deltas))
+        return updated
+
+    def start(self, interval):
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._stop.clear()
+            self._flusher = threading.Thread(
+                target=self._run, args=(interval,), name='vote-flusher', daemon=True
+            )
+            self._flusher.start()
+        logger.info("Vote flusher started (interval: %ss)", interval)
+
+    def stop(self):
+        with self._lock:
+            flusher, self._flusher = self._flusher, None
+        if flusher is not None:
+            self._stop.set()
+            flusher.join()
+
+    def _ensure_flusher(self):
+        if self._flusher is None and settings.VOTE_FLUSH_INTERVAL > 0:
+            self.start(settings.VOTE_FLUSH_INTERVAL)
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush votes")
+            finally:
+                close_old_connections()
+
+
+@lru_cache(maxsize=None)
+def get_vote_aggregator():
+    """Return the process-wide vote aggregator."""
+    client = get_redis_client() if settings.VOTE_COUNTER_BACKEND == 'redis' else None
+    if client is None and settings.VOTE_COUNTER_BACKEND == 'redis':
+        logger.warning("Redis is not available; counting votes per process until they are flushed")
+    store = RedisVoteStore(client) if client is not None else MemoryVoteStore()
+    aggregator = VoteAggregator(store)
+    atexit.register(_flush_on_exit, aggregator)
+    return aggregator
+
+
+def _flush_on_exit(aggregator):
+    aggregator.stop()
+    try:
+        aggregator.flush()
+    except Exception:
+        logger.exception("Failed to flush votes on exit")
@@ -0,0 +1,59 @@
+"""
+Pre-rendered response cache keyed on the playlist version.
+"""
+from collections import OrderedDict
+from functools import lru_cache
+from django.conf import settings
+import hashlib
+import threading
+import time
+
+
+class ResponseCache:
+    """
+    Keeps rendered JSON bodies for the latest version of each playlist room.
+
+    Any new version of a room makes every entry for that room stale, so
+    mutations invalidate the cache simply by being broadcast. Entries also
+    expire after ``ttl`` seconds to pick up edits made outside the API.
+    ``max_entries`` bounds the number of bodies kept per room.
+    """
+
+    def __init__(self, ttl, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._rooms = {}
+        self._lock = threading.Lock()
+
+    def get(self, room, version, key):
+        """Return ``(etag, body)`` for a request path, or None on a miss."""
+        with self._lock:
+            cached_version, entries = self._rooms.get(room, (None, None))
+            if version != cached_version:
+                return None
+            entry = entries.get(key)
+            if entry is None or time.monotonic() - entry[2] >= self.ttl:
+                return None
+            return entry[0], entry[1]
+
+    def set(self, room, version, key, body):
+        """Store a rendered body and return its ``(etag, body)``."""
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        with self._lock:
+            cached_version, entries = self._rooms.get(room, (None, None))
+            if cached_version is not None and version < cached_version:
+                return etag, body
+            if version != cached_version:
+                entries = OrderedDict()
+                self._rooms[room] = (version, entries)
+            entries[key] = (etag, body, time.monotonic())
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+        return etag, body
+
+
+@lru_cache(maxsize=None)
+def get_response_cache():
+    """Return the process-wide response cache."""
+    return ResponseCache(settings.RESPONSE_CACHE_TTL)
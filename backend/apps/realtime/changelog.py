@@ -0,0 +1,125 @@
+"""
+Versioned, bounded changelog of playlist events.
+
+Every broadcast event is stamped with a monotonically increasing version,
+counted separately for each playlist room, and kept in a bounded log, so
+reconnecting clients can fetch just the events they missed instead of
+reloading the whole playlist.
+"""
+from collections import deque
+from functools import lru_cache
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from core.redis_client import get_redis_client
+import json
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryChangelog:
+    """In-process changelog, used when Redis is not available."""
+
+    def __init__(self, size):
+        self.size = size
+        self._rooms = {}
+        self._lock = threading.Lock()
+
+    def _room(self, room):
+        if room not in self._rooms:
+            self._rooms[room] = [0, deque(maxlen=self.size)]
+        return self._rooms[room]
+
+    def append(self, room, event):
+        with self._lock:
+            state = self._room(room)
+            state[0] += 1
+            event['version'] = state[0]
+            state[1].append(event)
+            return state[0]
+
+    def current_version(self, room):
+        state = self._rooms.get(room)
+        return state[0] if state else 0
+
+    def since(self, room, version):
+        with self._lock:
+            current, entries = self._room(room)
+            oldest = entries[0]['version'] if entries else current + 1
+            if version > current or version < oldest - 1:
+                return current, None
+            return current, [e for e in entries if e['version'] > version]
+
+    def clear(self):
+        with self._lock:
+            self._rooms.clear()
+
+
+class RedisChangelog:
+    """Changelog shared by every worker, kept in one Redis sorted set per room scored by version."""
+
+    # Bump the version and store the entry atomically, so readers never see
+    # a later version before an earlier one.
+    APPEND_SCRIPT = """
+    local version = redis.call('INCR', KEYS[1])
+    redis.call('ZADD', KEYS[2], version, version .. ':' .. ARGV[1])
+    redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -tonumber(ARGV[2]) - 1)
+    return version
+    """
+
+    def __init__(self, client, size):
+        self.client = client
+        self.size = size
+        self._append = client.register_script(self.APPEND_SCRIPT)
+
+    @staticmethod
+    def version_key(room):
+        return f'playlist:{room}:version'
+
+    @staticmethod
+    def entries_key(room):
+        return f'playlist:{room}:changes'
+
+    def append(self, room, event):
+        data = json.dumps(event, cls=DjangoJSONEncoder)
+        version = self._append(keys=[self.version_key(room), self.entries_key(room)], args=[data, self.size])
+        event['version'] = version
+        return version
+
+    def current_version(self, room):
+        return int(self.client.get(self.version_key(room)) or 0)
+
+    def since(self, room, version):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.get(self.version_key(room))
+        pipe.zrange(self.entries_key(room), 0, 0, withscores=True)
+        pipe.zrangebyscore(self.entries_key(room), f'({version}', '+inf')
+        current, oldest, members = pipe.execute()
+
+        current = int(current or 0)
+        oldest = int(oldest[0][1]) if oldest else current + 1
+        if version > current or version < oldest - 1:
+            return current, None
+
+        events = []
+        for member in members:
+            entry_version, data = member.split(':', 1)
+            event = json.loads(data)
+            event['version'] = int(entry_version)
+            events.append(event)
+        return current, events
+
+    def clear(self):
+        keys = [*self.client.scan_iter('playlist:*:version'), *self.client.scan_iter('playlist:*:changes')]
+        if keys:
+            self.client.delete(*keys)
+
+
+@lru_cache(maxsize=None)
+def get_changelog():
+    """Return the process-wide playlist changelog."""
+    client = get_redis_client() if settings.CHANGELOG_BACKEND == 'redis' else None
+    if client is not None:
+        return RedisChangelog(client, settings.CHANGELOG_SIZE)
+    return MemoryChangelog(settings.CHANGELOG_SIZE)
@@ -0,0 +1,85 @@
+"""
+Short-window coalescing of playlist events.
+
+Events broadcast within the window are merged per track id and delivered
+together as a single ``playlist.batch`` envelope.
+"""
+from collections import OrderedDict
+from itertools import count
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+BATCH_EVENT = 'playlist.batch'
+
+# Events that only carry the latest state of a track, so a newer event for
+# the same track makes any earlier one obsolete (last write wins).
+COALESCED_EVENTS = {'track.voted', 'track.moved'}
+
+# Events carrying the whole state of something the room has one of
+ROOM_STATE_EVENTS = {'playback.state'}
+
+
+def merge_key(event):
+    """Return the key shared by events that supersede each other, or None."""
+    if event['type'] in ROOM_STATE_EVENTS:
+        return (event['type'],)
+    if event['type'] not in COALESCED_EVENTS:
+        return None
+    payload = event.get('payload') or {}
+    if 'id' not in payload:
+        return None
+    return (event['type'], payload['id'])
+
+
+class EventCoalescer:
+
+    def __init__(self, window, send):
+        self.window = window
+        self.send = send
+        self._buffers = {}
+        self._sequence = count()
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def add(self, group, event):
+        """
+        Buffer an event for a group, starting the window if it is not running.
+
+        An event that supersedes a buffered one replaces it at the back of the
+        buffer, so the batch stays in version order.
+        """
+        with self._lock:
+            events = self._buffers.setdefault(group, OrderedDict())
+            key = merge_key(event)
+            if key is not None:
+                events.pop(key, None)
+            else:
+                key = next(self._sequence)
+            events[key] = event
+
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Deliver everything buffered so far, one message per group."""
+        with self._lock:
+            buffers, self._buffers = self._buffers, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        for group, buffered in buffers.items():
+            events = list(buffered.values())
+            if len(events) == 1:
+                self.send(group, events[0])
+            else:
+                batch = {'type': BATCH_EVENT, 'events': events}
+                versions = [e['version'] for e in events if 'version' in e]
+                if versions:
+                    batch['version'] = max(versions)
+                self.send(group, batch)
+                logger.debug("Coalesced %s event(s) for %s", len(events), group)
@@ -1,9 +1,51 @@
 from functools import wraps
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from .cache import get_response_cache
+from .changelog import get_changelog
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class CachedResponse(Response):
+    """
+    A Response whose JSON rendering is already known.
+    
+    Plain JSON requests get the cached body as is; any other negotiated
+    renderer (the browsable API, ``?format=``, an indented Accept) renders
+    ``data``, which is only parsed back from the body when it is needed.
+    """
+    
+    def __init__(self, body, data=None, **kwargs):
+        self.body = body
+        super().__init__(data, **kwargs)
+    
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = json.loads(self.body)
+        return self._data
+    
+    @data.setter
+    def data(self, value):
+        self._data = value
+    
+    @property
+    def rendered_content(self):
+        renderer = getattr(self, 'accepted_renderer', None)
+        if type(renderer) is JSONRenderer and renderer.get_indent(
+            self.accepted_media_type, self.renderer_context
+        ) is None:
+            self['Content-Type'] = self.content_type or renderer.media_type
+            return self.body
+        return super().rendered_content
+
+
 def require_websocket_connection(func):
     @wraps(func)
     async def wrapper(self, *args, **kwargs):
@@ -12,3 +54,46 @@ def require_websocket_connection(func):
             return None
         return await func(self, *args, **kwargs)
     return wrapper
+
+
+def cache_by_playlist_version(func):
+    """
+    Serve a GET view from pre-rendered JSON cached per playlist version.
+    
+    Cached responses go through content negotiation like any other, and
+    JSON clients get the cached bytes without re-rendering. Responses carry
+    an ETag and the X-Playlist-Version header, and requests whose
+    If-None-Match matches get a 304 without touching the database. The view
+    must expose the playlist room it serves as ``self.room``.
+    """
+    @wraps(func)
+    def wrapper(self, request, *args, **kwargs):
+        if settings.RESPONSE_CACHE_TTL <= 0:
+            return func(self, request, *args, **kwargs)
+        
+        cache = get_response_cache()
+        room = self.room
+        # Read the version first so a cached body is never older than its key
+        version = get_changelog().current_version(room)
+        key = request.get_full_path()
+        
+        data = None
+        entry = cache.get(room, version, key)
+        if entry is None:
+            response = func(self, request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            data = response.data
+            entry = cache.set(room, version, key, JSONRenderer().render(data))
+            logger.debug("Cached response for %s at version %s", key, version)
+        
+        etag, body = entry
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = CachedResponse(body, data)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'
+        response['X-Playlist-Version'] = version
+        return response
+    return wrapper
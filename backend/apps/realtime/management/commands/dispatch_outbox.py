@@ -0,0 +1,61 @@
+"""
+Management command to deliver playlist events from the transactional outbox.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from apps.realtime.outbox import OutboxDispatcher
+import time
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued playlist events from the outbox to WebSocket clients'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the outbox once and exit instead of polling',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.OUTBOX_BATCH_SIZE,
+            help='Maximum number of events delivered per pass',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.OUTBOX_POLL_INTERVAL,
+            help='Seconds to wait between polls when the outbox is empty',
+        )
+        parser.add_argument(
+            '--name',
+            default='default',
+            help='Name the dispatcher records its delivery progress under',
+        )
+    
+    def handle(self, *args, **options):
+        dispatcher = OutboxDispatcher(options['name'], options['batch_size'])
+        
+        if options['once']:
+            total = 0
+            while True:
+                sent = dispatcher.dispatch_batch()
+                total += sent
+                if sent < options['batch_size']:
+                    break
+            dispatcher.prune(settings.OUTBOX_RETENTION)
+            self.stdout.write(self.style.SUCCESS(f'Dispatched {total} outbox event(s)'))
+            return
+        
+        self.stdout.write(self.style.SUCCESS(f"Dispatching outbox events as '{options['name']}'"))
+        try:
+            while True:
+                sent = dispatcher.dispatch_batch()
+                if sent < options['batch_size']:
+                    dispatcher.prune(settings.OUTBOX_RETENTION)
+                    close_old_connections()
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped outbox dispatcher')
@@ -0,0 +1,37 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class OutboxEvent(models.Model):
+    """A playlist event written in the same transaction as the change it describes."""
+    
+    room = models.CharField(max_length=50)
+    event = models.JSONField(encoder=DjangoJSONEncoder)
+    version = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['dispatched_at', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.event.get('type')} for {self.room} ({self.pk})"
+
+
+class OutboxOffset(models.Model):
+    """
+    Delivery progress of an outbox dispatcher.
+    
+    ``last_id`` is the highest event id delivered. Events with lower ids may
+    still be pending, so it is for monitoring only.
+    """
+    
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} at {self.last_id}"
@@ -0,0 +1,57 @@
+"""
+Bounded per-connection queue of encoded WebSocket frames.
+
+A consumer reads group messages into its queue as soon as they arrive and
+a separate task writes them to the socket, so a client on a slow link only
+holds back its own queue. Frames that supersede a queued frame (a newer
+vote count for the same track) replace it, and when the queue is still
+full the connection is told to resync instead of growing without bound.
+"""
+from collections import OrderedDict
+from itertools import count
+
+RESYNC_REQUIRED_EVENT = 'resync.required'
+
+
+class OutboundQueue:
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.overflowed = False
+        self._frames = OrderedDict()
+        self._sequence = count()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def put(self, frame, key=None):
+        """
+        Queue a frame, replacing any queued frame with the same ``key``.
+
+        The replacement goes to the back of the queue so frames stay in
+        version order. Returns False if the frame was not queued because the
+        queue is full or has overflowed.
+        """
+        if self.overflowed:
+            return False
+        if key is not None:
+            self._frames.pop(key, None)
+        else:
+            key = next(self._sequence)
+        if len(self._frames) >= self.max_size:
+            return False
+        self._frames[key] = frame
+        return True
+
+    def pop(self):
+        return self._frames.popitem(last=False)[1]
+
+    def overflow(self, frame):
+        """Drop everything queued for a final frame; nothing else is accepted until reset()."""
+        self._frames.clear()
+        self._frames[next(self._sequence)] = frame
+        self.overflowed = True
+
+    def reset(self):
+        self._frames.clear()
+        self.overflowed = False
@@ -0,0 +1,122 @@
+"""
+Transactional outbox for playlist events.
+
+With ``BROADCAST_OUTBOX`` enabled, broadcasts are stored as OutboxEvent rows
+in the same transaction as the playlist change, and a separate dispatcher
+(``manage.py dispatch_outbox``) delivers them in batches. An event is only
+marked as dispatched after the channel layer accepted it, so a Redis outage
+delays events instead of losing them (at-least-once delivery).
+
+The playlist version only moves when the dispatcher picks an event up, so
+until then the version-keyed response cache, snapshots and order indexes
+keep serving the room as it was before the write, even to the client that
+made it. The write's own response carries the new state.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.utils import timezone
+from core.metrics import get_metrics
+from .changelog import get_changelog
+from .coalescing import BATCH_EVENT
+from .models import OutboxEvent, OutboxOffset
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def write_outbox(room, events):
+    """Store events for a room in the current transaction."""
+    OutboxEvent.objects.bulk_create([OutboxEvent(room=room, event=event) for event in events])
+
+
+class OutboxDispatcher:
+    """
+    Drains the outbox in id order, one channel-layer call per room per batch.
+
+    Every undispatched row is scanned on each pass rather than the rows after
+    an id offset, since on a concurrent database a lower id can commit after
+    a higher one was delivered. Events get their playlist version when first
+    picked up; the version is saved on the row so a retried event keeps it.
+    A room whose send fails is left out for ``retry_delay`` seconds, so its
+    backlog does not crowd other rooms out of the batch. Run a single
+    dispatcher at a time.
+    """
+
+    def __init__(self, name='default', batch_size=500, retry_delay=5.0):
+        self.name = name
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay
+        self._retry_at = {}
+
+    def dispatch_batch(self):
+        """Deliver up to ``batch_size`` pending events and return how many were sent."""
+        now = time.monotonic()
+        self._retry_at = {room: at for room, at in self._retry_at.items() if at > now}
+        pending = OutboxEvent.objects.filter(dispatched_at__isnull=True).exclude(room__in=self._retry_at)
+        rows = list(pending.order_by('id')[:self.batch_size])
+        if not rows:
+            return 0
+
+        changelog = get_changelog()
+        rooms = defaultdict(list)
+        versioned = []
+        for row in rows:
+            event = dict(row.event)
+            if row.version is None:
+                row.version = changelog.append(row.room, event)
+                versioned.append(row)
+            event['version'] = row.version
+            rooms[row.room].append((row.pk, event))
+        if versioned:
+            OutboxEvent.objects.bulk_update(versioned, ['version'])
+
+        delivered = []
+        for room, entries in rooms.items():
+            try:
+                self.send(room, [event for _, event in entries])
+            except Exception as e:
+                logger.error("Failed to dispatch %s outbox event(s) for %s: %s", len(entries), room, e)
+                self._retry_at[room] = now + self.retry_delay
+                continue
+            delivered.extend(pk for pk, _ in entries)
+
+        if not delivered:
+            return 0
+        OutboxEvent.objects.filter(pk__in=delivered).update(dispatched_at=timezone.now())
+
+        offset, _ = OutboxOffset.objects.get_or_create(name=self.name)
+        if max(delivered) > offset.last_id:
+            offset.last_id = max(delivered)
+            offset.save(update_fields=['last_id', 'updated_at'])
+
+        logger.debug("Dispatched %s of %s outbox event(s), offset %s", len(delivered), len(rows), offset.last_id)
+        return len(delivered)
+
+    def send(self, room, events):
+        from .utils import group_message, room_group_name
+
+        if len(events) == 1:
+            data = events[0]
+        else:
+            data = {'type': BATCH_EVENT, 'version': events[-1]['version'], 'events': events}
+        try:
+            async_to_sync(get_channel_layer().group_send)(
+                room_group_name(room),
+                group_message(data)
+            )
+        except Exception:
+            get_metrics().inc('playlist_broadcasts_total', {'event': data['type'], 'result': 'failed'})
+            raise
+        get_metrics().inc('playlist_broadcasts_total', {'event': data['type'], 'result': 'sent'})
+
+    def prune(self, retention):
+        """Delete delivered events older than ``retention`` seconds and return the count."""
+        deleted, _ = OutboxEvent.objects.filter(
+            dispatched_at__lt=timezone.now() - timedelta(seconds=retention),
+        ).delete()
+        if deleted:
+            logger.info("Pruned %s dispatched outbox event(s)", deleted)
+        return deleted
@@ -0,0 +1,121 @@
+"""
+Background publisher for channel-layer group messages.
+
+Messages are handed to a long-lived event loop running in a daemon thread, so
+request threads never wait on the channel layer, and the layer keeps its
+connections open across messages instead of setting them up for every
+``async_to_sync`` call.
+"""
+from channels.layers import get_channel_layer
+from core.log import RATE_LIMITED
+from core.metrics import get_metrics
+import asyncio
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EventPublisher:
+    """
+    Sends group messages from a background event loop.
+
+    At most ``max_queue`` messages wait for delivery; further messages are
+    dropped and counted in ``stats()`` rather than blocking the caller.
+    """
+
+    def __init__(self, max_queue, get_layer=get_channel_layer):
+        self.max_queue = max_queue
+        self.get_layer = get_layer
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self._pending = 0
+        self._loop = None
+        self._queue = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run, name='event-publisher', daemon=True)
+            self._thread.start()
+        self._ready.wait()
+        logger.info("Event publisher started (queue size: %s)", self.max_queue)
+
+    def stop(self, timeout=5):
+        """Deliver the messages already queued, then stop the loop."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+        thread.join(timeout)
+
+    def publish(self, group, message):
+        """Queue a message for a group; returns False if the queue was full."""
+        if self._thread is None:
+            self.start()
+
+        with self._lock:
+            if self._pending >= self.max_queue:
+                self.dropped += 1
+                dropped = self.dropped
+            else:
+                self._pending += 1
+                dropped = None
+
+        if dropped is not None:
+            get_metrics().inc('playlist_broadcasts_total', {'event': message['event'], 'result': 'dropped'})
+            logger.warning("Broadcast queue full, dropped %s (%s dropped so far)", message['event'], dropped)
+            return False
+
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (group, message))
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self._pending,
+                'max_queue': self.max_queue,
+                'sent': self.sent,
+                'failed': self.failed,
+                'dropped': self.dropped,
+            }
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        self._ready.set()
+        try:
+            self._loop.run_until_complete(self._drain())
+        finally:
+            self._loop.close()
+
+    async def _drain(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+
+            group, message = item
+            try:
+                await self.get_layer().group_send(group, message)
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                get_metrics().inc('playlist_broadcasts_total', {'event': message['event'], 'result': 'failed'})
+                logger.error("Failed to broadcast event %s: %s", message['event'], e)
+            else:
+                with self._lock:
+                    self.sent += 1
+                get_metrics().inc('playlist_broadcasts_total', {'event': message['event'], 'result': 'sent'})
+                logger.debug("Broadcasted event: %s", message['event'], extra=RATE_LIMITED)
+            finally:
+                with self._lock:
+                    self._pending -= 1
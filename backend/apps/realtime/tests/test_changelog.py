@@ -0,0 +1,91 @@
+"""
+Tests for the versioned playlist changelog and delta sync.
+"""
+import pytest
+from rest_framework.test import APIClient
+from apps.playlist.models import PlaylistTrack
+from apps.realtime.changelog import MemoryChangelog
+from apps.tracks.models import Track
+
+
+class TestMemoryChangelog:
+    """Test cases for the in-process changelog."""
+    
+    def test_versions_increase(self):
+        """Test that every event gets the next version."""
+        changelog = MemoryChangelog(10)
+        first = {'type': 'track.removed', 'payload': {'id': 1}}
+        
+        assert changelog.append('default', first) == 1
+        assert changelog.append('default', {'type': 'track.removed', 'payload': {'id': 2}}) == 2
+        assert first['version'] == 1
+        assert changelog.current_version('default') == 2
+    
+    def test_since_returns_missed_events(self):
+        """Test that only events after the given version are returned."""
+        changelog = MemoryChangelog(10)
+        for i in range(5):
+            changelog.append('default', {'type': 'track.removed', 'payload': {'id': i}})
+        
+        version, events = changelog.since('default', 3)
+        assert version == 5
+        assert [e['version'] for e in events] == [4, 5]
+        assert changelog.since('default', 5) == (5, [])
+    
+    def test_since_too_old_requires_resync(self):
+        """Test that versions evicted from the log return None."""
+        changelog = MemoryChangelog(3)
+        for i in range(5):
+            changelog.append('default', {'type': 'track.removed', 'payload': {'id': i}})
+        
+        assert changelog.since('default', 1) == (5, None)
+        assert [e['version'] for e in changelog.since('default', 2)[1]] == [3, 4, 5]
+        assert changelog.since('default', 9) == (5, None)
+
+
+@pytest.mark.django_db
+class TestChangesEndpoint:
+    """Test cases for GET /api/playlist/changes/."""
+    
+    @pytest.fixture
+    def api_client(self):
+        """Create API client for testing."""
+        return APIClient()
+    
+    @pytest.fixture
+    def playlist_track(self):
+        """Create a playlist track for testing."""
+        track = Track.objects.create(
+            title='Test Song',
+            artist='Test Artist',
+            album='Test Album',
+            duration_seconds=180,
+            genre='rock'
+        )
+        return PlaylistTrack.objects.create(track=track, position=1.0)
+    
+    def test_changes_after_list(self, api_client, playlist_track, django_capture_on_commit_callbacks):
+        """Test replaying changes made after a full fetch."""
+        response = api_client.get('/api/playlist/')
+        version = int(response['X-Playlist-Version'])
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(f'/api/playlist/{playlist_track.id}/vote/', {'direction': 'up'}, format='json')
+            api_client.patch(f'/api/playlist/{playlist_track.id}/', {'position': 2.0}, format='json')
+        
+        response = api_client.get(f'/api/playlist/changes/?since={version}')
+        assert response.status_code == 200
+        assert response.data['resync'] is False
+        assert [c['type'] for c in response.data['changes']] == ['track.voted', 'track.moved']
+        assert response.data['changes'][0]['payload']['votes'] == 1
+        assert response.data['version'] == version + 2
+    
+    def test_stale_version_requires_resync(self, api_client, playlist_track):
+        """Test that a version from another server lifetime asks for a resync."""
+        response = api_client.get('/api/playlist/changes/?since=50')
+        assert response.data['resync'] is True
+    
+    def test_missing_since_fails(self, api_client):
+        """Test that since is required."""
+        response = api_client.get('/api/playlist/changes/')
+        assert response.status_code == 400
@@ -0,0 +1,78 @@
+"""
+Tests for broadcast event coalescing.
+"""
+import time
+import pytest
+from apps.realtime.coalescing import EventCoalescer
+
+
+class TestEventCoalescer:
+    """Test cases for the event coalescer."""
+
+    @pytest.fixture
+    def sent(self):
+        """Collect messages delivered by the coalescer."""
+        return []
+
+    @pytest.fixture
+    def coalescer(self, sent):
+        """Create a coalescer with a long window that is flushed manually."""
+        coalescer = EventCoalescer(60, lambda group, data: sent.append((group, data)))
+        yield coalescer
+        coalescer.flush()
+
+    def test_single_event_is_sent_unwrapped(self, coalescer, sent):
+        """Test that a lone event is delivered as-is."""
+        coalescer.add('playlist', {'type': 'track.removed', 'payload': {'id': 1}})
+        coalescer.flush()
+
+        assert sent == [('playlist', {'type': 'track.removed', 'payload': {'id': 1}})]
+
+    def test_votes_are_last_write_wins(self, coalescer, sent):
+        """Test that a burst of votes on one track becomes one event."""
+        for votes in range(200):
+            coalescer.add('playlist', {'type': 'track.voted', 'payload': {'id': 1, 'votes': votes}})
+        coalescer.flush()
+
+        assert sent == [('playlist', {'type': 'track.voted', 'payload': {'id': 1, 'votes': 199}})]
+
+    def test_mixed_events_are_batched_in_order(self, coalescer, sent):
+        """Test that distinct events share one batch envelope and keep their order."""
+        coalescer.add('playlist', {'type': 'track.added', 'payload': {'id': 2}})
+        coalescer.add('playlist', {'type': 'track.moved', 'payload': {'id': 1, 'position': 1.5}})
+        coalescer.add('playlist', {'type': 'track.voted', 'payload': {'id': 2, 'votes': 1}})
+        coalescer.add('playlist', {'type': 'track.moved', 'payload': {'id': 1, 'position': 0.5}})
+        coalescer.flush()
+
+        assert len(sent) == 1
+        group, data = sent[0]
+        assert data['type'] == 'playlist.batch'
+        assert data['events'] == [
+            {'type': 'track.added', 'payload': {'id': 2}},
+            {'type': 'track.voted', 'payload': {'id': 2, 'votes': 1}},
+            {'type': 'track.moved', 'payload': {'id': 1, 'position': 0.5}},
+        ]
+
+    def test_superseding_event_keeps_version_order(self, coalescer, sent):
+        """Test that a replacement goes after events broadcast since the one it replaces."""
+        coalescer.add('playlist', {'type': 'track.moved', 'version': 1, 'payload': {'id': 1, 'position': 1.5}})
+        coalescer.add('playlist', {'type': 'playlist.reindexed', 'version': 2, 'payload': {'positions': {'1': 2.0}}})
+        coalescer.add('playlist', {'type': 'track.moved', 'version': 3, 'payload': {'id': 1, 'position': 0.5}})
+        coalescer.flush()
+
+        _, data = sent[0]
+        assert [(event['type'], event['version']) for event in data['events']] == [
+            ('playlist.reindexed', 2),
+            ('track.moved', 3),
+        ]
+        assert data['version'] == 3
+
+    def test_window_flushes_automatically(self, sent):
+        """Test that buffered events are delivered once the window elapses."""
+        coalescer = EventCoalescer(0.01, lambda group, data: sent.append((group, data)))
+        coalescer.add('playlist', {'type': 'track.removed', 'payload': {'id': 1}})
+
+        deadline = time.monotonic() + 2
+        while not sent and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(sent) == 1
@@ -0,0 +1,147 @@
+"""
+Tests for the queued, sampled logging pipeline.
+"""
+import logging
+import threading
+import pytest
+from apps.playlist.models import PlaylistTrack
+from apps.tracks.models import Track
+from core.log import RATE_LIMITED, QueueLogHandler, RateLimitFilter
+
+
+class ListHandler(logging.Handler):
+    """Handler double that keeps formatted messages and the thread that wrote them."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+        self.threads.add(threading.current_thread().name)
+
+
+class Formatted:
+    """Argument that records the thread it was formatted in."""
+
+    def __init__(self):
+        self.thread = None
+
+    def __str__(self):
+        self.thread = threading.current_thread()
+        return 'formatted'
+
+
+def make_record(msg, *args, level=logging.INFO, name='apps.playlist.views', extra=RATE_LIMITED):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestQueueLogHandler:
+    """Test cases for QueueLogHandler."""
+
+    def test_records_are_written_and_formatted_by_the_listener(self):
+        """Test that the calling thread only queues the record."""
+        target = ListHandler()
+        handler = QueueLogHandler([target])
+        argument = Formatted()
+
+        handler.handle(make_record('Track %s voted', argument))
+        handler.close()
+
+        assert target.messages == ['Track formatted voted']
+        assert argument.thread is not None
+        assert argument.thread is not threading.current_thread()
+
+    def test_full_queue_drops_records(self):
+        """Test that logging never blocks when the writer falls behind."""
+        target = ListHandler()
+        handler = QueueLogHandler([target], queue_size=2)
+        handler.close()
+
+        for i in range(5):
+            handler.handle(make_record('Track %s voted', i))
+
+        assert handler.dropped == 3
+
+    def test_close_drains_a_full_queue(self):
+        """Test that closing waits for room for the stop signal and can be repeated."""
+        target = ListHandler()
+        writing, release = threading.Event(), threading.Event()
+        emit = target.emit
+
+        def slow_emit(record):
+            writing.set()
+            release.wait()
+            emit(record)
+
+        target.emit = slow_emit
+        handler = QueueLogHandler([target], queue_size=2)
+        for i in range(3):
+            handler.handle(make_record('Track %s voted', i))
+            writing.wait()
+
+        threading.Timer(0.1, release.set).start()
+        handler.close()
+        handler.close()
+
+        assert target.messages == ['Track 0 voted', 'Track 1 voted', 'Track 2 voted']
+        assert handler.dropped == 0
+
+
+class TestRateLimitFilter:
+    """Test cases for RateLimitFilter."""
+
+    def test_messages_are_sampled_per_template(self, monkeypatch):
+        """Test the limit per message and the suppressed count reported afterwards."""
+        now = [100.0]
+        monkeypatch.setattr('core.log.time.monotonic', lambda: now[0])
+        sampled = RateLimitFilter(rate=2, per=1.0)
+
+        passed = [sampled.filter(make_record('Track %s voted', i)) for i in range(5)]
+        other = sampled.filter(make_record('Track %s is now playing', 1))
+        now[0] += 1
+        record = make_record('Track %s voted', 9)
+
+        assert passed == [True, True, False, False, False]
+        assert other
+        assert sampled.filter(record)
+        assert record.getMessage() == 'Track 9 voted (3 similar message(s) suppressed)'
+
+    def test_unmarked_messages_are_never_suppressed(self):
+        """Test that only records logged with extra=RATE_LIMITED are sampled."""
+        sampled = RateLimitFilter(rate=1, per=60)
+
+        assert all(
+            sampled.filter(make_record('Created track search index', name='apps.tracks.search', extra={}))
+            for _ in range(5)
+        )
+
+    def test_warnings_are_never_suppressed(self):
+        """Test that WARNING and above always pass."""
+        sampled = RateLimitFilter(rate=1, per=60)
+
+        assert all(
+            sampled.filter(make_record('Broadcast queue full', level=logging.WARNING))
+            for _ in range(5)
+        )
+
+
+@pytest.mark.django_db
+def test_saving_does_not_load_the_track(playlist, django_assert_num_queries):
+    """Test that the post_save log line does not query the track."""
+    track = Track.objects.create(
+        title='Test Song',
+        artist='Test Artist',
+        album='Test Album',
+        duration_seconds=180,
+        genre='rock'
+    )
+    PlaylistTrack.objects.create(playlist=playlist, track=track, position=1.0)
+    item = PlaylistTrack.objects.get(track=track)
+    item.votes = 3
+
+    with django_assert_num_queries(1):
+        item.save()
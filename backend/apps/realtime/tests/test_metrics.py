@@ -0,0 +1,172 @@
+"""
+Tests for request, broadcast and WebSocket metrics and the /metrics endpoint.
+"""
+import pytest
+from channels.testing import WebsocketCommunicator
+from rest_framework.test import APIClient
+from apps.playlist.consumers import PlaylistConsumer
+from apps.playlist.models import PlaylistTrack
+from apps.tracks.models import Track
+from core.metrics import MemoryMetricsStore, Metrics
+
+
+class FailingStore(MemoryMetricsStore):
+
+    def add(self, deltas):
+        raise ConnectionError('connection refused')
+
+
+def series_value(text, series):
+    """Return the value of one series line of a Prometheus text page, or None."""
+    for line in text.splitlines():
+        if line.startswith(series + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+class TestMetrics:
+    """Test cases for the Metrics counters and rendering."""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that an observation counts in its bucket and every larger one, in order."""
+        metrics = Metrics(MemoryMetricsStore())
+
+        metrics.observe('http_request_duration_seconds', 0.03, {'route': 'playlist-list', 'method': 'GET'})
+        metrics.observe('http_request_duration_seconds', 0.2, {'route': 'playlist-list', 'method': 'GET'})
+        lines = [line for line in metrics.render().splitlines() if not line.startswith('#')]
+
+        assert lines[:4] == [
+            'http_request_duration_seconds_bucket{le="0.005",method="GET",route="playlist-list"} 0',
+            'http_request_duration_seconds_bucket{le="0.01",method="GET",route="playlist-list"} 0',
+            'http_request_duration_seconds_bucket{le="0.025",method="GET",route="playlist-list"} 0',
+            'http_request_duration_seconds_bucket{le="0.05",method="GET",route="playlist-list"} 1',
+        ]
+        assert 'http_request_duration_seconds_bucket{le="0.25",method="GET",route="playlist-list"} 2' in lines
+        assert 'http_request_duration_seconds_bucket{le="+Inf",method="GET",route="playlist-list"} 2' in lines
+        assert lines[-2:] == [
+            'http_request_duration_seconds_count{method="GET",route="playlist-list"} 2',
+            'http_request_duration_seconds_sum{method="GET",route="playlist-list"} 0.23',
+        ]
+
+    def test_workers_share_a_store(self):
+        """Test that counters of several processes add up in the shared store."""
+        store = MemoryMetricsStore()
+        workers = [Metrics(store), Metrics(store)]
+
+        workers[0].inc('websocket_connects_total')
+        workers[1].inc('websocket_connects_total', amount=2)
+        workers[1].flush()
+
+        assert series_value(workers[0].render(), 'websocket_connects_total') == 3
+
+    def test_failed_flush_keeps_deltas(self):
+        """Test that counters survive a store outage and are flushed later."""
+        metrics = Metrics(FailingStore())
+        metrics.inc('websocket_connects_total')
+
+        with pytest.raises(ConnectionError):
+            metrics.flush()
+        metrics.store = MemoryMetricsStore()
+
+        assert series_value(metrics.render(), 'websocket_connects_total') == 1
+
+    def test_label_values_are_escaped(self):
+        """Test that quotes and backslashes in label values are escaped."""
+        metrics = Metrics(MemoryMetricsStore())
+        metrics.inc('playlist_broadcasts_total', {'event': 'a"b\\c', 'result': 'sent'})
+
+        assert 'playlist_broadcasts_total{event="a\\"b\\\\c",result="sent"} 1' in metrics.render()
+
+
+@pytest.fixture
+def channel_layer(settings):
+    """Use the in-memory channel layer."""
+    settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@pytest.fixture
+def item(playlist):
+    track = Track.objects.create(
+        title='Test Song',
+        artist='Test Artist',
+        album='Test Album',
+        duration_seconds=180,
+        genre='rock'
+    )
+    return PlaylistTrack.objects.create(playlist=playlist, track=track, position=1.0)
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+    """Test cases for the metrics middleware and GET /metrics."""
+
+    def test_requests_are_timed_per_route(self, item, settings):
+        """Test the Server-Timing header and request, latency and query series of a route."""
+        settings.RESPONSE_CACHE_TTL = 0
+        client = APIClient()
+
+        client.get('/api/playlist/')
+        response = client.get('/api/playlist/')
+        text = client.get('/metrics').content.decode()
+
+        assert response['Server-Timing'].startswith('app;dur=')
+        assert 'db;dur=' in response['Server-Timing'] and 'desc="3 queries"' in response['Server-Timing']
+        labels = 'method="GET",route="playlist-list"'
+        assert series_value(text, f'http_requests_total{{{labels},status="200"}}') == 2
+        assert series_value(text, f'http_request_duration_seconds_count{{{labels}}}') == 2
+        assert series_value(text, f'db_queries_total{{{labels}}}') == 7
+        assert series_value(text, f'db_query_duration_seconds_total{{{labels}}}') > 0
+        assert '# TYPE http_request_duration_seconds histogram' in text
+
+    def test_routes_are_labelled_by_name(self, item):
+        """Test that ids and room slugs do not end up in labels."""
+        client = APIClient()
+        client.post(f'/api/playlist/{item.pk}/vote/', {'direction': 'up'}, format='json')
+        client.get('/api/rooms/default/playlist/')
+        client.get('/no-such-page/')
+
+        text = client.get('/metrics').content.decode()
+
+        assert series_value(text, 'http_requests_total{method="POST",route="playlist-vote",status="200"}') == 1
+        assert series_value(text, 'http_requests_total{method="GET",route="room-playlist-list",status="200"}') == 1
+        assert series_value(text, 'http_requests_total{method="GET",route="unmatched",status="404"}') == 1
+
+    def test_broadcasts_are_counted(self, item, channel_layer, django_capture_on_commit_callbacks):
+        """Test that sent broadcasts are counted by event type."""
+        client = APIClient()
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(f'/api/playlist/{item.pk}/vote/', {'direction': 'up'}, format='json')
+
+        text = client.get('/metrics').content.decode()
+
+        assert series_value(text, 'playlist_broadcasts_total{event="track.voted",result="sent"}') == 1
+
+    def test_broadcast_failures_are_counted(self, item, monkeypatch, django_capture_on_commit_callbacks):
+        """Test that channel-layer errors are counted as failed."""
+        class BrokenLayer:
+            async def group_send(self, group, message):
+                raise ConnectionError('connection refused')
+
+        monkeypatch.setattr('apps.realtime.utils.get_channel_layer', lambda: BrokenLayer())
+        client = APIClient()
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(f'/api/playlist/{item.pk}/vote/', {'direction': 'up'}, format='json')
+
+        text = client.get('/metrics').content.decode()
+
+        assert series_value(text, 'playlist_broadcasts_total{event="track.voted",result="failed"}') == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_websocket_connections_are_counted(channel_layer, playlist, metrics):
+    """Test that accepted and closed WebSocket connections are counted."""
+    communicator = WebsocketCommunicator(PlaylistConsumer.as_asgi(), '/ws/playlist/')
+    connected, _ = await communicator.connect()
+    assert connected
+    await communicator.disconnect()
+
+    text = metrics.render()
+
+    assert series_value(text, 'websocket_connects_total') == 1
+    assert series_value(text, 'websocket_disconnects_total') == 1
@@ -0,0 +1,57 @@
+"""
+Tests for the bounded per-connection outbound queue.
+"""
+from apps.realtime.outbound import OutboundQueue
+
+
+def drain(queue):
+    frames = []
+    while queue:
+        frames.append(queue.pop())
+    return frames
+
+
+class TestOutboundQueue:
+    """Test cases for OutboundQueue."""
+
+    def test_frames_keep_order(self):
+        """Test that unkeyed frames are delivered first in, first out."""
+        queue = OutboundQueue(10)
+        for frame in ('a', 'b', 'c'):
+            assert queue.put(frame)
+
+        assert drain(queue) == ['a', 'b', 'c']
+
+    def test_superseded_frame_is_replaced(self):
+        """Test that a keyed frame replaces the queued one and moves to the back."""
+        queue = OutboundQueue(10)
+        queue.put('vote 1', key=('track.voted', 1))
+        queue.put('removed 2')
+        queue.put('vote 1 again', key=('track.voted', 1))
+
+        assert len(queue) == 2
+        assert drain(queue) == ['removed 2', 'vote 1 again']
+
+    def test_conflation_does_not_count_against_the_bound(self):
+        """Test that repeated votes for one track fit in a queue of one."""
+        queue = OutboundQueue(1)
+        for votes in range(100):
+            assert queue.put(votes, key=('track.voted', 1))
+
+        assert drain(queue) == [99]
+
+    def test_overflow(self):
+        """Test that a full queue is replaced by the overflow frame until reset."""
+        queue = OutboundQueue(2)
+        assert queue.put('a')
+        assert queue.put('b')
+        assert not queue.put('c')
+
+        queue.overflow('resync')
+        assert not queue.put('d')
+        assert drain(queue) == ['resync']
+        assert queue.overflowed
+
+        queue.reset()
+        assert queue.put('e')
+        assert drain(queue) == ['e']
@@ -0,0 +1,151 @@
+"""
+Tests for the transactional outbox and its dispatcher.
+"""
+from io import StringIO
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+from rest_framework.test import APIClient
+from apps.realtime.models import OutboxEvent, OutboxOffset
+from apps.realtime.outbox import OutboxDispatcher
+from apps.realtime.utils import broadcast_playlist_event, broadcast_playlist_events
+from apps.tracks.models import Track
+
+
+class RecordingDispatcher(OutboxDispatcher):
+    """Dispatcher that records sends instead of using the channel layer."""
+
+    def __init__(self, *args, failing_rooms=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sent = []
+        self.failing_rooms = set(failing_rooms)
+
+    def send(self, room, events):
+        if room in self.failing_rooms:
+            raise ConnectionError('connection refused')
+        self.sent.append((room, [event['type'] for event in events]))
+
+
+@pytest.fixture
+def outbox(settings):
+    """Enable the transactional outbox."""
+    settings.BROADCAST_OUTBOX = True
+
+
+@pytest.mark.django_db
+class TestOutbox:
+    """Test cases for writing and dispatching outbox events."""
+
+    def test_event_is_written_with_the_change(self, outbox, changelog):
+        """Test that API mutations store their events in the outbox."""
+        track = Track.objects.create(
+            title='Test Song',
+            artist='Test Artist',
+            album='Test Album',
+            duration_seconds=180,
+            genre='rock'
+        )
+
+        response = APIClient().post('/api/playlist/', {'track_id': track.id}, format='json')
+
+        assert response.status_code == 201
+        row = OutboxEvent.objects.get()
+        assert row.room == 'default'
+        assert row.event['type'] == 'track.added'
+        assert row.event['payload']['id'] == response.data['id']
+        assert changelog.current_version('default') == 0
+
+    def test_rolled_back_change_leaves_no_event(self, outbox):
+        """Test that outbox rows roll back with the transaction."""
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                broadcast_playlist_event('track.removed', {'id': 1}, 'default')
+                raise RuntimeError('rollback')
+
+        assert not OutboxEvent.objects.exists()
+
+    def test_dispatch_batches_per_room(self, outbox, changelog):
+        """Test that pending events are versioned and sent with one call per room."""
+        broadcast_playlist_events([
+            {'type': 'track.removed', 'payload': {'id': 1}},
+            {'type': 'track.removed', 'payload': {'id': 2}},
+        ], 'default')
+        broadcast_playlist_event('track.removed', {'id': 3}, 'party')
+        dispatcher = RecordingDispatcher()
+
+        assert dispatcher.dispatch_batch() == 3
+
+        assert dispatcher.sent == [
+            ('default', ['track.removed', 'track.removed']),
+            ('party', ['track.removed']),
+        ]
+        assert changelog.current_version('default') == 2
+        assert changelog.current_version('party') == 1
+        assert not OutboxEvent.objects.filter(dispatched_at__isnull=True).exists()
+        assert OutboxOffset.objects.get(name='default').last_id == OutboxEvent.objects.last().pk
+        assert dispatcher.dispatch_batch() == 0
+
+    def test_failed_room_is_retried_with_same_version(self, outbox, changelog):
+        """Test that events survive a failed send and keep their version."""
+        broadcast_playlist_event('track.removed', {'id': 1}, 'party')
+        broadcast_playlist_event('track.removed', {'id': 2}, 'default')
+
+        failing = RecordingDispatcher(failing_rooms={'party'})
+        assert failing.dispatch_batch() == 1
+        assert OutboxOffset.objects.get(name='default').last_id == OutboxEvent.objects.get(room='default').pk
+        party_event = OutboxEvent.objects.get(room='party')
+        assert party_event.dispatched_at is None
+        assert party_event.version == 1
+
+        dispatcher = RecordingDispatcher()
+        assert dispatcher.dispatch_batch() == 1
+        assert dispatcher.sent == [('party', ['track.removed'])]
+        assert changelog.current_version('party') == 1
+
+    def test_failed_room_does_not_hold_back_others(self, outbox, changelog):
+        """Test that a failing room's backlog is set aside instead of filling every batch."""
+        for pk in range(3):
+            broadcast_playlist_event('track.removed', {'id': pk}, 'party')
+        broadcast_playlist_event('track.removed', {'id': 3}, 'default')
+        dispatcher = RecordingDispatcher(batch_size=2, failing_rooms={'party'})
+
+        assert dispatcher.dispatch_batch() == 0
+        assert dispatcher.dispatch_batch() == 1
+        assert dispatcher.dispatch_batch() == 0
+
+        assert dispatcher.sent == [('default', ['track.removed'])]
+        assert OutboxEvent.objects.filter(room='party', dispatched_at__isnull=True).count() == 3
+
+    def test_late_commit_with_lower_id_is_delivered(self, outbox, changelog):
+        """Test that an event committed after a higher id was delivered is still sent."""
+        OutboxEvent.objects.create(pk=10, room='default', event={'type': 'track.removed', 'payload': {'id': 1}})
+        dispatcher = RecordingDispatcher()
+        assert dispatcher.dispatch_batch() == 1
+
+        OutboxEvent.objects.create(pk=5, room='default', event={'type': 'track.removed', 'payload': {'id': 2}})
+
+        assert dispatcher.dispatch_batch() == 1
+        assert changelog.current_version('default') == 2
+
+    def test_prune_removes_delivered_events(self, outbox):
+        """Test that delivered events are deleted after the retention period."""
+        broadcast_playlist_event('track.removed', {'id': 1}, 'default')
+        dispatcher = RecordingDispatcher()
+        dispatcher.dispatch_batch()
+
+        assert dispatcher.prune(3600) == 0
+        assert dispatcher.prune(0) == 1
+        assert not OutboxEvent.objects.exists()
+
+    def test_dispatch_command(self, outbox, changelog, settings):
+        """Test draining the outbox with the management command."""
+        settings.CHANNEL_LAYERS = {
+            'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}
+        }
+        broadcast_playlist_event('track.removed', {'id': 1}, 'default')
+
+        out = StringIO()
+        call_command('dispatch_outbox', '--once', stdout=out)
+
+        assert 'Dispatched 1 outbox event(s)' in out.getvalue()
+        assert changelog.current_version('default') == 1
@@ -0,0 +1,119 @@
+"""
+Tests for the background event publisher and post-commit broadcasting.
+"""
+import asyncio
+import json
+import threading
+import pytest
+from django.db import transaction
+from apps.realtime import utils
+from apps.realtime.publisher import EventPublisher
+from apps.realtime.utils import broadcast_playlist_event, encode_event
+
+
+class RecordingLayer:
+    """Channel layer double that records group messages once the gate opens."""
+
+    def __init__(self, fail=False):
+        self.sent = []
+        self.fail = fail
+        self.gate = threading.Event()
+        self.gate.set()
+        self.loops = set()
+
+    async def group_send(self, group, message):
+        while not self.gate.is_set():
+            await asyncio.sleep(0.01)
+        self.loops.add(id(asyncio.get_running_loop()))
+        if self.fail:
+            raise ConnectionError('connection refused')
+        self.sent.append((group, message))
+
+
+def message(event_type='track.removed'):
+    return utils.group_message({'type': event_type, 'payload': {'id': 1}})
+
+
+class TestEventPublisher:
+    """Test cases for EventPublisher."""
+
+    def test_messages_are_sent_from_one_loop(self):
+        """Test that queued messages are delivered in order on a single long-lived loop."""
+        layer = RecordingLayer()
+        publisher = EventPublisher(10, get_layer=lambda: layer)
+
+        assert publisher.publish('playlist_default', message('track.added'))
+        assert publisher.publish('playlist_default', message('track.removed'))
+        publisher.stop()
+
+        assert [m['event'] for _, m in layer.sent] == ['track.added', 'track.removed']
+        assert len(layer.loops) == 1
+        assert publisher.stats()['sent'] == 2
+
+    def test_overflow_is_dropped_and_counted(self):
+        """Test that a full queue drops new messages instead of blocking."""
+        layer = RecordingLayer()
+        layer.gate.clear()
+        publisher = EventPublisher(2, get_layer=lambda: layer)
+
+        assert publisher.publish('playlist_default', message())
+        assert publisher.publish('playlist_default', message())
+        assert not publisher.publish('playlist_default', message())
+        assert publisher.stats()['dropped'] == 1
+        assert publisher.stats()['queued'] == 2
+
+        layer.gate.set()
+        publisher.stop()
+        assert publisher.stats() == {'queued': 0, 'max_queue': 2, 'sent': 2, 'failed': 0, 'dropped': 1}
+
+    def test_failures_are_counted(self):
+        """Test that channel-layer errors are counted and do not stop the loop."""
+        publisher = EventPublisher(10, get_layer=lambda: RecordingLayer(fail=True))
+
+        publisher.publish('playlist_default', message())
+        publisher.publish('playlist_default', message())
+        publisher.stop()
+
+        assert publisher.stats()['failed'] == 2
+
+
+@pytest.mark.django_db
+class TestPostCommitBroadcast:
+    """Test cases for broadcasting after the transaction commits."""
+
+    def test_event_waits_for_commit(self, changelog, django_capture_on_commit_callbacks):
+        """Test that nothing is published until the transaction commits."""
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                broadcast_playlist_event('track.removed', {'id': 1}, 'default')
+                assert changelog.current_version('default') == 0
+
+        assert len(callbacks) == 1
+        assert changelog.current_version('default') == 1
+
+    def test_rolled_back_event_is_not_published(self, changelog, django_capture_on_commit_callbacks):
+        """Test that events from a rolled back transaction are discarded."""
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    broadcast_playlist_event('track.removed', {'id': 1}, 'default')
+                    raise RuntimeError('rollback')
+
+        assert callbacks == []
+        assert changelog.current_version('default') == 0
+
+
+class TestEncodeEvent:
+    """Test cases for encoding events into text frames."""
+
+    EVENT = {
+        'type': 'playlist.reindexed',
+        'payload': {'positions': {'1': 1.0, '2': 2.5}, 'title': 'Café'},
+    }
+
+    def test_orjson_and_json_agree(self, monkeypatch):
+        """Test that the fallback encoder produces the same JSON value."""
+        fast = encode_event(self.EVENT)
+        monkeypatch.setattr(utils, 'orjson', None)
+
+        assert json.loads(encode_event(self.EVENT)) == json.loads(fast) == self.EVENT
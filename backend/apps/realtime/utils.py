@@ -1,26 +1,178 @@
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from core.log import RATE_LIMITED
+from core.metrics import get_metrics
+from functools import lru_cache, partial
+from .changelog import get_changelog
+from .coalescing import BATCH_EVENT, EventCoalescer, merge_key
+from .outbox import write_outbox
+from .publisher import EventPublisher
+import atexit
+import json
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 logger = logging.getLogger(__name__)
 
 
-def broadcast_playlist_event(event_type, payload):
-    channel_layer = get_channel_layer()
+def room_group_name(room):
+    """Return the channel group for a playlist room."""
+    return f'playlist_{room}'
+
+
+def encode_event(data):
+    """
+    Encode an event as a JSON text frame.
+    
+    Group messages carry the encoded frame, so an event is serialized once
+    however many connections receive it. Uses orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=DjangoJSONEncoder().default, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, cls=DjangoJSONEncoder)
+
+
+# Fields each event actually changes; binary-protocol clients receive only
+# these, keyed by the playlist item id, instead of the whole item.
+DELTA_FIELDS = {
+    'track.voted': ('votes',),
+    'track.moved': ('position', 'rank'),
+}
+
+
+def delta_event(data):
+    """Reduce an event to ``{'changes': {id: {field: value}}}`` where only some fields changed."""
+    if data['type'] == BATCH_EVENT:
+        return {**data, 'events': [delta_event(event) for event in data['events']]}
+
+    fields = DELTA_FIELDS.get(data['type'])
+    payload = data.get('payload') or {}
+    if fields is None or 'id' not in payload:
+        return data
+
+    event = {key: value for key, value in data.items() if key != 'payload'}
+    event['changes'] = {payload['id']: {field: payload[field] for field in fields if field in payload}}
+    return event
+
+
+def encode_binary(data):
+    """Encode an event as a MessagePack frame for the binary WebSocket subprotocol."""
+    return msgpack.packb(data, use_bin_type=True, default=DjangoJSONEncoder().default)
+
+
+def group_message(data):
+    """
+    Build the channel-layer message delivering an event to PlaylistConsumer.playlist_update.
     
-    event_data = {
+    It carries the event encoded once per protocol: a JSON text frame and,
+    when msgpack is installed, a binary frame holding only the changed fields.
+    Events that a later event for the same track supersedes carry that
+    shared ``key``, so slow connections can drop the stale one.
+    """
+    message = {
         'type': 'playlist_update',
-        'data': {
-            'type': event_type,
-            'payload': payload
-        }
+        'event': data['type'],
+        'text': encode_event(data),
     }
-    
+    if msgpack is not None:
+        message['binary'] = encode_binary(delta_event(data))
+    key = merge_key(data)
+    if key is not None:
+        message['key'] = list(key)
+    return message
+
+
+def broadcast_playlist_event(event_type, payload, room):
+    """Broadcast an event to a room once the current transaction commits."""
+    event = {
+        'type': event_type,
+        'payload': payload
+    }
+    if settings.BROADCAST_OUTBOX:
+        write_outbox(room, [event])
+        return
+    transaction.on_commit(partial(_publish, room, [event]), robust=True)
+
+
+def broadcast_playlist_events(events, room):
+    """Broadcast several events to a room as a single 'playlist.batch' message after commit."""
+    if not events:
+        return
+    if settings.BROADCAST_OUTBOX:
+        write_outbox(room, events)
+        return
+    transaction.on_commit(partial(_publish, room, events), robust=True)
+
+
+def _publish(room, events):
+    changelog = get_changelog()
+    for event in events:
+        changelog.append(room, event)
+    group = room_group_name(room)
+
+    coalescer = get_event_coalescer()
+    if coalescer is not None:
+        for event in events:
+            coalescer.add(group, event)
+        return
+
+    if len(events) == 1:
+        send_group_event(group, events[0])
+    else:
+        send_group_event(group, {
+            'type': BATCH_EVENT,
+            'version': events[-1]['version'],
+            'events': events
+        })
+
+
+def send_group_event(group, data):
+    event_data = group_message(data)
+
+    publisher = get_event_publisher()
+    if publisher is not None:
+        publisher.publish(group, event_data)
+        return
+
+    channel_layer = get_channel_layer()
     try:
         async_to_sync(channel_layer.group_send)(
-            'playlist_updates',
+            group,
             event_data
         )
-        logger.info(f"Broadcasted event: {event_type}")
     except Exception as e:
-        logger.error(f"Failed to broadcast event {event_type}: {str(e)}")
\ No newline at end of file
+        get_metrics().inc('playlist_broadcasts_total', {'event': data['type'], 'result': 'failed'})
+        logger.error("Failed to broadcast event %s: %s", data['type'], e)
+    else:
+        get_metrics().inc('playlist_broadcasts_total', {'event': data['type'], 'result': 'sent'})
+        logger.info("Broadcasted event: %s", data['type'], extra=RATE_LIMITED)
+
+
+@lru_cache(maxsize=None)
+def get_event_coalescer():
+    """Return the process-wide coalescer, or None when coalescing is disabled."""
+    if settings.BROADCAST_COALESCE_WINDOW <= 0:
+        return None
+    return EventCoalescer(settings.BROADCAST_COALESCE_WINDOW, send_group_event)
+
+
+@lru_cache(maxsize=None)
+def get_event_publisher():
+    """Return the process-wide background publisher, or None to send synchronously."""
+    if not settings.BROADCAST_ASYNC:
+        return None
+    publisher = EventPublisher(settings.BROADCAST_QUEUE_SIZE)
+    atexit.register(publisher.stop)
+    return publisher
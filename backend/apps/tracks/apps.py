@@ -2,8 +2,21 @@
 App configuration for tracks app.
 """
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def restore_search_index(sender, using, **kwargs):
+    from django.db import connections
+    from .search import ensure_search_index
+    
+    ensure_search_index(connections[using])
 
 
 class TracksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.tracks'
+    
+    def ready(self):
+        """Import signals and recreate the search triggers after migrations."""
+        import apps.tracks.signals  # noqa
+        post_migrate.connect(restore_search_index, sender=self)
@@ -0,0 +1,26 @@
+# Generated by Django 5.0 on 2026-10-17 00:50
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from apps.tracks.search import ensure_search_index
+
+    ensure_search_index(schema_editor.connection)
+
+
+def remove_search_index(apps, schema_editor):
+    from apps.tracks.search import drop_search_index
+
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, remove_search_index),
+    ]
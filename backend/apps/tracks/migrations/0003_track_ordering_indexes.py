@@ -0,0 +1,33 @@
+# Generated by Django 5.0 on 2026-10-17 00:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracks', '0002_track_search_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='track',
+            name='tracks_trac_artist_08f410_idx',
+        ),
+        migrations.AddIndex(
+            model_name='track',
+            index=models.Index(fields=['artist', 'title'], name='tracks_trac_artist_07586b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='track',
+            index=models.Index(fields=['title'], name='tracks_trac_title_78f644_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='track',
+            index=models.Index(fields=['duration_seconds'], name='tracks_trac_duratio_1d5646_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='track',
+            index=models.Index(fields=['created_at'], name='tracks_trac_created_27a10d_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0 on 2026-10-17 01:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracks', '0003_track_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackSearchEntry',
+            fields=[
+                ('track', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='tracks.track')),
+                ('document', models.TextField(db_column='tracks_track_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'tracks_track_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -1,4 +1,10 @@
 from django.db import models
+from django.db.models import Lookup
+
+
+def format_duration(seconds):
+    """Format a duration in seconds as m:ss."""
+    return f"{seconds // 60}:{seconds % 60:02d}"
 
 
 class Track(models.Model):
@@ -23,9 +29,13 @@ class Track(models.Model):
     
     class Meta:
         ordering = ['artist', 'title']
+        # Cover every ordering the track list pages through with a cursor
         indexes = [
             models.Index(fields=['genre']),
-            models.Index(fields=['artist']),
+            models.Index(fields=['artist', 'title']),
+            models.Index(fields=['title']),
+            models.Index(fields=['duration_seconds']),
+            models.Index(fields=['created_at']),
         ]
     
     def __str__(self):
@@ -33,6 +43,47 @@ class Track(models.Model):
     
     @property
     def duration_formatted(self):
-        minutes = self.duration_seconds // 60
-        seconds = self.duration_seconds % 60
-        return f"{minutes}:{seconds:02d}"
+        return format_duration(self.duration_seconds)
+
+
+class SearchDocumentField(models.TextField):
+    """The hidden column named after an FTS5 table, which MATCH queries are run against."""
+    
+    def deconstruct(self):
+        # Migrations only record the model's state, so keep them free of this module
+        name, path, args, kwargs = super().deconstruct()
+        return name, 'django.db.models.TextField', args, kwargs
+
+
+@SearchDocumentField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+    
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class TrackSearchEntry(models.Model):
+    """
+    A row of the SQLite FTS5 track index, for joining search matches to tracks.
+    
+    The table and the triggers that fill it are created by
+    ``apps.tracks.search.ensure_search_index()``, not by migrations.
+    """
+    
+    track = models.OneToOneField(
+        Track,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='search_entry'
+    )
+    document = SearchDocumentField(db_column='tracks_track_fts')
+    rank = models.FloatField()
+    
+    class Meta:
+        managed = False
+        db_table = 'tracks_track_fts'
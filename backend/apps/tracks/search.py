@@ -0,0 +1,145 @@
+"""
+Full-text search over the track catalog.
+
+On SQLite, title, artist and album are indexed in an external-content FTS5
+table that triggers keep in sync with every write to ``tracks_track``
+(including ``bulk_create()`` and ``queryset.update()``). The unmanaged
+TrackSearchEntry model maps that table, so searches are plain ORM joins.
+Other databases fall back to DRF's ``icontains`` search.
+"""
+from django.db import connection
+from django.db.models import F
+from rest_framework import filters
+from .models import TrackSearchEntry
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = TrackSearchEntry._meta.db_table
+
+# The prefix option indexes 2 and 3 character prefixes so short typeahead
+# queries don't have to walk the whole term list.
+CREATE_TABLE_SQL = f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, artist, album,
+        content='tracks_track', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+"""
+
+# Rank matches in the title above the artist above the album
+RANK_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', 'bm25(10.0, 5.0, 2.0)')"
+
+REBUILD_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+TRIGGERS = {
+    f'{FTS_TABLE}_insert': f"""
+        CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON tracks_track BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, artist, album)
+            VALUES (new.id, new.title, new.artist, new.album);
+        END
+    """,
+    f'{FTS_TABLE}_delete': f"""
+        CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON tracks_track BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, artist, album)
+            VALUES ('delete', old.id, old.title, old.artist, old.album);
+        END
+    """,
+    f'{FTS_TABLE}_update': f"""
+        CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE OF title, artist, album ON tracks_track BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, artist, album)
+            VALUES ('delete', old.id, old.title, old.artist, old.album);
+            INSERT INTO {FTS_TABLE}(rowid, title, artist, album)
+            VALUES (new.id, new.title, new.artist, new.album);
+        END
+    """,
+}
+
+
+def ensure_search_index(db=connection):
+    """
+    Create the FTS table and triggers if any are missing, then rebuild the index.
+
+    Rebuilding ``tracks_track`` in a migration drops its triggers, so this
+    also runs after every migrate. Returns True if anything was (re)created.
+    """
+    if db.vendor != 'sqlite':
+        return False
+
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE %s",
+            [f'{FTS_TABLE}%']
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if FTS_TABLE in existing and existing.issuperset(TRIGGERS):
+            return False
+
+        if FTS_TABLE not in existing:
+            cursor.execute(CREATE_TABLE_SQL)
+            cursor.execute(RANK_SQL)
+        for name, sql in TRIGGERS.items():
+            if name not in existing:
+                cursor.execute(sql)
+        cursor.execute(REBUILD_SQL)
+
+    logger.info("Created track search index")
+    return True
+
+
+def drop_search_index(db=connection):
+    if db.vendor != 'sqlite':
+        return
+    with db.cursor() as cursor:
+        for name in TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def rebuild_search_index(db=connection):
+    """Re-index every track from ``tracks_track``."""
+    if db.vendor != 'sqlite':
+        return
+    with db.cursor() as cursor:
+        cursor.execute(REBUILD_SQL)
+
+
+def build_match_query(search):
+    """
+    Turn free text into an FTS5 query where every word must match as a prefix.
+
+    Words are quoted so FTS5 operators and punctuation in user input are
+    matched literally. Returns None when there is nothing to search for.
+    """
+    terms = re.findall(r'\w+', search)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+class TrackSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` backed by the FTS5 index, ordered by relevance.
+
+    An explicit ``?ordering=`` (applied by OrderingFilter afterwards) replaces
+    the relevance order. Falls back to SearchFilter on other databases.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if connection.vendor != 'sqlite':
+            return super().filter_queryset(request, queryset, view)
+
+        search = request.query_params.get(self.search_param, '')
+        match = build_match_query(search)
+        if match is None:
+            return queryset
+
+        # Join the index rather than filtering on a subquery of rowids: FTS5
+        # only computes rank for rows produced by the MATCH scan itself
+        return (
+            queryset.filter(search_entry__document__match=match)
+            .annotate(search_rank=F('search_entry__rank'))
+            .order_by('search_rank', 'id')
+        )
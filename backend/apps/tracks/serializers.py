@@ -1,5 +1,7 @@
-from rest_framework import serializers
-from .models import Track
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from .models import Track, format_duration
 
 
 class TrackSerializer(serializers.ModelSerializer):
@@ -20,3 +22,74 @@ class TrackSerializer(serializers.ModelSerializer):
             'created_at',
         ]
         read_only_fields = ['id', 'created_at']
+
+
+def datetime_formatter():
+    """
+    Return a function formatting datetimes exactly like ``serializers.DateTimeField``.
+    
+    The field looks up the current timezone for every value; this resolves
+    it once, which matters when formatting thousands of rows.
+    """
+    field = serializers.DateTimeField()
+    output_format = api_settings.DATETIME_FORMAT
+    field_timezone = field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+    
+    def to_representation(value):
+        if not value:
+            return None
+        if timezone.is_naive(value):
+            return field.to_representation(value)
+        if value.tzinfo is not field_timezone:
+            value = value.astimezone(field_timezone)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return to_representation
+
+
+class TrackReadSerializer:
+    """
+    Read-only fast path with exactly the output of TrackSerializer.
+    
+    Builds each representation straight from a ``.values()`` row instead of
+    going through DRF's per-field machinery, which dominates the cost of
+    serializing large lists.
+    """
+    
+    fields = (
+        'id',
+        'title',
+        'artist',
+        'album',
+        'duration_seconds',
+        'genre',
+        'cover_url',
+        'created_at',
+    )
+    
+    def __init__(self):
+        self.format_datetime = datetime_formatter()
+    
+    def values(self, queryset):
+        # Keep annotations such as the search rank available for ordering
+        return queryset.values(*self.fields, *queryset.query.annotations)
+    
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'artist': row['artist'],
+            'album': row['album'],
+            'duration_seconds': row['duration_seconds'],
+            'duration_formatted': format_duration(row['duration_seconds']),
+            'genre': row['genre'],
+            'cover_url': row['cover_url'],
+            'created_at': self.format_datetime(row['created_at']),
+        }
+    
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Track
+from .suggest import get_suggest_index
+
+
+@receiver(post_save, sender=Track)
+def track_saved(sender, instance, **kwargs):
+    """Keep the suggest index in step with committed track changes."""
+    index = get_suggest_index()
+    if index.is_built:
+        transaction.on_commit(lambda: index.add(instance))
+
+
+@receiver(post_delete, sender=Track)
+def track_deleted(sender, instance, **kwargs):
+    index = get_suggest_index()
+    if index.is_built:
+        pk = instance.pk
+        transaction.on_commit(lambda: index.remove(pk))
@@ -0,0 +1,196 @@
+"""
+In-memory typeahead index over the track catalog.
+
+Every normalized word of a track's title, artist and album is stored in one
+sorted array, so the completions of a prefix are a contiguous range found
+with two bisects. Matches are returned in word order, title words before
+artist and album words, and only as many entries are scanned as needed to
+fill the top ``limit`` results.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from django.conf import settings
+from django.db import close_old_connections
+from apps.tracks.models import Track
+import re
+import threading
+import time
+import unicodedata
+import logging
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('title', 'artist', 'album')
+
+# Entries pack the field (0 = title) above the track id, so within one word
+# title matches sort first, then by id.
+FIELD_SHIFT = 40
+
+# Upper bound on index entries scanned per query, so very short prefixes
+# stay fast on large catalogs.
+MAX_SCAN = 2000
+
+
+def normalize(text):
+    """Casefold and strip accents, so 'Café' and 'cafe' index the same."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text):
+    return re.findall(r'\w+', normalize(text))
+
+
+class SuggestIndex:
+
+    def __init__(self, ttl=0):
+        self.ttl = ttl
+        self.built_at = None
+        self._words = []
+        self._entries = array('q')
+        self._tracks = {}
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    @property
+    def is_built(self):
+        return self.built_at is not None
+
+    def build(self):
+        """Load every track and replace the index contents."""
+        started = time.perf_counter()
+        rows = Track.objects.values_list('id', *FIELDS).iterator(chunk_size=5000)
+
+        pairs = []
+        tracks = {}
+        for row in rows:
+            pk, values = row[0], row[1:]
+            tracks[pk] = (values[0], self._words_of(values))
+            for field, word in tracks[pk][1]:
+                pairs.append((word, (field << FIELD_SHIFT) | pk))
+        pairs.sort()
+
+        words = [word for word, _ in pairs]
+        entries = array('q', (entry for _, entry in pairs))
+        with self._lock:
+            self._words, self._entries, self._tracks = words, entries, tracks
+            self.built_at = time.monotonic()
+
+        logger.info(
+            "Built suggest index: %s track(s), %s word(s) in %.0fms",
+            len(tracks), len(words), (time.perf_counter() - started) * 1000
+        )
+
+    def ensure_built(self):
+        if not self.is_built:
+            with self._build_lock:
+                if not self.is_built:
+                    self.build()
+
+    def add(self, track):
+        """Index a new or changed track."""
+        with self._lock:
+            self._remove(track.pk)
+            words = self._words_of([getattr(track, field) for field in FIELDS])
+            self._tracks[track.pk] = (track.title, words)
+            for field, word in words:
+                entry = (field << FIELD_SHIFT) | track.pk
+                lo = bisect_left(self._words, word)
+                hi = bisect_right(self._words, word, lo)
+                i = bisect_left(self._entries, entry, lo, hi)
+                self._words.insert(i, word)
+                self._entries.insert(i, entry)
+
+    def remove(self, pk):
+        with self._lock:
+            self._remove(pk)
+
+    def suggest(self, query, limit=10):
+        """Return up to ``limit`` ``(id, title)`` pairs matching every word of the query as a prefix."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        self.ensure_built()
+        self._refresh_if_stale()
+
+        # Scan the range of the longest term, it is usually the most selective
+        prefix = max(terms, key=len)
+        others = [term for term in terms if term is not prefix]
+        mask = (1 << FIELD_SHIFT) - 1
+
+        results = []
+        seen = set()
+        with self._lock:
+            lo = bisect_left(self._words, prefix)
+            hi = bisect_left(self._words, prefix + '\U0010ffff', lo)
+            for i in range(lo, min(hi, lo + MAX_SCAN)):
+                pk = self._entries[i] & mask
+                if pk in seen:
+                    continue
+                seen.add(pk)
+                title, words = self._tracks[pk]
+                if all(any(word.startswith(term) for _, word in words) for term in others):
+                    results.append((pk, title))
+                    if len(results) >= limit:
+                        break
+        return results
+
+    def _remove(self, pk):
+        track = self._tracks.pop(pk, None)
+        if track is None:
+            return
+        for field, word in track[1]:
+            entry = (field << FIELD_SHIFT) | pk
+            lo = bisect_left(self._words, word)
+            hi = bisect_right(self._words, word, lo)
+            i = bisect_left(self._entries, entry, lo, hi)
+            if i < hi and self._entries[i] == entry:
+                del self._words[i]
+                del self._entries[i]
+
+    @staticmethod
+    def _words_of(values):
+        words = set()
+        for field, value in enumerate(values):
+            words.update((field, word) for word in tokenize(value))
+        return sorted(words)
+
+    def _refresh_if_stale(self):
+        """Rebuild in the background after ``ttl`` seconds to pick up writes from other processes."""
+        if self.ttl <= 0 or time.monotonic() - self.built_at < self.ttl:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, name='suggest-refresh', daemon=True).start()
+
+    def _refresh(self):
+        try:
+            self.build()
+        except Exception:
+            logger.exception("Failed to refresh suggest index")
+        finally:
+            self._refreshing = False
+            close_old_connections()
+
+
+@lru_cache(maxsize=None)
+def get_suggest_index():
+    """Return the process-wide suggest index; it is built on first use or by warm_suggest_index()."""
+    return SuggestIndex(settings.SUGGEST_INDEX_TTL)
+
+
+def warm_suggest_index():
+    """Build the index in a background thread so the first suggestion is fast."""
+    def build():
+        try:
+            get_suggest_index().ensure_built()
+        except Exception:
+            logger.exception("Failed to build suggest index")
+        finally:
+            close_old_connections()
+
+    threading.Thread(target=build, name='suggest-build', daemon=True).start()
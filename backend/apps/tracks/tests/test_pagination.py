@@ -0,0 +1,119 @@
+"""
+Tests for keyset pagination of the track library and the playlist.
+"""
+import pytest
+from rest_framework.test import APIClient
+from apps.playlist.models import PlaylistTrack
+from apps.tracks.models import Track
+
+
+def make_track(title, artist='Test Artist', album='Test Album', duration_seconds=180):
+    return Track.objects.create(
+        title=title,
+        artist=artist,
+        album=album,
+        duration_seconds=duration_seconds,
+        genre='rock'
+    )
+
+
+def get(url, params=None):
+    response = APIClient().get(url, params)
+    assert response.status_code == 200
+    return response.data
+
+
+def walk(url, params=None):
+    """Follow next links from the first page and return the titles of every page."""
+    pages = []
+    data = get(url, params)
+    while True:
+        pages.append([item.get('title') or item['track']['title'] for item in data['results']])
+        if not data['next']:
+            return pages
+        data = get(data['next'])
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """Test cases for cursor pagination."""
+
+    @pytest.fixture
+    def tracks(self):
+        """Five tracks where two share artist and duration, so ties need the id."""
+        return [
+            make_track('E', artist='Alpha', duration_seconds=100),
+            make_track('D', artist='Alpha', duration_seconds=100),
+            make_track('C', artist='Beta', duration_seconds=300),
+            make_track('B', artist='Beta', duration_seconds=200),
+            make_track('A', artist='Gamma', duration_seconds=400),
+        ]
+
+    def test_pages_follow_default_ordering(self, tracks):
+        """Test that pages cover the library once in artist, title order."""
+        assert walk('/api/tracks/', {'page_size': 2}) == [['D', 'E'], ['B', 'C'], ['A']]
+
+    def test_pages_follow_requested_ordering(self, tracks):
+        """Test that ?ordering= is the cursor key, with ties broken by id."""
+        assert walk('/api/tracks/', {'page_size': 2, 'ordering': 'duration_seconds'}) == [
+            ['E', 'D'], ['B', 'C'], ['A']
+        ]
+        assert walk('/api/tracks/', {'page_size': 2, 'ordering': '-duration_seconds'}) == [
+            ['A', 'C'], ['B', 'D'], ['E']
+        ]
+
+    def test_search_results_page_by_relevance(self, tracks):
+        """Test that relevance-ordered search results can be paged."""
+        make_track('Love Me Do')
+        make_track('Lovely Day')
+        make_track('Something', album='Love Songs')
+
+        ranked = walk('/api/tracks/', {'search': 'love'})[0]
+
+        assert len(ranked) == 3
+        assert walk('/api/tracks/', {'search': 'love', 'page_size': 1}) == [[title] for title in ranked]
+
+    def test_inserts_do_not_shift_pages(self, tracks):
+        """Test that rows added before the cursor are not repeated or skipped."""
+        first = get('/api/tracks/', {'page_size': 2})
+        make_track('AA', artist='Alpha')
+
+        second = get(first['next'])
+
+        assert [item['title'] for item in second['results']] == ['B', 'C']
+
+    def test_previous_link(self, tracks):
+        """Test that previous links walk back to the first page."""
+        first = get('/api/tracks/', {'page_size': 2})
+        second = get(first['next'])
+        third = get(second['next'])
+
+        assert first['previous'] is None
+        back = get(third['previous'])
+        assert [item['title'] for item in back['results']] == ['B', 'C']
+        back = get(back['previous'])
+        assert [item['title'] for item in back['results']] == ['D', 'E']
+        assert back['previous'] is None
+
+    def test_count_is_optional(self, tracks, django_assert_num_queries):
+        """Test that ?count=false drops the count query and field."""
+        assert get('/api/tracks/', {'page_size': 2})['count'] == 5
+
+        with django_assert_num_queries(1):
+            data = get('/api/tracks/', {'page_size': 2, 'count': 'false'})
+
+        assert 'count' not in data
+        assert len(data['results']) == 2
+
+    def test_invalid_cursor(self, tracks):
+        """Test that a tampered cursor is a 404."""
+        response = APIClient().get('/api/tracks/', {'cursor': 'not-a-cursor'})
+
+        assert response.status_code == 404
+
+    def test_playlist_pages_by_position(self, tracks, playlist):
+        """Test that the playlist is paged on (position, id)."""
+        for position, track in zip([3.0, 1.0, 2.0, 2.0], tracks):
+            PlaylistTrack.objects.create(playlist=playlist, track=track, position=position)
+
+        assert walk('/api/playlist/', {'page_size': 2}) == [['D', 'C'], ['B', 'E']]
@@ -0,0 +1,86 @@
+"""
+Tests for full-text track search.
+"""
+import pytest
+from rest_framework.test import APIClient
+from apps.tracks.models import Track
+from apps.tracks.search import build_match_query
+
+
+def make_track(title, artist='Test Artist', album='Test Album'):
+    return Track.objects.create(
+        title=title,
+        artist=artist,
+        album=album,
+        duration_seconds=180,
+        genre='rock'
+    )
+
+
+def search(query, **params):
+    response = APIClient().get('/api/tracks/', {'search': query, **params})
+    assert response.status_code == 200
+    return [item['title'] for item in response.data['results']]
+
+
+class TestBuildMatchQuery:
+    """Test cases for turning user input into FTS5 queries."""
+
+    def test_words_become_prefix_terms(self):
+        """Test that every word is quoted and prefix-matched."""
+        assert build_match_query('bohemian rhap') == '"bohemian"* "rhap"*'
+
+    def test_operators_are_literal(self):
+        """Test that FTS5 syntax in user input cannot break the query."""
+        assert build_match_query('AC/DC "NEAR" (*)') == '"AC"* "DC"* "NEAR"*'
+        assert build_match_query(' -*" ') is None
+
+
+@pytest.mark.django_db
+class TestTrackSearch:
+    """Test cases for ?search= on /api/tracks/."""
+
+    def test_prefix_match_across_columns(self):
+        """Test that prefixes match title, artist and album words."""
+        make_track('Bohemian Rhapsody', artist='Queen', album='A Night at the Opera')
+        make_track('Imagine', artist='John Lennon')
+
+        assert search('rhap') == ['Bohemian Rhapsody']
+        assert search('que') == ['Bohemian Rhapsody']
+        assert search('opera night') == ['Bohemian Rhapsody']
+        assert search('xyz') == []
+
+    def test_title_matches_rank_first(self):
+        """Test that results are ordered by relevance."""
+        make_track('Something Else', album='Love Songs')
+        make_track('Love Me Do')
+
+        assert search('love') == ['Love Me Do', 'Something Else']
+
+    def test_explicit_ordering_wins(self):
+        """Test that ?ordering= replaces the relevance order."""
+        make_track('Something Else', album='Love Songs')
+        make_track('Love Me Do')
+
+        assert search('love', ordering='-title') == ['Something Else', 'Love Me Do']
+
+    def test_index_follows_writes(self):
+        """Test that updates, deletes and bulk inserts are reflected in search."""
+        track = make_track('Yesterday')
+        Track.objects.filter(pk=track.pk).update(title='Tomorrow')
+        Track.objects.bulk_create([
+            Track(title='Yellow', artist='Coldplay', album='Parachutes', duration_seconds=266, genre='rock')
+        ])
+
+        assert search('yes') == []
+        assert search('tomo') == ['Tomorrow']
+        assert search('yel') == ['Yellow']
+
+        Track.objects.filter(title='Yellow').delete()
+        assert search('yel') == []
+
+    def test_accents_are_ignored(self):
+        """Test that diacritics do not prevent a match."""
+        make_track('Café del Mar', artist='Energy 52')
+
+        assert search('cafe') == ['Café del Mar']
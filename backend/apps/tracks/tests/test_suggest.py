@@ -0,0 +1,89 @@
+"""
+Tests for the in-memory track suggest index.
+"""
+import pytest
+from rest_framework.test import APIClient
+from apps.tracks.models import Track
+from apps.tracks.suggest import get_suggest_index, tokenize
+
+
+def make_track(title, artist='Test Artist', album='Test Album'):
+    return Track.objects.create(
+        title=title,
+        artist=artist,
+        album=album,
+        duration_seconds=180,
+        genre='rock'
+    )
+
+
+def titles(query, limit=10):
+    return [title for _, title in get_suggest_index().suggest(query, limit)]
+
+
+def test_tokenize_normalizes():
+    """Test that words are casefolded and stripped of accents."""
+    assert tokenize('Café del MAR, Vol. 2') == ['cafe', 'del', 'mar', 'vol', '2']
+
+
+@pytest.mark.django_db
+class TestSuggestIndex:
+    """Test cases for SuggestIndex."""
+
+    @pytest.fixture
+    def tracks(self):
+        """Create a small catalog."""
+        return [
+            make_track('Bohemian Rhapsody', artist='Queen', album='A Night at the Opera'),
+            make_track('Love Me Do', artist='The Beatles', album='Please Please Me'),
+            make_track('Lovely Day', artist='Bill Withers', album='Menagerie'),
+            make_track('Something', artist='The Beatles', album='Abbey Road'),
+        ]
+
+    def test_prefix_matches(self, tracks):
+        """Test that any word of title, artist or album completes a prefix."""
+        assert titles('rhap') == ['Bohemian Rhapsody']
+        assert titles('que') == ['Bohemian Rhapsody']
+        assert titles('QUEEN') == ['Bohemian Rhapsody']
+        assert titles('zzz') == []
+        assert titles('  ') == []
+
+    def test_order_and_limit(self, tracks):
+        """Test that shorter completions and title matches come first."""
+        assert titles('lov') == ['Love Me Do', 'Lovely Day']
+        assert titles('beat') == ['Love Me Do', 'Something']
+        assert titles('lov', limit=1) == ['Love Me Do']
+
+    def test_every_word_must_match(self, tracks):
+        """Test that multi-word queries narrow the results."""
+        assert titles('beatles some') == ['Something']
+        assert titles('the lov') == ['Love Me Do']
+
+    def test_incremental_updates(self, tracks, django_capture_on_commit_callbacks):
+        """Test that committed track changes update a built index."""
+        get_suggest_index().ensure_built()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            track = make_track('Yesterday', artist='The Beatles')
+        assert titles('yest') == ['Yesterday']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            track.title = 'Tomorrow'
+            track.save()
+        assert titles('yest') == []
+        assert titles('tomo') == ['Tomorrow']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            track.delete()
+        assert titles('tomo') == []
+        assert titles('beat') == ['Love Me Do', 'Something']
+
+    def test_suggest_endpoint(self, tracks, django_assert_num_queries):
+        """Test GET /api/tracks/suggest/ without database queries once built."""
+        get_suggest_index().ensure_built()
+
+        with django_assert_num_queries(0):
+            response = APIClient().get('/api/tracks/suggest/', {'q': 'lov', 'limit': 1})
+
+        assert response.status_code == 200
+        assert response.data == {'results': [{'id': tracks[1].id, 'title': 'Love Me Do'}]}
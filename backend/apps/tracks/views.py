@@ -2,20 +2,31 @@
 Views for Track API endpoints.
 """
 from rest_framework import viewsets, filters
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from core.log import RATE_LIMITED
+from core.mixins import FastReadMixin
+from core.pagination import KeysetPagination
 from .models import Track
-from .serializers import TrackSerializer
+from .search import TrackSearchFilter
+from .serializers import TrackReadSerializer, TrackSerializer
+from .suggest import get_suggest_index
 import logging
 
 logger = logging.getLogger(__name__)
 
+SUGGEST_MAX_LIMIT = 50
 
-class TrackViewSet(viewsets.ReadOnlyModelViewSet):
+
+class TrackViewSet(FastReadMixin, viewsets.ReadOnlyModelViewSet):
 
     queryset = Track.objects.all()
     serializer_class = TrackSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    read_serializer_class = TrackReadSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [TrackSearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'artist', 'album']
     ordering_fields = ['title', 'artist', 'duration_seconds', 'created_at']
     
@@ -24,7 +35,9 @@ class TrackViewSet(viewsets.ReadOnlyModelViewSet):
         operation_description="""
         Get a list of all available tracks in the library.
         
-        **Search**: Use `?search=query` to search by title, artist, or album.
+        **Search**: Use `?search=query` to search by title, artist, or album. Every word
+        matches as a prefix (`que` finds "Queen") and results are ordered by relevance,
+        with title matches ranked above artist and album matches.
         
         **Ordering**: Use `?ordering=field` to sort results. Prefix with `-` for descending order.
         Available fields: `title`, `artist`, `duration_seconds`, `created_at`
@@ -33,12 +46,16 @@ class TrackViewSet(viewsets.ReadOnlyModelViewSet):
         - `/api/tracks/?search=queen` - Search for "queen"
         - `/api/tracks/?ordering=-duration_seconds` - Sort by duration (longest first)
         - `/api/tracks/?ordering=artist` - Sort by artist name (A-Z)
+        
+        **Pagination**: Results are paged with opaque cursors; follow the `next` and
+        `previous` links. Use `?page_size=` (max 1000) to change the page size and
+        `?count=false` to skip the total count.
         """,
         manual_parameters=[
             openapi.Parameter(
                 'search',
                 openapi.IN_QUERY,
-                description="Search by title, artist, or album",
+                description="Search by title, artist, or album (prefix match, ranked by relevance)",
                 type=openapi.TYPE_STRING
             ),
             openapi.Parameter(
@@ -51,5 +68,45 @@ class TrackViewSet(viewsets.ReadOnlyModelViewSet):
         ]
     )
     def list(self, request, *args, **kwargs):
-        logger.info(f"Fetching track library (filters: {request.query_params})")
+        logger.info("Fetching track library (filters: %s)", request.query_params, extra=RATE_LIMITED)
         return super().list(request, *args, **kwargs)
+    
+    @swagger_auto_schema(
+        operation_summary="Suggest tracks while typing",
+        operation_description="""
+        Return the ids and titles of tracks whose title, artist or album words start
+        with every word of `q`. Served from an in-memory index instead of the
+        database, so it is cheap enough to call on every keystroke.
+        
+        Completions are ordered alphabetically by the matched word, with title
+        matches before artist and album matches.
+        """,
+        manual_parameters=[
+            openapi.Parameter(
+                'q',
+                openapi.IN_QUERY,
+                description="Text typed so far",
+                type=openapi.TYPE_STRING,
+                required=True
+            ),
+            openapi.Parameter(
+                'limit',
+                openapi.IN_QUERY,
+                description=f"Maximum number of suggestions (default 10, max {SUGGEST_MAX_LIMIT})",
+                type=openapi.TYPE_INTEGER
+            ),
+        ],
+        responses={200: 'OK - {"results": [{"id": int, "title": str}, ...]}'}
+    )
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        """Typeahead suggestions from the in-memory index."""
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), SUGGEST_MAX_LIMIT)
+        except ValueError:
+            limit = 10
+        
+        suggestions = get_suggest_index().suggest(request.query_params.get('q', ''), max(limit, 1))
+        return Response({
+            'results': [{'id': pk, 'title': title} for pk, title in suggestions]
+        })
@@ -9,6 +9,9 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django_asgi_app = get_asgi_application()
 
 from apps.playlist.routing import websocket_urlpatterns
+from apps.tracks.suggest import warm_suggest_index
+
+warm_suggest_index()
 
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
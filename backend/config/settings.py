@@ -33,6 +33,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -102,12 +103,16 @@ REST_FRAMEWORK = {
 
 CORS_ALLOWED_ORIGINS = os.getenv('CORS_ALLOWED_ORIGINS', 'http://localhost:3000').split(',')
 CORS_ALLOW_CREDENTIALS = True
+CORS_EXPOSE_HEADERS = ['ETag', 'X-Playlist-Version']
+
+REDIS_HOST = os.getenv('REDIS_HOST', '127.0.0.1')
+REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
 
 CHANNEL_LAYERS = {
     'default': {
         'BACKEND': 'channels_redis.core.RedisChannelLayer',
         'CONFIG': {
-            "hosts": [(os.getenv('REDIS_HOST', '127.0.0.1'), int(os.getenv('REDIS_PORT', 6379)))],
+            "hosts": [(REDIS_HOST, REDIS_PORT)],
         },
     },
 }
@@ -118,6 +123,15 @@ CHANNEL_LAYERS = {
 #     },
 # }
 
+# Log records are queued by the calling thread and written to the console and
+# file by a background thread (at most LOG_QUEUE_SIZE waiting; overflow is
+# dropped). Each INFO/DEBUG message logged with extra=RATE_LIMITED is let
+# through at most LOG_SAMPLE_RATE times per LOG_SAMPLE_INTERVAL seconds;
+# 0 disables sampling.
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+LOG_SAMPLE_RATE = int(os.getenv('LOG_SAMPLE_RATE', 10))
+LOG_SAMPLE_INTERVAL = float(os.getenv('LOG_SAMPLE_INTERVAL', 1.0))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -127,6 +141,13 @@ LOGGING = {
             'style': '{',
         },
     },
+    'filters': {
+        'sampled': {
+            '()': 'core.log.RateLimitFilter',
+            'rate': LOG_SAMPLE_RATE,
+            'per': LOG_SAMPLE_INTERVAL,
+        },
+    },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
@@ -137,23 +158,111 @@ LOGGING = {
             'filename': BASE_DIR / 'logs' / 'django.log',
             'formatter': 'verbose',
         },
+        'queue': {
+            '()': 'core.log.QueueLogHandler',
+            'handlers': ['cfg://handlers.console', 'cfg://handlers.file'],
+            'queue_size': LOG_QUEUE_SIZE,
+            'filters': ['sampled'],
+        },
     },
     'root': {
-        'handlers': ['console', 'file'],
+        'handlers': ['queue'],
         'level': 'INFO',
     },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
         'apps': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'DEBUG' if DEBUG else 'INFO',
             'propagate': False,
         },
     },
 }
 
+# Play order of POST /api/playlist/next/ and /previous/: by votes (ties by
+# position) instead of by position. Votes that change a track's place in that
+# order also broadcast a 'track.ranked' event.
 AUTO_SORT_BY_VOTES = os.getenv('AUTO_SORT_BY_VOTES', 'False') == 'True'
+
+# Vote aggregation: votes are counted in a shared store ('redis', falling back
+# to 'memory' when Redis is unreachable) and flushed to PlaylistTrack.votes
+# every VOTE_FLUSH_INTERVAL seconds. An interval of 0 disables the background
+# flusher (use the flush_votes management command instead).
+VOTE_COUNTER_BACKEND = os.getenv('VOTE_COUNTER_BACKEND', 'redis')
+VOTE_FLUSH_INTERVAL = float(os.getenv('VOTE_FLUSH_INTERVAL', 1.0))
+
+# Broadcast coalescing window in seconds (e.g. 0.05). Events sent within the
+# window are merged per track and delivered as one 'playlist.batch' message.
+# 0 sends every event immediately.
+BROADCAST_COALESCE_WINDOW = float(os.getenv('BROADCAST_COALESCE_WINDOW', 0))
+
+# Playlist ordering mode: 'position' orders by the fractional float position,
+# 'rank' by a string rank key generated server-side from the neighbouring
+# tracks. Run `manage.py rebalance_positions --ranks` when switching to 'rank'.
+PLAYLIST_ORDERING = os.getenv('PLAYLIST_ORDERING', 'position')
+
+# Playlist changelog used for delta sync (GET /api/playlist/changes/?since=).
+# Keeps the last CHANGELOG_SIZE events in 'redis' (or 'memory' as fallback).
+CHANGELOG_BACKEND = os.getenv('CHANGELOG_BACKEND', 'redis')
+CHANGELOG_SIZE = int(os.getenv('CHANGELOG_SIZE', 1000))
+
+# Send a 'playlist.snapshot' of the whole playlist to every new WebSocket
+# connection. Snapshots are cached per playlist version (and for at most
+# SNAPSHOT_CACHE_TTL seconds) and shared by all connections.
+WEBSOCKET_SNAPSHOT_ON_CONNECT = os.getenv('WEBSOCKET_SNAPSHOT_ON_CONNECT', 'True') == 'True'
+SNAPSHOT_CACHE_TTL = float(os.getenv('SNAPSHOT_CACHE_TTL', 30))
+
+# Seconds a pre-rendered playlist list/history response may be reused while the
+# playlist version is unchanged. 0 disables the response cache.
+RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', 30))
+
+# Broadcasts are sent after the surrounding transaction commits. With
+# BROADCAST_ASYNC they are handed to a background event loop that keeps its
+# channel-layer connection open, so requests never wait on Redis; at most
+# BROADCAST_QUEUE_SIZE messages are queued and any overflow is dropped and counted.
+BROADCAST_ASYNC = os.getenv('BROADCAST_ASYNC', 'True') == 'True'
+BROADCAST_QUEUE_SIZE = int(os.getenv('BROADCAST_QUEUE_SIZE', 10000))
+
+# Transactional outbox: store broadcasts as rows in the same transaction as the
+# playlist change and deliver them with `manage.py dispatch_outbox` (at-least-once).
+# The dispatcher sends up to OUTBOX_BATCH_SIZE events per pass, polls every
+# OUTBOX_POLL_INTERVAL seconds when idle and deletes delivered rows after
+# OUTBOX_RETENTION seconds.
+BROADCAST_OUTBOX = os.getenv('BROADCAST_OUTBOX', 'False') == 'True'
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 500))
+OUTBOX_POLL_INTERVAL = float(os.getenv('OUTBOX_POLL_INTERVAL', 0.5))
+OUTBOX_RETENTION = float(os.getenv('OUTBOX_RETENTION', 3600))
+
+# Seconds before the in-memory track suggest index (GET /api/tracks/suggest/)
+# is rebuilt in the background to pick up changes made by other processes.
+# Changes made in this process are applied immediately. 0 disables rebuilds.
+SUGGEST_INDEX_TTL = float(os.getenv('SUGGEST_INDEX_TTL', 300))
+
+# Serialize playlist lists, history, snapshots and broadcast payloads, and the
+# track list, straight from .values() rows instead of through DRF's per-field
+# serializer machinery. The output is identical; disable to compare.
+FAST_READ_SERIALIZERS = os.getenv('FAST_READ_SERIALIZERS', 'True') == 'True'
+
+# Frames queued per WebSocket connection before a slow client is sent
+# 'resync.required' and dropped from the stream until it resyncs. Superseded
+# vote and move events for the same track replace each other in the queue.
+WEBSOCKET_QUEUE_SIZE = int(os.getenv('WEBSOCKET_QUEUE_SIZE', 256))
+
+# Frames sent to a WebSocket client before it must acknowledge them with
+# {"type": "ack", "received": n}. Daphne's send() never waits for the client,
+# so this window is what keeps a slow client's frames in the bounded queue
+# above instead of the server's transport buffer. Only enable it when every
+# client sends acks (the bundled frontend does); 0, the default, disables it.
+WEBSOCKET_SEND_WINDOW = int(os.getenv('WEBSOCKET_SEND_WINDOW', 0))
+
+# Request latency, query counts, broadcasts and WebSocket connections are
+# counted per process and flushed every METRICS_FLUSH_INTERVAL seconds into a
+# store shared by all workers ('redis', falling back to 'memory'), which
+# GET /metrics renders in the Prometheus text format.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+METRICS_BACKEND = os.getenv('METRICS_BACKEND', 'redis')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5.0))
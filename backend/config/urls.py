@@ -5,6 +5,7 @@ from django.conf.urls.static import static
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
+from core.views import metrics
 
 # Swagger/OpenAPI schema configuration
 schema_view = get_schema_view(
@@ -24,8 +25,8 @@ A collaborative playlist application with real-time synchronization.
 - **Position Algorithm**: Efficient reordering without re-indexing
 
 ### WebSocket Connection:
-- **Endpoint**: `ws://localhost:4000/ws/playlist/`
-- **Events**: track.added, track.removed, track.moved, track.voted, track.playing
+- **Endpoint**: `ws://localhost:4000/ws/playlist/` (default room) or `ws://localhost:4000/ws/playlist/{room}/`
+- **Events**: track.added, track.removed, track.moved, track.voted, playback.state
 
 ### Authentication:
 No authentication required for this demo version.
@@ -42,6 +43,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('apps.tracks.urls')),
     path('api/', include('apps.playlist.urls')),
+    path('metrics', metrics, name='metrics'),
     
     re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
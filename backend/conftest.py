@@ -0,0 +1,75 @@
+"""
+Shared test fixtures.
+"""
+import pytest
+from apps.playlist.models import Playlist
+from apps.playlist.order_index import get_order_index
+from apps.playlist.playback import get_playback_cache
+from apps.playlist.snapshot import get_snapshot_cache
+from apps.playlist.votes import get_vote_aggregator
+from apps.realtime.cache import get_response_cache
+from apps.realtime.changelog import get_changelog
+from apps.realtime.utils import get_event_publisher
+from apps.tracks.suggest import get_suggest_index
+from core.metrics import get_metrics
+
+
+@pytest.fixture(autouse=True)
+def vote_aggregator(settings):
+    """Use an in-process vote store without the background flusher."""
+    settings.VOTE_COUNTER_BACKEND = 'memory'
+    settings.VOTE_FLUSH_INTERVAL = 0
+    get_vote_aggregator.cache_clear()
+    aggregator = get_vote_aggregator()
+    yield aggregator
+    aggregator.store.clear()
+    get_vote_aggregator.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def changelog(settings):
+    """Use a fresh in-process playlist changelog."""
+    settings.CHANGELOG_BACKEND = 'memory'
+    get_changelog.cache_clear()
+    get_snapshot_cache.cache_clear()
+    get_response_cache.cache_clear()
+    get_playback_cache.cache_clear()
+    get_order_index.cache_clear()
+    yield get_changelog()
+    get_changelog.cache_clear()
+    get_snapshot_cache.cache_clear()
+    get_response_cache.cache_clear()
+    get_playback_cache.cache_clear()
+    get_order_index.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def event_publisher(settings):
+    """Send broadcasts synchronously so tests can observe them."""
+    settings.BROADCAST_ASYNC = False
+    get_event_publisher.cache_clear()
+    yield
+    get_event_publisher.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def suggest_index():
+    """Start every test with an unbuilt suggest index."""
+    get_suggest_index.cache_clear()
+    yield
+    get_suggest_index.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def metrics(settings):
+    """Count into fresh in-process metrics."""
+    settings.METRICS_BACKEND = 'memory'
+    get_metrics.cache_clear()
+    yield get_metrics()
+    get_metrics.cache_clear()
+
+
+@pytest.fixture
+def playlist(db):
+    """Return the default playlist room."""
+    return Playlist.objects.get_default()
@@ -27,10 +27,10 @@ def custom_exception_handler(exc, context):
             custom_response_data['error']['code'] = exc.default_code.upper()
         
         response.data = custom_response_data
-        logger.warning(f"API Error: {exc} - Context: {context}")
+        logger.warning("API Error: %s - Context: %s", exc, context)
     else:
         # Handle non-DRF exceptions
-        logger.error(f"Unhandled exception: {exc}", exc_info=True)
+        logger.error("Unhandled exception: %s", exc, exc_info=True)
         response = Response(
             {
                 'error': {
@@ -51,3 +51,12 @@ class DuplicateTrackError(Exception):
 
 class InvalidPositionError(Exception):
     pass
+
+
+class BatchOperationError(Exception):
+    
+    def __init__(self, index, code, message):
+        super().__init__(message)
+        self.index = index
+        self.code = code
+        self.message = message
@@ -0,0 +1,119 @@
+"""
+Non-blocking logging.
+
+QueueLogHandler hands records to a background thread that formats them and
+writes them to the console and file handlers, so request threads never wait
+on I/O. Records are queued unformatted: log with %-style arguments
+(``logger.info("Track %s voted", pk)``) and the message is only built if the
+record is written. RateLimitFilter samples the high-frequency messages
+logged with ``extra=RATE_LIMITED``.
+"""
+from logging.handlers import QueueHandler, QueueListener
+import logging
+import queue
+import threading
+import time
+
+# Seconds close() waits for room in a full queue before giving up on the writer
+STOP_TIMEOUT = 5.0
+
+# Pass as ``extra`` to let RateLimitFilter sample a per-request or per-event log call
+RATE_LIMITED = {'rate_limit': True}
+
+
+class DrainingQueueListener(QueueListener):
+    """A QueueListener whose stop() waits for room in a full queue and may be called twice."""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel, timeout=STOP_TIMEOUT)
+
+    def stop(self):
+        if self._thread is None:
+            return
+        try:
+            self.enqueue_sentinel()
+        except queue.Full:
+            # The writer is stuck; leave its records rather than hang shutdown
+            return
+        self._thread.join()
+        self._thread = None
+
+
+class QueueLogHandler(QueueHandler):
+    """
+    Queue records for ``handlers``, which a QueueListener thread writes out.
+
+    ``handlers`` are configured handlers, referenced from LOGGING as
+    ``'cfg://handlers.<name>'``. When ``queue_size`` records are waiting,
+    further records are dropped and counted rather than blocking the caller.
+    close(), which ``logging.shutdown()`` calls at exit, writes out the records
+    still queued and stops the listener.
+    """
+
+    def __init__(self, handlers, queue_size=10000):
+        super().__init__(queue.Queue(queue_size))
+        # dictConfig resolves 'cfg://' references on item access, not iteration
+        targets = [handlers[i] for i in range(len(handlers))]
+        self.dropped = 0
+        self.listener = DrainingQueueListener(self.queue, *targets, respect_handler_level=True)
+        self.listener.start()
+
+    def prepare(self, record):
+        # The listener runs in this process, so the record needs no pickling;
+        # skip QueueHandler's eager formatting and leave it to the listener
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        self.listener.stop()
+        super().close()
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let through at most ``rate`` records of each message per ``per`` seconds.
+
+    Only records logged with ``extra=RATE_LIMITED`` are sampled, so one-off
+    messages such as startup and migration lines are always written. Records
+    are grouped by logger and unformatted message, so every
+    ``"Track %s voted %s"`` line counts together. The next record let through
+    after some were suppressed reports how many. Warnings and errors are
+    never suppressed.
+    """
+
+    def __init__(self, rate=10, per=1.0):
+        super().__init__()
+        self.rate = rate
+        self.per = per
+        self._window = None
+        self._counts = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.rate <= 0 or record.levelno >= logging.WARNING or not getattr(record, 'rate_limit', False):
+            return True
+
+        key = (record.name, record.msg)
+        with self._lock:
+            window = int(time.monotonic() // self.per)
+            if window != self._window:
+                self._window = window
+                self._counts = {}
+            count = self._counts.get(key, 0) + 1
+            self._counts[key] = count
+            if count > self.rate:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False
+            suppressed = self._suppressed.pop(key, 0)
+
+        if suppressed and isinstance(record.msg, str) and isinstance(record.args, tuple):
+            msg = record.msg if record.args else record.msg.replace('%', '%%')
+            record.msg = f'{msg} (%s similar message(s) suppressed)'
+            record.args = (*record.args, suppressed)
+        return True
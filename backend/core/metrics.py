@@ -0,0 +1,222 @@
+"""
+Process-shared counters and histograms, exported in the Prometheus text format.
+
+Each process adds to local counters, which cost a dict update, and flushes
+them as deltas into a shared store ('redis', falling back to 'memory' when
+Redis is unreachable) every METRICS_FLUSH_INTERVAL seconds. GET /metrics
+flushes the serving process first and then renders the totals of every
+worker, so any of them can be scraped.
+"""
+from collections import defaultdict
+from functools import lru_cache
+from django.conf import settings
+from core.redis_client import get_redis_client
+import atexit
+import json
+import math
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+METRICS = {
+    'http_requests_total': ('counter', 'HTTP requests by route, method and status.'),
+    'http_request_duration_seconds': ('histogram', 'HTTP request latency by route and method.'),
+    'db_queries_total': ('counter', 'Database queries run by HTTP requests.'),
+    'db_query_duration_seconds_total': ('counter', 'Time spent in database queries by HTTP requests.'),
+    'playlist_broadcasts_total': ('counter', "Playlist events broadcast, by event type and result ('sent', 'failed' or 'dropped')."),
+    'websocket_connects_total': ('counter', 'Accepted playlist WebSocket connections.'),
+    'websocket_disconnects_total': ('counter', 'Closed playlist WebSocket connections.'),
+}
+
+
+class MemoryMetricsStore:
+    """In-process totals, used when Redis is not available."""
+
+    def __init__(self):
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def add(self, deltas):
+        with self._lock:
+            for series, delta in deltas.items():
+                self._values[series] += delta
+
+    def read(self):
+        with self._lock:
+            return dict(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class RedisMetricsStore:
+    """Totals kept in a Redis hash shared by every worker process."""
+
+    key = 'metrics:series'
+
+    def __init__(self, client):
+        self.client = client
+
+    @staticmethod
+    def encode(series):
+        name, labels = series
+        return json.dumps([name, labels])
+
+    @staticmethod
+    def decode(field):
+        name, labels = json.loads(field)
+        return name, tuple(tuple(label) for label in labels)
+
+    def add(self, deltas):
+        pipe = self.client.pipeline(transaction=False)
+        for series, delta in deltas.items():
+            pipe.hincrbyfloat(self.key, self.encode(series), delta)
+        pipe.execute()
+
+    def read(self):
+        return {self.decode(field): float(value) for field, value in self.client.hgetall(self.key).items()}
+
+    def clear(self):
+        self.client.delete(self.key)
+
+
+class Metrics:
+    """
+    Local counters for one process, flushed into a shared store.
+
+    A series is a ``(name, labels)`` pair where labels is a sorted tuple of
+    ``(label, value)`` pairs. Histograms are kept as cumulative ``_bucket``
+    counters plus ``_sum`` and ``_count``.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._pending = defaultdict(float)
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def series(name, labels=None):
+        return name, tuple(sorted((labels or {}).items()))
+
+    def inc(self, name, labels=None, amount=1):
+        series = self.series(name, labels)
+        with self._lock:
+            self._pending[series] += amount
+
+    def observe(self, name, value, labels=None, buckets=LATENCY_BUCKETS):
+        labels = labels or {}
+        with self._lock:
+            # Every bucket is written, even with 0, so scrapes see the full histogram
+            for bound in buckets:
+                le = '+Inf' if bound == math.inf else repr(bound)
+                self._pending[self.series(f'{name}_bucket', {**labels, 'le': le})] += 1 if value <= bound else 0
+            self._pending[self.series(f'{name}_sum', labels)] += value
+            self._pending[self.series(f'{name}_count', labels)] += 1
+
+    def flush(self):
+        with self._lock:
+            deltas, self._pending = dict(self._pending), defaultdict(float)
+        if not deltas:
+            return
+        try:
+            self.store.add(deltas)
+        except Exception:
+            # Keep the deltas for the next flush rather than losing them
+            with self._lock:
+                for series, delta in deltas.items():
+                    self._pending[series] += delta
+            raise
+
+    def collect(self):
+        """Flush this process and return the totals of every process."""
+        self.flush()
+        return self.store.read()
+
+    def render(self):
+        """Return the totals in the Prometheus text exposition format."""
+        families = defaultdict(list)
+        for (name, labels), value in self.collect().items():
+            family = name
+            if name not in METRICS:
+                family = name.rsplit('_', 1)[0]
+            if family in METRICS:
+                families[family].append((name, labels, value))
+
+        lines = []
+        for family, (kind, help_text) in METRICS.items():
+            if family not in families:
+                continue
+            lines.append(f'# HELP {family} {help_text}')
+            lines.append(f'# TYPE {family} {kind}')
+            for name, labels, value in sorted(families[family], key=_sort_key):
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def start(self, interval):
+        if self._flusher is not None:
+            return
+        self._stop.clear()
+        self._flusher = threading.Thread(target=self._run, args=(interval,), name='metrics-flusher', daemon=True)
+        self._flusher.start()
+
+    def stop(self):
+        if self._flusher is None:
+            return
+        self._stop.set()
+        self._flusher.join()
+        self._flusher = None
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning("Failed to flush metrics: %s", e)
+
+
+def _sort_key(entry):
+    # Keep histogram series together, with buckets in increasing order
+    name, labels, _ = entry
+    le = dict(labels).get('le')
+    others = tuple(label for label in labels if label[0] != 'le')
+    return others, name, float(le) if le is not None else 0.0
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+@lru_cache(maxsize=None)
+def get_metrics():
+    """Return the process-wide metrics."""
+    client = get_redis_client() if settings.METRICS_BACKEND == 'redis' else None
+    metrics = Metrics(RedisMetricsStore(client) if client is not None else MemoryMetricsStore())
+    if client is not None and settings.METRICS_FLUSH_INTERVAL > 0:
+        metrics.start(settings.METRICS_FLUSH_INTERVAL)
+        atexit.register(_flush_on_exit, metrics)
+    return metrics
+
+
+def _flush_on_exit(metrics):
+    metrics.stop()
+    try:
+        metrics.flush()
+    except Exception:
+        logger.exception("Failed to flush metrics on exit")
@@ -0,0 +1,71 @@
+"""
+Request instrumentation.
+"""
+from contextlib import ExitStack
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from core.metrics import get_metrics
+import time
+
+
+class QueryTimer:
+    """Database execute wrapper counting the queries of a request and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+def route_name(request):
+    """Label a request by its URL pattern name rather than its path, which holds ids and room slugs."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match._func_path
+
+
+class MetricsMiddleware:
+    """
+    Record latency, status and database queries of every request.
+
+    Routes are labelled by URL name, so together with the method they name
+    the viewset action (``playlist-list`` GET is list, POST is create).
+    Each response gets a ``Server-Timing`` header with the total and
+    database time, which browser dev tools show per request.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        labels = {'route': route_name(request), 'method': request.method}
+        metrics = get_metrics()
+        metrics.inc('http_requests_total', {**labels, 'status': str(response.status_code)})
+        metrics.observe('http_request_duration_seconds', duration, labels)
+        metrics.inc('db_queries_total', labels, timer.count)
+        metrics.inc('db_query_duration_seconds_total', labels, timer.duration)
+
+        response['Server-Timing'] = (
+            f'app;dur={duration * 1000:.1f}, '
+            f'db;dur={timer.duration * 1000:.1f};desc="{timer.count} queries"'
+        )
+        return response
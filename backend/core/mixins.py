@@ -1,4 +1,6 @@
+from django.conf import settings
 from django.utils import timezone
+from rest_framework.response import Response
 
 
 class TimestampMixin:
@@ -16,4 +18,39 @@ class LoggingMixin:
         """Log an action with details."""
         import logging
         logger = logging.getLogger(self.__class__.__module__)
-        logger.info(f"{action}: {details}")
+        logger.info("%s: %s", action, details)
+
+
+class FastReadMixin:
+    """
+    Serve ``list`` through a ``read_serializer_class`` that builds output from
+    ``.values()`` rows, when ``settings.FAST_READ_SERIALIZERS`` is enabled.
+    
+    Read serializers provide ``values(queryset)`` and ``serialize(rows)`` and
+    must produce exactly the output of the view's ``serializer_class``.
+    """
+    read_serializer_class = None
+    
+    def get_read_serializer(self):
+        return self.read_serializer_class()
+    
+    def use_fast_read(self):
+        return settings.FAST_READ_SERIALIZERS and self.read_serializer_class is not None
+    
+    def serialize_many(self, queryset):
+        """Serialize a queryset for a read-only response."""
+        if not self.use_fast_read():
+            return self.get_serializer(queryset, many=True).data
+        serializer = self.get_read_serializer()
+        return serializer.serialize(serializer.values(queryset))
+    
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_read():
+            return super().list(request, *args, **kwargs)
+        
+        serializer = self.get_read_serializer()
+        queryset = serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(queryset))
@@ -1,4 +1,10 @@
-from rest_framework.pagination import PageNumberPagination
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+import json
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -11,3 +17,184 @@ class SmallResultsSetPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination keyed on the queryset's own ordering plus ``id``.
+
+    The cursor holds the ordering values of the last (or first) row of the
+    page, and the next page is fetched with a ``WHERE (a, b, id) > (...)``
+    comparison instead of an OFFSET, so deep pages cost the same as the first
+    one and rows inserted or deleted between requests never cause items to
+    be skipped or repeated.
+
+    The ordering is whatever the view and its filter backends left on the
+    queryset (e.g. ``?ordering=-title``), falling back to the model's
+    ``Meta.ordering``. Annotations, such as the search relevance, can be
+    ordered on as well.
+
+    ``?count=false`` skips the total row count.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    count_query_param = 'count'
+    ordering = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.fields = self.get_keyset_fields(queryset)
+        values, reverse = self.decode_cursor(request) or (None, False)
+
+        self.count = queryset.order_by().count() if self.include_count(request) else None
+
+        if values is not None:
+            queryset = queryset.filter(self.keyset_filter(values, reverse))
+        order_by = [
+            f'-{name}' if descending != reverse else name
+            for name, descending in self.fields
+        ]
+
+        rows = list(queryset.order_by(*order_by)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+
+        if self.page:
+            self.next_values = self.get_row_values(self.page[-1])
+            self.previous_values = self.get_row_values(self.page[0])
+        else:
+            self.has_next = self.has_previous = False
+        self.display_page_controls = self.has_next or self.has_previous
+        return self.page
+
+    def paginate_index(self, index, request):
+        """
+        Paginate an in-memory sorted index instead of a queryset and return its keys.
+
+        ``index`` provides ``page(cursor, limit, reverse)`` returning
+        ``(keys, more)`` and ``__len__``; its keys are unique tuples, which
+        become the cursor values.
+        """
+        self.page_size = self.get_page_size(request)
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        values, reverse = self.decode_cursor(request) or (None, False)
+
+        self.count = len(index) if self.include_count(request) else None
+        try:
+            keys, has_more = index.page(
+                None if values is None else tuple(values),
+                self.page_size or len(index),
+                reverse
+            )
+        except TypeError:
+            raise NotFound(self.invalid_cursor_message)
+
+        if reverse:
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+        if keys:
+            self.next_values, self.previous_values = list(keys[-1]), list(keys[0])
+        else:
+            self.has_next = self.has_previous = False
+        self.display_page_controls = self.has_next or self.has_previous
+        return keys
+
+    def get_keyset_fields(self, queryset):
+        """Return ``(name, descending)`` pairs for the ordering, always ending in ``id``."""
+        query = queryset.query
+        ordering = query.order_by or queryset.model._meta.ordering
+
+        fields = []
+        for field in ordering:
+            if not isinstance(field, str):
+                raise TypeError(f'{type(self).__name__} only supports ordering by field names, got {field!r}')
+            name = field.lstrip('-')
+            fields.append(('id' if name == 'pk' else name, field.startswith('-')))
+            if fields[-1][0] == 'id':
+                break
+        else:
+            # Break ties in the direction of the sort, so one index scan serves the whole order
+            fields.append(('id', fields[0][1] if fields else False))
+        return fields
+
+    def keyset_filter(self, values, reverse):
+        """Rows strictly after ``values`` in the ordering (before them when ``reverse``)."""
+        if len(values) != len(self.fields):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self.fields, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def get_row_values(self, row):
+        if isinstance(row, dict):
+            return [row[name] for name, _ in self.fields]
+        return [getattr(row, name) for name, _ in self.fields]
+
+    def include_count(self, request):
+        return request.query_params.get(self.count_query_param, 'true').lower() not in ('0', 'false', 'no')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            data = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            return list(data['v']), bool(data.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, values, reverse=False):
+        data = {'v': values, 'r': 1} if reverse else {'v': values}
+        encoded = urlsafe_b64encode(json.dumps(data, default=str, separators=(',', ':')).encode())
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded.decode('ascii'))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.next_values)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.previous_values, reverse=True)
+
+    def get_paginated_response(self, data):
+        body = {}
+        if self.count is not None:
+            body['count'] = self.count
+        body.update(next=self.get_next_link(), previous=self.get_previous_link(), results=data)
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties'] = {
+            'count': {'type': 'integer', 'example': 123},
+            **response_schema['properties'],
+        }
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [{
+            'name': self.count_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Set to false to skip the total count.',
+            'schema': {'type': 'boolean'},
+        }]
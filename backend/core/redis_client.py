@@ -0,0 +1,40 @@
+"""
+Shared Redis connection for the counter stores.
+"""
+from django.conf import settings
+import redis
+import logging
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_unavailable = False
+
+
+def get_redis_client():
+    """
+    Return a connected Redis client, or None when Redis is unreachable.
+
+    The result is remembered for the lifetime of the process so that callers
+    falling back to in-process storage never switch stores mid-flight.
+    """
+    global _client, _unavailable
+
+    if _client is not None or _unavailable:
+        return _client
+
+    client = redis.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        socket_connect_timeout=0.5,
+        decode_responses=True,
+    )
+    try:
+        client.ping()
+    except redis.RedisError as e:
+        logger.warning("Redis unavailable, using in-process storage: %s", e)
+        _unavailable = True
+        return None
+
+    _client = client
+    return _client
@@ -0,0 +1,7 @@
+from django.http import HttpResponse
+from core.metrics import get_metrics
+
+
+def metrics(request):
+    """Serve the counters of every worker process in the Prometheus text format."""
+    return HttpResponse(get_metrics().render(), content_type='text/plain; version=0.0.4; charset=utf-8')
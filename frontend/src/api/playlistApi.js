@@ -113,6 +113,24 @@ const playlistApi = {
     }
   },
 
+  /**
+   * Play the track after (or before) the current one, in server order
+   * @param {string} direction - 'next' or 'previous'
+   * @param {boolean} unplayed - Skip tracks that were already played
+   * @returns {Promise<Object>} - The playlist item now playing
+   */
+  advance: async (direction, unplayed = false) => {
+    try {
+      const response = await axiosInstance.post(`/api/playlist/${direction}/`, {
+        unplayed,
+      });
+      return response.data;
+    } catch (error) {
+      console.error(`Error playing ${direction} track:`, error);
+      throw error;
+    }
+  },
+
   /**
    * Stop playing current track
    * @returns {Promise<Object>} - Response indicating playback stopped
@@ -200,41 +200,45 @@ export const PlaylistProvider = ({ children }) => {
   }, [currentlyPlaying]);
 
   /**
-   * Play next track in playlist
+   * Play the next or previous track; the server walks the playlist order
    */
-  const playNextTrack = useCallback(async () => {
-    if (!playlist || playlist.length === 0) return;
-
-    const currentIndex = currentlyPlaying
-      ? playlist.findIndex((item) => item.id === currentlyPlaying.id)
-      : -1;
+  const advanceTrack = useCallback(async (direction) => {
+    try {
+      const updated = await playlistApi.advance(direction);
 
-    const nextIndex = (currentIndex + 1) % playlist.length;
-    const nextTrack = playlist[nextIndex];
+      setPlaylist((prev) =>
+        prev.map((item) => ({
+          ...item,
+          is_playing: item.id === updated.id,
+        }))
+      );
 
-    if (nextTrack) {
-      await playTrack(nextTrack.id);
+      setCurrentlyPlaying(updated);
+      return updated;
+    } catch (err) {
+      // 404: already at the end (or start) of the playlist
+      if (err.response?.status !== 404) {
+        setError(err.message || `Failed to play ${direction} track`);
+        throw err;
+      }
     }
-  }, [playlist, currentlyPlaying, playTrack]);
+  }, []);
 
   /**
-   * Play previous track in playlist
+   * Play next track in playlist
    */
-  const playPreviousTrack = useCallback(async () => {
-    if (!playlist || playlist.length === 0) return;
-
-    const currentIndex = currentlyPlaying
-      ? playlist.findIndex((item) => item.id === currentlyPlaying.id)
-      : 0;
-
-    const prevIndex =
-      currentIndex <= 0 ? playlist.length - 1 : currentIndex - 1;
-    const prevTrack = playlist[prevIndex];
+  const playNextTrack = useCallback(
+    () => advanceTrack("next"),
+    [advanceTrack]
+  );
 
-    if (prevTrack) {
-      await playTrack(prevTrack.id);
-    }
-  }, [playlist, currentlyPlaying, playTrack]);
+  /**
+   * Play previous track in playlist
+   */
+  const playPreviousTrack = useCallback(
+    () => advanceTrack("previous"),
+    [advanceTrack]
+  );
 
   /**
    * Toggle play/pause for current track
@@ -304,15 +308,41 @@ export const PlaylistProvider = ({ children }) => {
           }
           break;
 
-        case WS_EVENTS.TRACK_PLAYING:
-          if (playlistItem) {
-            setPlaylist((prev) =>
-              prev.map((item) => ({
+        case WS_EVENTS.PLAYBACK_STATE:
+          if (event.payload) {
+            const { item_id: itemId, is_playing: isPlaying } = event.payload;
+            setPlaylist((prev) => {
+              const updated = prev.map((item) => ({
                 ...item,
-                is_playing: item.id === playlistItem.id,
-              }))
+                is_playing: isPlaying && item.id === itemId,
+              }));
+              setCurrentlyPlaying(updated.find((item) => item.is_playing) || null);
+              return updated;
+            });
+          }
+          break;
+
+        case WS_EVENTS.PLAYLIST_SNAPSHOT:
+          if (event.items) {
+            setPlaylist(event.items);
+            setCurrentlyPlaying(
+              event.items.find((item) => item.is_playing) || null
+            );
+          }
+          break;
+
+        case WS_EVENTS.PLAYLIST_REINDEXED:
+          if (event.payload?.positions) {
+            const positions = event.payload.positions;
+            setPlaylist((prev) =>
+              prev
+                .map((item) =>
+                  positions[item.id] !== undefined
+                    ? { ...item, position: positions[item.id] }
+                    : item
+                )
+                .sort((a, b) => a.position - b.position)
             );
-            setCurrentlyPlaying(playlistItem.is_playing ? playlistItem : null);
           }
           break;
 
@@ -18,6 +18,7 @@ const useWebSocket = (url, onMessage) => {
   const reconnectAttemptRef = useRef(0);
   const reconnectTimerRef = useRef(null);
   const pingIntervalRef = useRef(null);
+  const receivedRef = useRef(0);
 
   /**
    * Connect to WebSocket server
@@ -45,6 +46,7 @@ const useWebSocket = (url, onMessage) => {
         console.log("[WebSocket] Connected");
         setConnectionState(WS_STATES.CONNECTED);
         reconnectAttemptRef.current = 0;
+        receivedRef.current = 0;
         setError(null);
 
         // Start ping interval
@@ -57,6 +59,17 @@ const useWebSocket = (url, onMessage) => {
 
       ws.onmessage = (event) => {
         try {
+          // Acknowledge every frame, so the server keeps its send window open
+          receivedRef.current++;
+          if (receivedRef.current % RECONNECT_CONFIG.ACK_EVERY === 0) {
+            ws.send(
+              JSON.stringify({
+                type: WS_EVENTS.ACK,
+                received: receivedRef.current,
+              })
+            );
+          }
+
           const data = JSON.parse(event.data);
           console.log("[WebSocket] Message received:", data);
 
@@ -65,9 +78,19 @@ const useWebSocket = (url, onMessage) => {
             return;
           }
 
-          // Pass message to callback
+          // Events were dropped; ask for a fresh snapshot
+          if (data.type === WS_EVENTS.RESYNC_REQUIRED) {
+            ws.send(JSON.stringify({ type: WS_EVENTS.RESYNC }));
+            return;
+          }
+
+          // Pass message to callback, unpacking coalesced batches
           if (onMessage) {
-            onMessage(data);
+            if (data.type === WS_EVENTS.PLAYLIST_BATCH) {
+              data.events.forEach((batchedEvent) => onMessage(batchedEvent));
+            } else {
+              onMessage(data);
+            }
           }
         } catch (err) {
           console.error("[WebSocket] Error parsing message:", err);
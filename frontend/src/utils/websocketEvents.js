@@ -13,7 +13,15 @@ export const WS_EVENTS = {
   TRACK_REMOVED: "track.removed",
   TRACK_MOVED: "track.moved",
   TRACK_VOTED: "track.voted",
-  TRACK_PLAYING: "track.playing",
+  PLAYBACK_STATE: "playback.state",
+  PLAYLIST_BATCH: "playlist.batch",
+  PLAYLIST_REINDEXED: "playlist.reindexed",
+  PLAYLIST_SNAPSHOT: "playlist.snapshot",
+
+  // Flow control
+  ACK: "ack",
+  RESYNC: "resync",
+  RESYNC_REQUIRED: "resync.required",
 
   // Keep-alive
   PING: "ping",
@@ -38,4 +46,5 @@ export const RECONNECT_CONFIG = {
   MAX_ATTEMPTS: 10,
   DELAYS: [1000, 2000, 5000, 10000, 30000], // Exponential backoff in ms
   PING_INTERVAL: 20000, // Send ping every 20 seconds (reduced from 30)
+  ACK_EVERY: 16, // Acknowledge received frames so the server keeps sending
 };